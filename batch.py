@@ -0,0 +1,129 @@
+"""
+Batch audit: runs the pipeline for many targets in one process.
+Each target is a Python config module defining TARGET (same shape as config/target_meilisearch.py).
+GitHub, Tavily and Mistral clients are shared and connection-pooled across targets, targets run in parallel,
+and every outbound API call draws from one global concurrency budget. One report per target in --out-dir.
+
+Usage:
+  uv run python batch.py config/                                  (every module in the dir defining TARGET)
+  uv run python batch.py config/target_meilisearch.py other.py --concurrency 2 --budget 12 --sources github,tavily
+"""
+
+import argparse
+import importlib.util
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from core import pipeline
+from main import SOURCE_TIMEOUT_SECONDS, _parse_sources, main
+
+log = logging.getLogger("batch")
+
+# Targets audited at once, and outbound API calls in flight across all of them
+DEFAULT_TARGET_CONCURRENCY = 3
+DEFAULT_CALL_BUDGET = 16
+
+
+def load_target(path: Path) -> dict | None:
+    """Imports a target config file and returns its TARGET dict (None if it defines none)."""
+    spec = importlib.util.spec_from_file_location(f"batch_target_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    target = getattr(module, "TARGET", None)
+    return target if isinstance(target, dict) else None
+
+
+def discover(paths: list[str]) -> list[tuple[Path, dict]]:
+    targets = []
+    for p in map(Path, paths):
+        files = sorted(f for f in p.glob("*.py") if not f.name.startswith("_")) if p.is_dir() else [p]
+        for f in files:
+            target = load_target(f)
+            if target is None:
+                log.info("Skipping %s (no TARGET).", f)
+                continue
+            targets.append((f, target))
+    return targets
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").upper() or "TARGET"
+
+
+def run_batch(
+    paths: list[str],
+    out_dir: str = "reports",
+    concurrency: int = DEFAULT_TARGET_CONCURRENCY,
+    budget: int | None = DEFAULT_CALL_BUDGET,
+    sources: list[str] | None = None,
+    **pipeline_kwargs,
+) -> dict[str, Path | str]:
+    """Audits every target; returns {target name: report path, or error message}."""
+    from core import concurrency as call_budget
+
+    targets = discover(paths)
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    call_budget.set_budget(budget)
+    log.info("Batch: %d targets, %d at a time, %s API calls in flight max. Reports in %s/.", len(targets), concurrency, budget or "unlimited", out)
+
+    def audit(path: Path, target: dict) -> Path | None:
+        name = target.get("name") or path.stem
+        return main(
+            sources_override=sources,
+            target=target,
+            output_path=str(out / f"AUDIT_{_slug(name)}.md"),
+            **pipeline_kwargs,
+        )
+
+    start = time.perf_counter()
+    summary: dict[str, Path | str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="target") as pool:
+        futures = [(target.get("name") or path.stem, pool.submit(audit, path, target)) for path, target in targets]
+        for name, future in futures:
+            try:
+                summary[name] = future.result() or "no report written"
+            except Exception as e:
+                log.exception("Target %s failed.", name)
+                summary[name] = f"failed: {e}"
+    log.info("Batch finished in %.1fs:", time.perf_counter() - start)
+    for name, outcome in summary.items():
+        log.info("  %s -> %s", name, outcome)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit many targets in one process (one report per target).")
+    parser.add_argument("targets", nargs="+", metavar="PATH", help="Target config files (defining TARGET) or directories of them.")
+    parser.add_argument("--out-dir", default="reports", help="Directory for the per-target reports (default: reports).")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_TARGET_CONCURRENCY, help=f"Targets audited at once (default {DEFAULT_TARGET_CONCURRENCY}).")
+    parser.add_argument("--budget", type=int, default=DEFAULT_CALL_BUDGET, help=f"Max outbound API calls in flight across all targets, 0 for unlimited (default {DEFAULT_CALL_BUDGET}).")
+    parser.add_argument("--sources", type=_parse_sources, default=None, metavar="LIST", help="Comma-separated sources for every target. If omitted, each target's own config.")
+    parser.add_argument("--full-scan", action="store_true", help="GitHub: ignore stored high-water marks.")
+    parser.add_argument("--refresh-cache", action="store_true", help="Ignore cached Tavily results and LLM responses.")
+    parser.add_argument("--analysis-mode", choices=("auto", "single", "chunked"), default="auto")
+    parser.add_argument("--source-timeout", type=float, default=SOURCE_TIMEOUT_SECONDS, metavar="SECONDS")
+    parser.add_argument("--metrics-table", action="store_true", help="Append the run metrics table to each report.")
+    parser.add_argument("--from-store", action="store_true", help="Re-analyse each target's stored corpus, no network scan.")
+    parser.add_argument("--stream", action="store_true", help="Stream the final LLM call and write report sections as they complete.")
+    parser.add_argument("--resume", action="store_const", const="latest", default=None, help="Resume each target's latest run from its stage checkpoints.")
+    args = parser.parse_args()
+    run_batch(
+        args.targets,
+        out_dir=args.out_dir,
+        concurrency=args.concurrency,
+        budget=args.budget or None,
+        sources=args.sources,
+        full_scan=args.full_scan,
+        refresh_cache=args.refresh_cache,
+        analysis_mode=args.analysis_mode,
+        source_timeout=args.source_timeout,
+        metrics_table=args.metrics_table,
+        from_store=args.from_store,
+        resume=args.resume,
+        stream=args.stream,
+    )
+    pipeline.exit_if_abandoned()
@@ -0,0 +1 @@
+# Offline benchmark: local API stand-ins
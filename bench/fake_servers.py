@@ -0,0 +1,348 @@
+"""
+Local stand-ins for the GitHub, Tavily and Mistral APIs, used by benchmark.py.
+Each server speaks just enough of the real API for the scanners and analyzer (issue listing with since/page/per_page,
+GraphQL first comments, Tavily /search, Mistral /v1/chat/completions, streamed as server-sent events with
+"stream": true) and adds a configurable latency and rate limit (X-RateLimit-* headers; 403 / 429 once the window's
+budget is spent).
+GitHub repos are synthetic: issue n is generated on demand, so 100k-issue repos cost no memory.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from core.fake_llm import FakeChatModel
+
+# Terms from config.target_meilisearch keyword categories, mixed into some synthetic issues
+_TOPICS = ["panic in the indexer", "crash after upgrade", "OpenAI embedder default", "slow indexing on large batches", "p95 latency spikes", "out of memory while indexing", "telemetry opt-out", "typo tolerance question", "filter syntax question", "docs improvement"]
+_WORDS = "index search query filter facet document ranking typo settings task batch update delete payload embedder vector shard node memory disk cluster snapshot dump".split()
+
+
+@dataclass
+class ServiceConfig:
+    latency_ms: float = 0.0
+    # Uniform jitter added to the latency, in ms
+    jitter_ms: float = 0.0
+    # Requests allowed per window (None: unlimited)
+    rate_limit: int | None = None
+    rate_window_seconds: float = 60.0
+    # Delay between the chunks of a streamed response, in ms
+    stream_chunk_ms: float = 0.0
+
+
+@dataclass
+class EventStream:
+    """A route payload sent as server-sent events (one data: line per event, then [DONE]), chunk by chunk."""
+    events: list
+
+
+
+class _Limiter:
+    def __init__(self, config: ServiceConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._used = 0
+
+    def take(self) -> tuple[bool, int, float]:
+        """(allowed, remaining, reset epoch) for one request."""
+        limit = self.config.rate_limit
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.config.rate_window_seconds:
+                self._window_start, self._used = now, 0
+            reset = self._window_start + self.config.rate_window_seconds
+            if limit is None:
+                return True, 5000, reset
+            if self._used >= limit:
+                return False, 0, reset
+            self._used += 1
+            return True, limit - self._used, reset
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, payload, headers: dict | None = None) -> None:
+        if isinstance(payload, EventStream):
+            self._send_events(payload, headers)
+            return
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, str(v))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_events(self, stream: EventStream, headers: dict | None = None) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        # One stream per connection: clients may drop it without reading the end
+        self.send_header("Connection", "close")
+        self.close_connection = True
+        for k, v in (headers or {}).items():
+            self.send_header(k, str(v))
+        self.end_headers()
+        delay = self.server.stand_in.config.stream_chunk_ms / 1000.0
+        try:
+            for event in [json.dumps(e) for e in stream.events] + ["[DONE]"]:
+                if delay:
+                    time.sleep(delay)
+                data = f"data: {event}\n\n".encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped reading (at [DONE], or a stream abandoned early)
+            pass
+
+    def _handle(self, method: str) -> None:
+        stand_in = self.server.stand_in
+        stand_in.count()
+        body = self._body() if method == "POST" else b""
+        config = stand_in.config
+        delay = config.latency_ms + random.uniform(0, config.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000.0)
+        allowed, remaining, reset = stand_in.limiter.take()
+        headers = {"X-RateLimit-Limit": config.rate_limit or 5000, "X-RateLimit-Remaining": remaining, "X-RateLimit-Reset": int(reset) + 1}
+        if not allowed:
+            stand_in.throttled()
+            status, payload = stand_in.throttle_response(reset)
+            headers["Retry-After"] = max(1, int(reset - time.time()) + 1)
+            self._send(status, payload, headers)
+            return
+        try:
+            status, payload = stand_in.route(method, urlsplit(self.path), body)
+        except Exception as e:
+            status, payload = 500, {"message": f"{type(e).__name__}: {e}"}
+        self._send(status, payload, headers)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    stand_in: "StandIn"
+
+
+class StandIn:
+    """One local HTTP server. start() returns its base URL; requests / throttled count what it served."""
+
+    def __init__(self, config: ServiceConfig | None = None):
+        self.config = config or ServiceConfig()
+        self.limiter = _Limiter(self.config)
+        self.requests = 0
+        self.throttled_requests = 0
+        self._lock = threading.Lock()
+        self._server: _Server | None = None
+
+    def count(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def throttled(self) -> None:
+        with self._lock:
+            self.throttled_requests += 1
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.requests = self.throttled_requests = 0
+
+    def start(self) -> str:
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.stand_in = self
+        threading.Thread(target=self._server.serve_forever, daemon=True, name=type(self).__name__).start()
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def throttle_response(self, reset: float) -> tuple[int, object]:
+        return 429, {"message": "rate limit exceeded"}
+
+    def route(self, method: str, url, body: bytes) -> tuple[int, object]:
+        raise NotImplementedError
+
+
+class FakeGitHub(StandIn):
+    """
+    Synthetic repos: GET /repos/{owner}/{name}/issues lists the repo's issues, most recently updated first
+    (every 20th is a pull request); POST /graphql answers the first-comment nodes(ids:) query.
+    A repo named "*-<N>" (e.g. bench/repo-10000) has N issues, any other repo default_issues.
+    """
+
+    def __init__(self, default_issues: int = 1000, config: ServiceConfig | None = None, window_days: int = 300):
+        super().__init__(config)
+        self.default_issues = default_issues
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+        # Issue n of an N-issue repo was updated n * window / N ago: all inside the scanner's 12-month window
+        self.window = timedelta(days=window_days)
+        self.base = ""
+
+    def start(self) -> str:
+        self.base = super().start()
+        return self.base
+
+    def throttle_response(self, reset: float) -> tuple[int, object]:
+        return 403, {"message": "API rate limit exceeded", "documentation_url": "https://docs.github.com/rest/rate-limit"}
+
+    def size(self, repo: str) -> int:
+        suffix = repo.rsplit("-", 1)[-1]
+        return int(suffix) if suffix.isdigit() else self.default_issues
+
+    def _hash(self, n: int) -> int:
+        return int(hashlib.blake2b(f"#{n}".encode(), digest_size=8).hexdigest(), 16)
+
+    def _created(self, size: int, n: int) -> datetime:
+        return self.now - self.window / size * n - timedelta(hours=1 + self._hash(n) % 2000)
+
+    def _issue(self, repo: str, size: int, n: int) -> dict:
+        h = self._hash(n)
+        topic = _TOPICS[h % len(_TOPICS)]
+        words = " ".join(_WORDS[(h >> (4 * k)) % len(_WORDS)] for k in range(24))
+        kind = "pull" if n % 20 == 0 else "issues"
+        item = {
+            "id": n,
+            "node_id": f"I_{size}_{n}",
+            "number": n,
+            "title": f"{topic} ({n})",
+            "body": f"Report {n}: {topic}. Steps: {words}. Version 1.{h % 20}.{h % 7}.",
+            "state": "closed" if h % 3 == 0 else "open",
+            "created_at": _ts(self._created(size, n)),
+            "updated_at": _ts(self.now - self.window / size * n),
+            "closed_at": _ts(self._created(size, n) + timedelta(hours=2 + h % 900)) if h % 3 == 0 else None,
+            "labels": [{"name": "bug", "color": "d73a4a"}] if h % 4 == 0 else [],
+            "comments": h % 5,
+            "url": f"{self.base}/repos/{repo}/issues/{n}",
+            "html_url": f"https://github.com/{repo}/{kind}/{n}",
+        }
+        if kind == "pull":
+            item["pull_request"] = {"url": f"{self.base}/repos/{repo}/pulls/{n}"}
+        return item
+
+    def _first_comment_node(self, node_id: str) -> dict:
+        _, size, n = node_id.split("_")
+        size, n = int(size), int(n)
+        comments = []
+        if self._hash(n) % 5:
+            comments.append({"createdAt": _ts(self._created(size, n) + timedelta(minutes=5 + n * 37 % 5000))})
+        return {"number": n, "comments": {"nodes": comments}}
+
+    def route(self, method: str, url, body: bytes) -> tuple[int, object]:
+        parts = url.path.strip("/").split("/")
+        if method == "POST" and parts == ["graphql"]:
+            ids = (json.loads(body or b"{}").get("variables") or {}).get("ids") or []
+            return 200, {"data": {"nodes": [self._first_comment_node(i) for i in ids]}}
+        if method == "GET" and len(parts) == 4 and parts[0] == "repos" and parts[3] == "issues":
+            repo = f"{parts[1]}/{parts[2]}"
+            size = self.size(repo)
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            per_page = min(100, int(q.get("per_page", 30)))
+            page = int(q.get("page", 1))
+            last = size
+            if q.get("since"):
+                since = datetime.fromisoformat(q["since"].replace("Z", "+00:00"))
+                # Newest first, evenly spaced: the issues updated at or after since are 1..last
+                last = min(size, int((self.now - since) / (self.window / size)))
+            first = (page - 1) * per_page + 1
+            return 200, [self._issue(repo, size, n) for n in range(first, min(last, first + per_page - 1) + 1)]
+        if method == "GET" and len(parts) == 3 and parts[0] == "repos":
+            repo = f"{parts[1]}/{parts[2]}"
+            return 200, {"id": 1, "name": parts[2], "full_name": repo, "url": f"{self.base}/repos/{repo}"}
+        return 404, {"message": "Not Found"}
+
+
+def _ts(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FakeTavily(StandIn):
+    """POST /search: max_results deterministic results per query, some sharing a URL up to tracking parameters."""
+
+    def route(self, method: str, url, body: bytes) -> tuple[int, object]:
+        if method != "POST" or url.path.rstrip("/") != "/search":
+            return 404, {"detail": {"error": "Not Found"}}
+        data = json.loads(body or b"{}")
+        query = data.get("query", "")
+        h = int(hashlib.blake2b(query.encode(), digest_size=8).hexdigest(), 16)
+        results = []
+        for k in range(int(data.get("max_results") or 5)):
+            # Every 4th result is the previous page again with a tracking parameter
+            slug = k - 1 if k % 4 == 3 else k
+            words = " ".join(_WORDS[(h >> (3 * (j + slug))) % len(_WORDS)] for j in range(30))
+            results.append({
+                "title": f"{query}: thread {slug}",
+                "url": f"https://forum.example.com/{h % 1000}/{slug}" + ("?utm_source=feed" if k % 4 == 3 else ""),
+                "content": f"{query}. {_TOPICS[(h + slug) % len(_TOPICS)]}. {words}",
+                "score": round(1.0 - k / 20, 3),
+            })
+        return 200, {"query": query, "results": results, "response_time": 0.1}
+
+
+class FakeMistral(StandIn):
+    """POST /v1/chat/completions answered by core.fake_llm (same structured report / chunk summaries)."""
+
+    def __init__(self, config: ServiceConfig | None = None):
+        super().__init__(config)
+        self._model = FakeChatModel()
+
+    def route(self, method: str, url, body: bytes) -> tuple[int, object]:
+        if method != "POST" or not url.path.rstrip("/").endswith("/chat/completions"):
+            return 404, {"message": "Not Found"}
+        data = json.loads(body or b"{}")
+        prompt = "\n".join(str(m.get("content", "")) for m in data.get("messages") or [])
+        model = data.get("model", "mistral-large-latest")
+        if data.get("stream"):
+            chunks = list(self._model.stream(prompt))
+            events = []
+            for k, chunk in enumerate(chunks):
+                last = k == len(chunks) - 1
+                event = {
+                    "id": "bench",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"role": "assistant", "content": chunk.content}, "finish_reason": "stop" if last else None}],
+                }
+                if last:
+                    event["usage"] = _usage(chunk.usage_metadata)
+                events.append(event)
+            return 200, EventStream(events)
+        msg = self._model.invoke(prompt)
+        return 200, {
+            "id": "bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": msg.content}, "finish_reason": "stop"}],
+            "usage": _usage(msg.usage_metadata),
+        }
+
+
+def _usage(usage: dict) -> dict:
+    return {"prompt_tokens": usage["input_tokens"], "completion_tokens": usage["output_tokens"], "total_tokens": usage["input_tokens"] + usage["output_tokens"]}
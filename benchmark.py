@@ -0,0 +1,243 @@
+"""
+Offline benchmark: runs the full pipeline (GitHub + Tavily scanners, analysis, report) against local stand-ins of
+the GitHub, Tavily and Mistral APIs (bench/fake_servers.py), on synthetic repos of several sizes.
+Latency, jitter and rate limits of the stand-ins are configurable; results come from each run's metrics file
+(core.metrics) and are saved as JSON for regression comparison.
+
+Usage:
+  uv run python benchmark.py                                   (1k, 10k and 100k issues, no added latency)
+  uv run python benchmark.py --sizes 1000,10000 --latency-ms 40 --jitter-ms 20 --github-rate-limit 3000
+  uv run python benchmark.py --sizes 1000 --compare bench/results/baseline.json   (exit 1 on regression)
+  uv run python benchmark.py --sizes 100000 --streaming                             (peak RSS of a streaming scan)
+  uv run python benchmark.py --sizes 1000 --stream-analysis --stream-chunk-ms 200   (time to the first report section)
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bench.fake_servers import FakeGitHub, FakeMistral, FakeTavily, ServiceConfig
+
+log = logging.getLogger("benchmark")
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_RESULTS_DIR = "bench/results"
+# A stage slower than baseline by more than this fraction is a regression
+DEFAULT_THRESHOLD = 0.2
+
+
+def _point_at(github: str, tavily: str, mistral: str, work_dir: Path) -> None:
+    """Routes every client to the stand-ins and keeps caches and state out of the real ones (before any client exists)."""
+    os.environ.update({
+        "GITHUB_API_URL": github,
+        # A token selects the GraphQL velocity path, as in production
+        "GITHUB_TOKEN": "bench",
+        "GITHUB_CACHE": "0",
+        "GITHUB_STATE_DIR": str(work_dir / "github_state"),
+        "TAVILY_API_KEY": "bench",
+        "TAVILY_API_URL": tavily,
+        "TAVILY_CACHE": "0",
+        "LLM_PROVIDER": "mistral",
+        "MISTRAL_API_KEY": "bench",
+        "MISTRAL_BASE_URL": f"{mistral}/v1",
+        "LLM_CACHE": "0",
+        "CORPUS_DB": str(work_dir / "corpus.sqlite3"),
+        "CHECKPOINT_DIR": str(work_dir / "runs"),
+    })
+
+
+def _target(size: int, streaming: bool = False) -> dict:
+    from config.target_meilisearch import GITHUB_KEYWORDS, REDDIT_KEYWORDS, TAVILY_QUERIES
+
+    return {
+        "name": f"Bench{size}",
+        "competitors": ["Typesense", "Algolia"],
+        "github": {"repo": f"bench/repo-{size}", "keywords": GITHUB_KEYWORDS, "max_issues": size, "streaming": streaming},
+        "tavily": {"queries": TAVILY_QUERIES, "keywords": REDDIT_KEYWORDS},
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(size: int, servers: dict, work_dir: Path, analysis_mode: str = "auto", streaming: bool = False, stream_analysis: bool = False) -> dict:
+    """One end-to-end pipeline run on a synthetic repo of `size` issues."""
+    from core import metrics
+    from main import main
+
+    for server in servers.values():
+        server.reset_counters()
+    report = work_dir / f"AUDIT_BENCH_{size}.md"
+    start = time.perf_counter()
+    main(sources_override=["github", "tavily"], full_scan=True, analysis_mode=analysis_mode, target=_target(size, streaming), output_path=str(report), stream=stream_analysis)
+    wall = time.perf_counter() - start
+    m = json.loads(metrics.metrics_path(report).read_text(encoding="utf-8"))
+    github_seconds = m["stages"].get("github") or 0.0
+    return {
+        "issues": size,
+        "wall_seconds": round(wall, 2),
+        "stages": m["stages"],
+        "sections": m["sections"],
+        "stage_errors": m.get("stage_errors") or {},
+        "issues_per_second": round(size / github_seconds, 1) if github_seconds else None,
+        "http": m["http"],
+        "served": {name: s.requests for name, s in servers.items()},
+        "throttled": {name: s.throttled_requests for name, s in servers.items()},
+        "llm": {k: v for k, v in m["llm"].items() if k != "detail"},
+        # Process-wide peak: non-decreasing across sizes, run sizes one per process for exact figures
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """Logs wall and per-stage time ratios against the baseline; returns the regressions found."""
+    regressions = []
+    old_runs = {r["issues"]: r for r in baseline.get("runs", [])}
+    for run in current["runs"]:
+        old = old_runs.get(run["issues"])
+        if old is None:
+            log.info("%d issues: not in baseline.", run["issues"])
+            continue
+        pairs = [("wall", run["wall_seconds"], old["wall_seconds"])]
+        pairs += [(name, seconds, old["stages"].get(name)) for name, seconds in run["stages"].items()]
+        for name, new_s, old_s in pairs:
+            if not old_s:
+                continue
+            ratio = new_s / old_s
+            flag = ""
+            # Sub-100ms stages are noise
+            if ratio > 1 + threshold and new_s - old_s > 0.1:
+                flag = "  REGRESSION"
+                regressions.append(f"{run['issues']} issues, {name}: {old_s:.2f}s -> {new_s:.2f}s")
+            log.info("%7d issues  %-10s %8.2fs -> %8.2fs  (x%.2f)%s", run["issues"], name, old_s, new_s, ratio, flag)
+    return regressions
+
+
+def run_benchmark(
+    sizes: list[int],
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    github_rate_limit: int | None = None,
+    tavily_rate_limit: int | None = None,
+    mistral_rate_limit: int | None = None,
+    rate_window_seconds: float = 60.0,
+    analysis_mode: str = "auto",
+    results_dir: str = DEFAULT_RESULTS_DIR,
+    streaming: bool = False,
+    stream_analysis: bool = False,
+    stream_chunk_ms: float = 0.0,
+) -> tuple[dict, Path]:
+    """Starts the stand-ins, runs every size, saves and returns the results."""
+    def config(rate_limit: int | None) -> ServiceConfig:
+        return ServiceConfig(latency_ms=latency_ms, jitter_ms=jitter_ms, rate_limit=rate_limit, rate_window_seconds=rate_window_seconds)
+
+    servers = {
+        "github": FakeGitHub(config=config(github_rate_limit)),
+        "tavily": FakeTavily(config(tavily_rate_limit)),
+        "mistral": FakeMistral(ServiceConfig(latency_ms=latency_ms, jitter_ms=jitter_ms, rate_limit=mistral_rate_limit, rate_window_seconds=rate_window_seconds, stream_chunk_ms=stream_chunk_ms)),
+    }
+    work_dir = Path(tempfile.mkdtemp(prefix="bench-"))
+    urls = {name: server.start() for name, server in servers.items()}
+    _point_at(urls["github"], urls["tavily"], urls["mistral"], work_dir)
+    settings = {
+        "latency_ms": latency_ms,
+        "jitter_ms": jitter_ms,
+        "rate_limits": {"github": github_rate_limit, "tavily": tavily_rate_limit, "mistral": mistral_rate_limit},
+        "rate_window_seconds": rate_window_seconds,
+        "analysis_mode": analysis_mode,
+        "streaming": streaming,
+        "stream_analysis": stream_analysis,
+        "stream_chunk_ms": stream_chunk_ms,
+    }
+    log.info("Benchmark: sizes %s, stand-ins %s, settings %s. Work dir %s.", sizes, urls, settings, work_dir)
+    runs = []
+    try:
+        for size in sizes:
+            run = run_size(size, servers, work_dir, analysis_mode, streaming, stream_analysis)
+            runs.append(run)
+            log.info("%d issues: wall %.2fs, GitHub %.2fs (%s issues/s), stages %s, %s requests served.", size, run["wall_seconds"], run["stages"].get("github", 0.0), run["issues_per_second"], run["stages"], run["served"])
+    finally:
+        for server in servers.values():
+            server.stop()
+
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": settings,
+        "runs": runs,
+    }
+    out = Path(results_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    path = out / f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    log.info("Results saved to %s", path)
+    return results, path
+
+
+def _parse_sizes(s: str) -> list[int]:
+    try:
+        sizes = [int(p) for p in s.split(",") if p.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid sizes: {s}. Example: 1000,10000")
+    if not sizes or min(sizes) <= 0:
+        raise argparse.ArgumentTypeError(f"Invalid sizes: {s}. Example: 1000,10000")
+    return sizes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline offline against local GitHub / Tavily / Mistral stand-ins.")
+    parser.add_argument("--sizes", type=_parse_sizes, default=list(DEFAULT_SIZES), metavar="LIST", help="Comma-separated synthetic repo sizes in issues (default 1000,10000,100000).")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency added to every stand-in response (default 0).")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random jitter on top of the latency (default 0).")
+    parser.add_argument("--github-rate-limit", type=int, default=None, metavar="N", help="GitHub requests allowed per window, then 403 until reset (default unlimited).")
+    parser.add_argument("--tavily-rate-limit", type=int, default=None, metavar="N", help="Tavily requests per window, then 429 (default unlimited).")
+    parser.add_argument("--mistral-rate-limit", type=int, default=None, metavar="N", help="Mistral requests per window, then 429 (default unlimited).")
+    parser.add_argument("--rate-window", type=float, default=60.0, metavar="SECONDS", help="Rate-limit window (default 60).")
+    parser.add_argument("--analysis-mode", choices=("auto", "single", "chunked"), default="auto")
+    parser.add_argument("--streaming", action="store_true", help="Bounded-memory streaming GitHub scans (compare peak_rss_mb with one size per process).")
+    parser.add_argument("--stream-analysis", action="store_true", help="Stream the final LLM call and write report sections as they complete (main.py --stream).")
+    parser.add_argument("--stream-chunk-ms", type=float, default=0.0, metavar="MS", help="Delay between the chunks of a streamed Mistral response (default 0).")
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR, help=f"Where results are saved (default {DEFAULT_RESULTS_DIR}).")
+    parser.add_argument("--compare", metavar="PATH", help="Baseline results file: print per-stage ratios, exit 1 on regression.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help=f"Regression threshold as a fraction (default {DEFAULT_THRESHOLD}).")
+    parser.add_argument("--verbose", action="store_true", help="Keep the pipeline's INFO logs.")
+    args = parser.parse_args()
+
+    import main  # noqa: F401  (configures logging)
+
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    log.setLevel(logging.INFO)
+    results, _ = run_benchmark(
+        args.sizes,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        github_rate_limit=args.github_rate_limit,
+        tavily_rate_limit=args.tavily_rate_limit,
+        mistral_rate_limit=args.mistral_rate_limit,
+        rate_window_seconds=args.rate_window,
+        analysis_mode=args.analysis_mode,
+        results_dir=args.results_dir,
+        streaming=args.streaming,
+        stream_analysis=args.stream_analysis,
+        stream_chunk_ms=args.stream_chunk_ms,
+    )
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text(encoding="utf-8")), args.threshold)
+        if regressions:
+            log.warning("%d regression(s): %s", len(regressions), "; ".join(regressions))
+            sys.exit(1)
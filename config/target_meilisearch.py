@@ -35,7 +35,7 @@ TAVILY_QUERIES = [
     "Meilisearch switch migrate away",
 ]
 
-# --- Reddit (optional; stub if no PRAW credentials) ---
+# --- Reddit (PRAW; skipped if no PRAW credentials, or replayed from REDDIT_FIXTURE) ---
 REDDIT_SUBREDDITS = ["selfhosted", "rust", "Search", "LanguageTechnology"]
 REDDIT_KEYWORDS = {
     "comparaisons": ["Meilisearch vs Typesense", "Meilisearch vs Algolia", "Meilisearch vs Elasticsearch"],
@@ -43,15 +43,22 @@ REDDIT_KEYWORDS = {
     "pain_points": ["switch from Meilisearch", "migrate away", "leave Meilisearch"],
 }
 
-# Export for the orchestrator
+# Export for the orchestrator (batch.py loads any module defining TARGET the same way)
 TARGET = {
+    "name": "Meilisearch",
+    # Used in the analysis prompts; lab findings default to the ones in core.mistral_analyzer
+    "competitors": ["Typesense", "Algolia"],
     "sources": SOURCES,
     "github": {
         "repo": GITHUB_REPO,
         "keywords": GITHUB_KEYWORDS,
+        # Optional: "lookback_months" (default 12) widens the scan for longer activity trends, with "max_issues"
+        # Optional: "streaming": True scans with flat memory (full scans, for very large max_issues; see core.issue_stream)
     },
     "tavily": {
         "queries": TAVILY_QUERIES,
+        # Social keyword categories, used to tag web results (same set as Reddit)
+        "keywords": REDDIT_KEYWORDS,
     },
     "reddit": {
         "subreddits": REDDIT_SUBREDDITS,
@@ -0,0 +1,152 @@
+"""
+Per-run stage checkpoints: each stage's output (scanner results, analysis) is written atomically under
+CHECKPOINT_DIR/<target>/<run id>/<stage>.json with a hash of the stage's config and of its inputs (the outputs of
+the stages it reads). A resumed run (main.py --resume) reuses a checkpoint when both hashes are unchanged, so a
+failed or re-tuned analysis does not rescan every source.
+Outputs carrying an "error" are not checkpointed (they are retried). The last KEEP_RUNS runs per target are kept.
+CHECKPOINTS=0 disables checkpointing.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from core import metrics
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_DIR = ".cache/runs"
+KEEP_RUNS = 10
+# Run ids are UTC timestamps (see Run); resume values are checked against this before touching the filesystem
+RUN_ID_PATTERN = re.compile(r"\d{8}-\d{6}-\d{6}")
+
+
+def enabled() -> bool:
+    return os.getenv("CHECKPOINTS", "1") != "0"
+
+
+def config_hash(config) -> str:
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "target"
+
+
+def _is_sequence(value) -> bool:
+    # Spilled lists (core.issue_stream.SpillList) are written item by item instead of being materialised
+    return hasattr(value, "__iter__") and hasattr(value, "__len__") and not isinstance(value, (str, bytes, dict, list, tuple))
+
+
+def _dump(output, f, digest) -> None:
+    def write(s: str) -> None:
+        b = s.encode("utf-8")
+        digest.update(b)
+        f.write(b)
+
+    if not isinstance(output, dict):
+        write(json.dumps(output, default=str))
+        return
+    write("{")
+    for k, (key, value) in enumerate(output.items()):
+        write(("," if k else "") + json.dumps(str(key)) + ":")
+        if _is_sequence(value):
+            write("[")
+            for n, item in enumerate(value):
+                write(("," if n else "") + json.dumps(item, default=str))
+            write("]")
+        else:
+            write(json.dumps(value, default=str))
+    write("}")
+
+
+class Run:
+    """Checkpoints of one run of one target. resume: a run id, "latest", or None for a new run."""
+
+    def __init__(self, target: str, resume: str | None = None):
+        self.root = Path(os.getenv("CHECKPOINT_DIR", DEFAULT_CHECKPOINT_DIR)) / _slug(target)
+        run_id = None
+        if resume == "latest":
+            runs = self.runs()
+            run_id = runs[-1] if runs else None
+            if run_id is None:
+                log.warning("Resume: no previous run for %s under %s; starting a new run.", target, self.root)
+        elif resume:
+            if not RUN_ID_PATTERN.fullmatch(resume):
+                raise ValueError(f"Invalid run id {resume!r}: expected \"latest\" or an id like 20260101-120000-000000")
+            if not (self.root / resume).is_dir():
+                raise FileNotFoundError(f"No run {resume} for {target} under {self.root}")
+            run_id = resume
+        self.resumed = run_id is not None
+        self.run_id = run_id or datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S-%f")
+        self.dir = self.root / self.run_id
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.reused: list[str] = []
+        # Stage -> hash of its output (written or reused this run), the inputs of later stages
+        self._output_hashes: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+        if not self.resumed:
+            self._prune()
+        log.info("Run %s (%s): checkpoints in %s.", self.run_id, "resumed" if self.resumed else "new", self.dir)
+
+    def runs(self) -> list[str]:
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir()) if self.root.is_dir() else []
+
+    def _prune(self) -> None:
+        for old in self.runs()[:-KEEP_RUNS]:
+            shutil.rmtree(self.root / old, ignore_errors=True)
+
+    def output_hash(self, stage: str) -> str | None:
+        with self._lock:
+            return self._output_hashes.get(stage)
+
+    def load(self, stage: str, config_hash: str, input_hash: str):
+        """The checkpointed output if this run has one with the same config and input hashes (resumed runs only)."""
+        path = self.dir / f"{stage}.json"
+        if not self.resumed or not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            log.warning("Ignoring unreadable checkpoint %s: %s", path, e)
+            return None
+        if data.get("config_hash") != config_hash or data.get("input_hash") != input_hash:
+            log.info("Checkpoint %s is stale (config or inputs changed); running the stage.", stage)
+            return None
+        with self._lock:
+            self._output_hashes[stage] = data["output_hash"]
+            self.reused.append(stage)
+        log.info("Stage %s resumed from checkpoint (saved %s).", stage, data.get("saved_at"))
+        return data["output"]
+
+    def save(self, stage: str, output, config_hash: str, input_hash: str) -> Path | None:
+        """Writes the stage output atomically; outputs with an error are skipped (and retried on resume)."""
+        if isinstance(output, dict) and output.get("error"):
+            with self._lock:
+                self._output_hashes[stage] = None
+            return None
+        path = self.dir / f"{stage}.json"
+        digest = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+        try:
+            with metrics.timed("checkpoint.save"), os.fdopen(fd, "wb") as f:
+                header = {"stage": stage, "config_hash": config_hash, "input_hash": input_hash, "saved_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+                f.write(json.dumps(header)[:-1].encode("utf-8") + b', "output": ')
+                _dump(output, f, digest)
+                output_hash = digest.hexdigest()[:16]
+                f.write(f', "output_hash": "{output_hash}"}}'.encode("utf-8"))
+            # Atomic replace: an interrupted write keeps the previous checkpoint
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self._output_hashes[stage] = output_hash
+        return path
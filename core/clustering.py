@@ -0,0 +1,107 @@
+"""
+Local clustering of recurring complaints before the LLM prompt is built (no embeddings, no network).
+Items (matched issues, web results, posts) become TF-IDF vectors (core.context_ranker tokens, sublinear tf);
+cosine similarities are computed blockwise with numpy. Leaders are taken in order of how many items they are
+similar to, each claiming its still unassigned neighbours, so every member is close to its cluster's representative.
+"""
+
+import logging
+import math
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from core import context_ranker
+
+log = logging.getLogger(__name__)
+
+# Cosine similarity at which two items report the same problem
+SIMILARITY_THRESHOLD = 0.4
+# Terms kept as vector dimensions (most frequent first; a term in one item only cannot make two items similar)
+MAX_FEATURES = 1024
+# Items beyond this many are left as singletons (similarities are quadratic in the item count)
+MAX_ITEMS = 20000
+# Rows per similarity block (BLOCK_ROWS x items float32 at a time)
+BLOCK_ROWS = 1024
+# Terms used to label a cluster
+LABEL_TERMS = 3
+
+
+@dataclass
+class Cluster:
+    # Indices into the clustered texts, the representative first
+    members: list[int]
+    # Highest-weight terms of the cluster (stemmed)
+    label: list[str] = field(default_factory=list)
+
+    @property
+    def representative(self) -> int:
+        return self.members[0]
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+
+def vectors(texts: list[str], max_features: int = MAX_FEATURES) -> tuple[np.ndarray, list[str]]:
+    """L2-normalised TF-IDF rows (float32) over the max_features most frequent shared terms, and those terms."""
+    docs = [Counter(context_ranker.tokens(t)) for t in texts]
+    n = len(docs)
+    df = Counter(t for d in docs for t in d)
+    idf = {t: math.log((1 + n) / (1 + f)) + 1 for t, f in df.items()}
+    terms = [t for t, f in df.most_common(max_features) if f >= 2]
+    column = {t: k for k, t in enumerate(terms)}
+    rows, cols, values = [], [], []
+    norms = np.ones(n, dtype=np.float32)
+    for r, d in enumerate(docs):
+        weights = {t: (1 + math.log(c)) * idf[t] for t, c in d.items()}
+        # Norm over every term, so that similarities are exact over the kept dimensions
+        norms[r] = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        for t, w in weights.items():
+            k = column.get(t)
+            if k is not None:
+                rows.append(r)
+                cols.append(k)
+                values.append(w)
+    m = np.zeros((n, len(terms)), dtype=np.float32)
+    m[rows, cols] = values
+    m /= norms[:, None]
+    return m, terms
+
+
+def cluster(texts: list[str], threshold: float = SIMILARITY_THRESHOLD) -> list[Cluster]:
+    """Clusters of texts, largest first (ties: earliest first); every text is in exactly one (singletons included)."""
+    start = time.perf_counter()
+    n = min(len(texts), MAX_ITEMS)
+    if len(texts) > MAX_ITEMS:
+        log.info("Clustering: %d items, only the first %d are compared.", len(texts), MAX_ITEMS)
+    m, terms = vectors(texts[:n])
+    neighbours: list[np.ndarray] = []
+    for lo in range(0, n, BLOCK_ROWS):
+        sims = m[lo:lo + BLOCK_ROWS] @ m.T
+        close = sims >= threshold
+        close[np.arange(len(close)), np.arange(lo, lo + len(close))] = False
+        neighbours.extend(np.flatnonzero(row).astype(np.int32) for row in close)
+    degree = np.array([len(nb) for nb in neighbours], dtype=np.int64)
+
+    assigned = np.zeros(n, dtype=bool)
+    clusters = []
+    # Most connected first (stable: earlier items win ties)
+    for leader in np.argsort(-degree, kind="stable"):
+        if assigned[leader]:
+            continue
+        members = neighbours[leader][~assigned[neighbours[leader]]]
+        assigned[leader] = True
+        assigned[members] = True
+        clusters.append(Cluster([int(leader), *sorted(int(i) for i in members)]))
+    clusters.extend(Cluster([i]) for i in range(n, len(texts)))
+
+    for c in clusters:
+        if len(c) > 1 and terms:
+            weights = m[c.members].sum(axis=0)
+            c.label = [terms[k] for k in np.argsort(-weights, kind="stable")[:LABEL_TERMS] if weights[k] > 0]
+    clusters.sort(key=lambda c: (-len(c), c.representative))
+    recurring = [c for c in clusters if len(c) > 1]
+    log.info("Clustering: %d items -> %d clusters, %d recurring (covering %d items), %.1fs.", len(texts), len(clusters), len(recurring), sum(len(c) for c in recurring), time.perf_counter() - start)
+    return clusters
@@ -0,0 +1,27 @@
+"""
+Process-wide budget of concurrent outbound API calls (GitHub, Tavily, LLM), shared by every scanner and the analyzer.
+Unlimited by default; batch mode sets it so that targets audited in parallel share one budget.
+"""
+
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+_budget: threading.BoundedSemaphore | None = None
+
+
+def set_budget(max_in_flight: int | None) -> None:
+    """Caps concurrent outbound calls process-wide (None: unlimited). Set before starting work."""
+    global _budget
+    _budget = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+
+
+@contextmanager
+def slot() -> Iterator[None]:
+    """Holds one unit of the budget for the duration of a single API call."""
+    budget = _budget
+    if budget is None:
+        yield
+        return
+    with budget:
+        yield
@@ -0,0 +1,150 @@
+"""
+Relevance-ranked context selection for the single-call prompt.
+Every candidate item (GitHub issue, web result, Reddit post) is scored with BM25 against the audit themes
+(keyword categories and lab findings). The best items are packed into the character budget with per-source
+quotas, round-robin across themes so that one noisy category cannot fill the prompt; budget a source leaves
+unused goes to the best remaining items of the others.
+"""
+
+import math
+import re
+from collections import Counter, deque
+from dataclasses import dataclass
+
+# Share of the budget per source (renormalised over the sources present)
+SOURCE_SHARES = {"github": 0.5, "tavily": 0.3, "reddit": 0.2}
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Title tokens count this many times (titles are short and on-topic)
+TITLE_WEIGHT = 2
+# Items matching no theme at all are packed last
+UNMATCHED = "(unmatched)"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its of on or that the this to was were will with "
+    "we you they not no do does did can could should would our your their there here when what which who how".split()
+)
+
+
+def _stem(token: str) -> str:
+    # Light suffix stripping, enough for crash/crashes/crashing, index/indexing
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(token) > len(suffix) + 2 and token.endswith(suffix):
+            return token[: -len(suffix)]
+    return token
+
+
+def tokens(text: str) -> list[str]:
+    return [_stem(t) for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+@dataclass
+class Candidate:
+    source: str
+    # Prompt line (what is packed) and the text it is ranked on (title, full body)
+    line: str
+    title: str
+    text: str
+    score: float = 0.0
+    theme: str = UNMATCHED
+
+    @property
+    def cost(self) -> int:
+        # "\n".join adds one character per line
+        return len(self.line) + 1
+
+
+class BM25:
+    def __init__(self, docs: list[list[str]]):
+        self.n = len(docs)
+        self.lengths = [len(d) for d in docs]
+        self.avg_length = sum(self.lengths) / self.n if self.n else 0.0
+        self.tf = [Counter(d) for d in docs]
+        df = Counter(t for d in self.tf for t in d)
+        self.idf = {t: math.log(1 + (self.n - f + 0.5) / (f + 0.5)) for t, f in df.items()}
+
+    def scores(self, query: list[str]) -> list[float]:
+        terms = [t for t in set(query) if t in self.idf]
+        out = []
+        for tf, length in zip(self.tf, self.lengths):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self.avg_length) if self.avg_length else BM25_K1
+            out.append(sum(self.idf[t] * tf[t] * (BM25_K1 + 1) / (tf[t] + norm) for t in terms if t in tf))
+        return out
+
+
+def themes(keyword_sets: list[dict[str, list[str]]], lab_findings: str) -> dict[str, list[str]]:
+    """Theme -> query tokens: one per keyword category (sources merged) and one per lab finding line."""
+    out: dict[str, list[str]] = {}
+    for keywords in keyword_sets:
+        for category, terms in (keywords or {}).items():
+            out.setdefault(category, []).extend(tokens(" ".join(terms)))
+    for line in lab_findings.splitlines():
+        line = line.strip(" -\t")
+        if not line:
+            continue
+        name, _, finding = line.partition(":")
+        out[f"lab: {name.strip()}"] = tokens(finding or name)
+    return {name: q for name, q in out.items() if q}
+
+
+def rank(candidates: list[Candidate], theme_queries: dict[str, list[str]]) -> None:
+    """Sets each candidate's score (best theme score, normalised per theme to 0-1) and theme, in place."""
+    if not candidates:
+        return
+    index = BM25([tokens(f"{c.title} " * TITLE_WEIGHT + c.text) for c in candidates])
+    for name, query in theme_queries.items():
+        scores = index.scores(query)
+        top = max(scores, default=0.0)
+        if top <= 0:
+            continue
+        for c, s in zip(candidates, scores):
+            if s / top > c.score:
+                c.score, c.theme = s / top, name
+
+
+def _round_robin(candidates: list[Candidate], budget: int, chosen: list[Candidate]) -> int:
+    """Packs candidates taking the best of each theme in turn while they fit; returns the budget left."""
+    queues: dict[str, deque[Candidate]] = {}
+    for c in sorted(candidates, key=lambda c: c.score, reverse=True):
+        queues.setdefault(c.theme, deque()).append(c)
+    # Themes in order of their best item; unmatched items only once every theme is exhausted
+    order = sorted((t for t in queues if t != UNMATCHED), key=lambda t: queues[t][0].score, reverse=True)
+    for group in (order, [UNMATCHED] if UNMATCHED in queues else []):
+        active = list(group)
+        while active:
+            for t in list(active):
+                queue = queues[t]
+                # Skip what does not fit: a shorter item of the same theme may still fit
+                while queue and queue[0].cost > budget:
+                    queue.popleft()
+                if not queue:
+                    active.remove(t)
+                    continue
+                c = queue.popleft()
+                chosen.append(c)
+                budget -= c.cost
+    return budget
+
+
+def select(candidates: dict[str, list[Candidate]], theme_queries: dict[str, list[str]], budget: int) -> tuple[dict[str, list[str]], int]:
+    """
+    Ranks every candidate and packs the best into budget characters: per-source quotas first, then the leftover
+    budget to the best remaining items of any source. Returns ({source: lines in selection order}, items left out).
+    """
+    everything = [c for cs in candidates.values() for c in cs]
+    rank(everything, theme_queries)
+    present = [s for s, cs in candidates.items() if cs]
+    total_share = sum(SOURCE_SHARES.get(s, 0.2) for s in present) or 1.0
+    chosen: dict[str, list[Candidate]] = {s: [] for s in candidates}
+    left = budget
+    for s in present:
+        quota = int(budget * SOURCE_SHARES.get(s, 0.2) / total_share)
+        left -= quota - _round_robin(candidates[s], min(quota, left), chosen[s])
+    picked = {id(c) for cs in chosen.values() for c in cs}
+    for c in sorted((c for c in everything if id(c) not in picked), key=lambda c: c.score, reverse=True):
+        if c.cost <= left:
+            chosen[c.source].append(c)
+            left -= c.cost
+    selected = sum(len(cs) for cs in chosen.values())
+    return {s: [c.line for c in cs] for s, cs in chosen.items()}, len(everything) - selected
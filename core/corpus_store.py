@@ -0,0 +1,217 @@
+"""
+Local corpus store: every scanned GitHub issue, velocity sample, Tavily result and Reddit post, per target, in SQLite
+with an FTS5 full-text index over titles and bodies.
+Each save records a run and the latest snapshot per (target, source), so a later run can re-analyse from the store
+without network (main.py --from-store), and the whole history stays searchable (query_corpus.py).
+One file at CORPUS_DB (default .cache/corpus.sqlite3); CORPUS_STORE=0 disables saving.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+
+from core import dedupe
+
+log = logging.getLogger(__name__)
+
+DEFAULT_DB = ".cache/corpus.sqlite3"
+# Concurrent writers (batch mode) wait for each other instead of failing
+BUSY_TIMEOUT_SECONDS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    target TEXT NOT NULL,
+    saved_at TEXT NOT NULL,
+    sources TEXT NOT NULL
+);
+-- Latest snapshot per source: everything but the item lists (repo, counts, velocity metrics, error...)
+CREATE TABLE IF NOT EXISTS snapshots (
+    target TEXT NOT NULL,
+    source TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    meta TEXT NOT NULL,
+    PRIMARY KEY (target, source)
+);
+CREATE TABLE IF NOT EXISTS items (
+    target TEXT NOT NULL,
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    url TEXT,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    first_run INTEGER NOT NULL,
+    last_run INTEGER NOT NULL,
+    -- Order within the last snapshot
+    position INTEGER NOT NULL,
+    UNIQUE (target, source, key)
+);
+CREATE INDEX IF NOT EXISTS items_snapshot ON items (target, source, last_run, position);
+CREATE TABLE IF NOT EXISTS velocity_samples (
+    target TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    title TEXT,
+    url TEXT,
+    type TEXT,
+    hours_to_first_response REAL,
+    run_id INTEGER NOT NULL,
+    PRIMARY KEY (target, repo, number)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    title, body, content='items', content_rowid='rowid', tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts (rowid, title, body) VALUES (new.rowid, new.title, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, title, body) VALUES ('delete', old.rowid, old.title, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE OF title, body ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, title, body) VALUES ('delete', old.rowid, old.title, old.body);
+    INSERT INTO items_fts (rowid, title, body) VALUES (new.rowid, new.title, new.body);
+END;
+"""
+
+# Per source: the result key holding its items, and (key, title, body, url, updated_at) of one item
+_ITEMS = {
+    "github": ("scanned_issues", lambda i: (str(i["number"]), i.get("title") or "", i.get("body") or "", i.get("url"), i.get("updated_at"))),
+    "tavily": ("results", lambda r: (dedupe.canonical_url(r["url"]), r.get("title") or "", r.get("content") or "", r["url"], None)),
+    "reddit": ("posts", lambda p: (p["id"], p.get("title") or "", p.get("body") or "", p.get("url"), p.get("created_at"))),
+}
+# Derived lists, rebuilt from the items on load rather than stored twice
+_DERIVED = {"github": ("issues", "velocity_sample_details", "analytics")}
+
+_init_lock = threading.Lock()
+_initialised: set[str] = set()
+
+
+def db_path() -> Path:
+    return Path(os.getenv("CORPUS_DB", DEFAULT_DB))
+
+
+def enabled() -> bool:
+    return os.getenv("CORPUS_STORE", "1") != "0"
+
+
+def _connect() -> sqlite3.Connection:
+    """A new connection per call (sqlite3 connections are per thread); schema created once per process."""
+    path = db_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS)
+    conn.row_factory = sqlite3.Row
+    with _init_lock:
+        if str(path) not in _initialised:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _initialised.add(str(path))
+    return conn
+
+
+def save(target: str, results: dict) -> int:
+    """
+    Stores one run's scanner outputs ({source: result}); sources with an error are skipped (the previous snapshot stays).
+    Items are upserted: the full history is kept, the snapshot points at this run. Returns the run id.
+    """
+    sources = {s: r for s, r in results.items() if s in _ITEMS and not r.get("error")}
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    with closing(_connect()) as conn, conn:
+        run_id = conn.execute("INSERT INTO runs (target, saved_at, sources) VALUES (?, ?, ?)", (target, now, json.dumps(list(sources)))).lastrowid
+        counts = {}
+        for source, result in sources.items():
+            list_key, fields = _ITEMS[source]
+            items = result.get(list_key) or []
+
+            def rows(items=items, source=source, fields=fields):
+                # A generator: streaming scans hand over spilled item lists (core.issue_stream)
+                for position, item in enumerate(items):
+                    key, title, body, url, updated_at = fields(item)
+                    yield (target, source, key, title, body, url, updated_at, json.dumps(item), run_id, run_id, position)
+
+            conn.executemany(
+                """INSERT INTO items (target, source, key, title, body, url, updated_at, data, first_run, last_run, position)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (target, source, key) DO UPDATE SET
+                     title = excluded.title, body = excluded.body, url = excluded.url, updated_at = excluded.updated_at,
+                     data = excluded.data, last_run = excluded.last_run, position = excluded.position""",
+                rows(),
+            )
+            meta = {k: v for k, v in result.items() if k != list_key and k not in _DERIVED.get(source, ())}
+            conn.execute(
+                "INSERT INTO snapshots (target, source, run_id, meta) VALUES (?, ?, ?, ?) ON CONFLICT (target, source) DO UPDATE SET run_id = excluded.run_id, meta = excluded.meta",
+                (target, source, run_id, json.dumps(meta)),
+            )
+            if source == "github":
+                conn.executemany(
+                    """INSERT INTO velocity_samples (target, repo, number, title, url, type, hours_to_first_response, run_id)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (target, repo, number) DO UPDATE SET title = excluded.title, type = excluded.type,
+                         hours_to_first_response = excluded.hours_to_first_response, run_id = excluded.run_id""",
+                    [(target, result.get("repo", ""), s["number"], s["title"], s["url"], s["type"], s["hours_to_first_response"], run_id) for s in result.get("velocity_sample_details") or []],
+                )
+            counts[source] = len(items)
+    log.info("Corpus store: run %d saved for %s (%s) in %s.", run_id, target, ", ".join(f"{s} {n} items" for s, n in counts.items()) or "no sources", db_path())
+    return run_id
+
+
+def load(target: str, sources: list[str] | None = None) -> dict:
+    """
+    The latest stored snapshot per source as scanner-shaped outputs ({source: result}); GitHub results carry the
+    stored issue records in "scanned_issues" (keyword matching and velocity are redone by the caller).
+    """
+    out: dict = {}
+    with closing(_connect()) as conn:
+        snapshots = conn.execute("SELECT source, run_id, meta FROM snapshots WHERE target = ?", (target,)).fetchall()
+        for snap in snapshots:
+            source = snap["source"]
+            if source not in _ITEMS or (sources is not None and source not in sources):
+                continue
+            list_key, _ = _ITEMS[source]
+            rows = conn.execute(
+                "SELECT data FROM items WHERE target = ? AND source = ? AND last_run = ? ORDER BY position",
+                (target, source, snap["run_id"]),
+            ).fetchall()
+            result = json.loads(snap["meta"])
+            result[list_key] = [json.loads(r["data"]) for r in rows]
+            out[source] = result
+    return out
+
+
+def search(query: str, target: str | None = None, source: str | None = None, limit: int = 20) -> list[dict]:
+    """
+    Full-text search over every stored item (all runs), best matches first (BM25).
+    query uses FTS5 syntax: words, "exact phrase", OR / NOT, prefix*, title:word. Raises ValueError on bad syntax.
+    """
+    sql = """SELECT i.target, i.source, i.key, i.title, i.url, i.updated_at,
+                    snippet(items_fts, 1, '[', ']', '...', 16) AS snippet, bm25(items_fts) AS rank
+             FROM items_fts JOIN items i ON i.rowid = items_fts.rowid
+             WHERE items_fts MATCH ?"""
+    params: list = [query]
+    if target:
+        sql += " AND i.target = ?"
+        params.append(target)
+    if source:
+        sql += " AND i.source = ?"
+        params.append(source)
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+    with closing(_connect()) as conn:
+        try:
+            return [dict(r) for r in conn.execute(sql, params).fetchall()]
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query {query!r}: {e}") from e
+
+
+def stats() -> list[dict]:
+    """Items per (target, source), with the latest run."""
+    with closing(_connect()) as conn:
+        return [dict(r) for r in conn.execute(
+            "SELECT target, source, COUNT(*) AS items, MAX(last_run) AS last_run FROM items GROUP BY target, source ORDER BY target, source"
+        ).fetchall()]
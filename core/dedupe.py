@@ -0,0 +1,145 @@
+"""
+Duplicate elimination for scanned content: URL canonicalisation + SimHash near-duplicate detection.
+Catches tracking-parameter variants, mirrored threads (old./m. reddit) and syndicated or copy-pasted text
+before it reaches the LLM context.
+"""
+
+import hashlib
+import logging
+import re
+from collections.abc import Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+log = logging.getLogger(__name__)
+
+# Query parameters that never change the content of a page
+# Click / campaign tracking only: generic names such as ref, source or context select content on many sites
+# (a GitHub ?ref= branch, a Reddit ?context= thread view) and are kept
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "ref_src", "ref_url", "si", "share", "_hsenc", "_hsmi"}
+TRACKING_PREFIXES = ("utm_", "mc_")
+# Mirrors of the same host
+HOST_ALIASES = {
+    "old.reddit.com": "reddit.com",
+    "np.reddit.com": "reddit.com",
+    "m.reddit.com": "reddit.com",
+    "new.reddit.com": "reddit.com",
+    "mobile.twitter.com": "twitter.com",
+    "x.com": "twitter.com",
+    "m.youtube.com": "youtube.com",
+}
+
+# 64-bit fingerprints; texts within this Hamming distance are near-duplicates. Kept strict: short snippets
+# drift by several bits on small edits, so only copies / syndicated text with minor changes collapse.
+SIMHASH_BITS = 64
+SIMHASH_DISTANCE = 3
+# Below this many tokens, fingerprints are too noisy to compare
+MIN_TOKENS = 8
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def canonical_url(url: str) -> str:
+    """https, lowercase host without www./mirror prefixes, no fragment, no tracking params, sorted query, no trailing slash."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    host = HOST_ALIASES.get(host, host)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    scheme = "https" if parts.scheme in ("http", "https") else parts.scheme
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def _hash64(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> int | None:
+    """SimHash over word bigrams; None if the text is too short to fingerprint."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < MIN_TOKENS:
+        return None
+    weights = [0] * SIMHASH_BITS
+    for k in range(len(tokens) - 1):
+        h = _hash64(" ".join(tokens[k:k + 2]))
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, w in enumerate(weights) if w > 0)
+
+
+def _bands(fingerprint: int) -> list[tuple[int, int]]:
+    # Distance <= 3 over 64 bits => at least one of 4 16-bit bands is identical (pigeonhole)
+    width = SIMHASH_BITS // (SIMHASH_DISTANCE + 1)
+    mask = (1 << width) - 1
+    return [(b, fingerprint >> (b * width) & mask) for b in range(SIMHASH_DISTANCE + 1)]
+
+
+class NearDuplicateIndex:
+    """SimHash fingerprints of the texts seen so far, banded for lookup; each maps to its owner (any object)."""
+
+    def __init__(self):
+        self._fingerprints: list[int] = []
+        self._owners: list = []
+        self._bands: dict[tuple[int, int], list[int]] = {}
+
+    def find(self, fp: int):
+        """Owner of a near-identical text already added, or None."""
+        for band in _bands(fp):
+            for idx in self._bands.get(band, []):
+                if bin(self._fingerprints[idx] ^ fp).count("1") <= SIMHASH_DISTANCE:
+                    return self._owners[idx]
+        return None
+
+    def add(self, fp: int, owner) -> None:
+        for band in _bands(fp):
+            self._bands.setdefault(band, []).append(len(self._fingerprints))
+        self._fingerprints.append(fp)
+        self._owners.append(owner)
+
+
+def dedupe(
+    items: list[dict],
+    text: Callable[[dict], str],
+    url: Callable[[dict], str] | None = None,
+    key: Callable[[dict], object] | None = None,
+) -> tuple[list[dict], dict]:
+    """
+    Keeps the first of each group of items sharing a canonical URL or near-identical text (input order preserved).
+    Kept items that absorbed others get "duplicates": [key(dup) or canonical url of dup, ...].
+    Returns (kept, {"url": n collapsed by URL, "content": n collapsed by text}).
+    """
+    kept: list[dict] = []
+    by_url: dict[str, dict] = {}
+    index = NearDuplicateIndex()
+    collapsed = {"url": 0, "content": 0}
+
+    def absorb(owner: dict, dup: dict, dup_url: str | None) -> None:
+        owner.setdefault("duplicates", []).append(key(dup) if key else dup_url)
+
+    for item in items:
+        item_url = canonical_url(url(item)) if url and url(item) else None
+        if item_url and item_url in by_url:
+            absorb(by_url[item_url], item, item_url)
+            collapsed["url"] += 1
+            continue
+        fp = simhash(text(item))
+        owner = index.find(fp) if fp is not None else None
+        if owner is not None:
+            absorb(owner, item, item_url)
+            collapsed["content"] += 1
+            if item_url:
+                by_url[item_url] = owner
+            continue
+        kept.append(item)
+        if item_url:
+            by_url[item_url] = item
+        if fp is not None:
+            index.add(fp, item)
+    return kept, collapsed
@@ -0,0 +1,123 @@
+"""
+Small on-disk key/value cache: one JSON file per entry, age (TTL) and total-size eviction.
+Least recently used entries are evicted first (a hit refreshes the file mtime). Thread-safe.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+
+class DiskCache:
+    def __init__(self, directory: str | Path, max_bytes: int, max_age_seconds: float | None = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._total_bytes = sum(e.stat().st_size for e in os.scandir(self.directory) if e.name.endswith(".json"))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def _expired(self, mtime: float, now: float) -> bool:
+        return self.max_age_seconds is not None and now - mtime > self.max_age_seconds
+
+    def get(self, key: str, fresh: Callable[[dict], bool] | None = None) -> dict | None:
+        """
+        Returns the stored value, or None if missing, older than max_age_seconds or rejected by fresh(value) (such
+        entries are removed). Counts a hit/miss.
+        """
+        path = self._path(key)
+        try:
+            st = path.stat()
+            if self._expired(st.st_mtime, time.time()):
+                self._remove(path, st.st_size)
+                value = None
+            else:
+                value = json.loads(path.read_text(encoding="utf-8"))
+                if fresh is None or fresh(value):
+                    os.utime(path)
+                else:
+                    self._remove(path, st.st_size)
+                    value = None
+        except (OSError, ValueError):
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: dict) -> None:
+        data = json.dumps(value).encode("utf-8")
+        path = self._path(key)
+        try:
+            old_size = path.stat().st_size
+        except OSError:
+            old_size = 0
+        # Atomic replace: concurrent readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._total_bytes += len(data) - old_size
+            over = self._total_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drops expired entries, then least recently used ones until under 90% of max_bytes. Returns entries removed."""
+        now = time.time()
+        entries = []
+        for e in os.scandir(self.directory):
+            if e.name.endswith(".json"):
+                try:
+                    st = e.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, Path(e.path)))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if not self._expired(mtime, now) and total <= self.max_bytes * 0.9:
+                continue
+            if self._remove(path, size):
+                total -= size
+                removed += 1
+        with self._lock:
+            self._total_bytes = total
+        if removed:
+            log.debug("Cache %s: evicted %d entries (%d bytes left).", self.directory, removed, total)
+        return removed
+
+    def _remove(self, path: Path, size: int) -> bool:
+        try:
+            path.unlink()
+        except OSError:
+            return False
+        with self._lock:
+            self._total_bytes -= size
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "bytes": self._total_bytes}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
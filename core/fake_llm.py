@@ -0,0 +1,84 @@
+"""
+Local deterministic stand-in for the Mistral chat model (LLM_PROVIDER=fake).
+Returns canned, well-formed responses built from the prompt, so the pipeline and the parsing path
+(score regex, red flags, sections) run offline and repeatably. Mimics the LangChain chat model interface.
+"""
+
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+MODEL = "fake-analyst"
+
+
+@dataclass
+class FakeMessage:
+    content: str
+    usage_metadata: dict = field(default_factory=dict)
+
+
+def _refs(prompt: str, limit: int) -> list[str]:
+    # Issue numbers cited in the prompt, first seen first
+    refs: list[str] = []
+    for m in re.finditer(r"#(\d+)", prompt):
+        ref = f"#{m.group(1)}"
+        if ref not in refs:
+            refs.append(ref)
+        if len(refs) >= limit:
+            break
+    return refs
+
+
+def _report(prompt: str) -> str:
+    refs = _refs(prompt, 10) or ["(no issue references)"]
+    flags = [
+        "Stability: crash / panic reports",
+        "Memory: OOM and unbounded RAM usage",
+        "Sovereignty: default routing to OpenAI",
+        "Performance: p95 latency at scale",
+        "Responsiveness: slow first response on bugs",
+    ]
+    lines = ["## Summary", "- Community confidence score: 6/10", "- Deterministic fake analysis (LLM_PROVIDER=fake): no model was called.", "", "## Red Flags (Social)"]
+    for k, flag in enumerate(flags):
+        lines.append(f"{k + 1}. {flag} ({refs[k % len(refs)]})")
+    lines += [
+        "",
+        "## Market Positioning",
+        "- Strengths: developer experience, self-hosting (fake).",
+        "- Weaknesses: stability at scale (fake).",
+        "",
+        "## Correlation Lab vs Social",
+        "- Rust panic/crash: Partially (fake).",
+        "- OpenAI/default routing: Partially (fake).",
+        "- p95 degradation: Partially (fake).",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def _summary(prompt: str) -> str:
+    refs = _refs(prompt, 5)
+    return "\n".join([
+        f"- Recurring problems: crash / panic reports ({', '.join(refs) or 'no issue references'}).",
+        "- Sentiment: mixed (fake summary, LLM_PROVIDER=fake).",
+    ])
+
+
+class FakeChatModel:
+    def __init__(self, model: str = MODEL):
+        self.model = model
+
+    def _respond(self, prompt: str) -> str:
+        # The final analysis prompt asks for the report sections; anything else is a map/summary prompt
+        return _report(prompt) if "## Red Flags (Social)" in prompt else _summary(prompt)
+
+    def invoke(self, prompt: str) -> FakeMessage:
+        content = self._respond(prompt)
+        return FakeMessage(content, {"input_tokens": len(prompt) // 4, "output_tokens": len(content) // 4})
+
+    def stream(self, prompt: str) -> Iterator[FakeMessage]:
+        """The invoke() response in line-sized chunks, usage on the last one (as LangChain chat models stream)."""
+        msg = self.invoke(prompt)
+        lines = msg.content.splitlines(keepends=True)
+        for k, line in enumerate(lines):
+            yield FakeMessage(line, msg.usage_metadata if k == len(lines) - 1 else {})
@@ -0,0 +1,175 @@
+"""
+Persistent conditional-request cache for GitHub REST calls made through PyGithub.
+GET responses are stored on disk with their ETag / Last-Modified; the next identical request is sent with
+If-None-Match / If-Modified-Since and a 304 (free: not counted against the rate limit) is replayed from disk.
+Enabled by default; settings via env: GITHUB_CACHE (0 to disable), GITHUB_CACHE_DIR, GITHUB_CACHE_MAX_MB,
+GITHUB_CACHE_MAX_AGE_DAYS. Every request (cached or not) is also counted in core.metrics, with its rate-limit headers,
+and sent through the token scheduler (core.github_tokens).
+"""
+
+import logging
+import os
+import threading
+
+import requests
+from github.Requester import HTTPRequestsConnectionClass, HTTPSRequestsConnectionClass, Requester
+
+from core import github_tokens, metrics
+from core.disk_cache import DiskCache
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = ".cache/github"
+DEFAULT_MAX_MB = 200
+DEFAULT_MAX_AGE_DAYS = 7
+
+_cache: DiskCache | None = None
+_installed = False
+_install_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "uncached": 0}
+# With injected connection classes PyGithub builds one connection per request: share the pooled sessions
+_sessions: dict[str, requests.Session] = {}
+
+
+class _CachedResponse:
+    # mimic github.Requester.RequestsResponse for a replayed 304
+    def __init__(self, status: int, headers: dict[str, str], body: str):
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    def getheaders(self):
+        return self.headers.items()
+
+    def read(self) -> str:
+        return self._body
+
+
+class _ConditionalMixin:
+    def _share_session(self) -> None:
+        with _install_lock:
+            shared = _sessions.setdefault(self.protocol, self.session)
+        if shared is not self.session:
+            self.session.close()
+            self.session = shared
+
+    def close(self) -> None:
+        # The session is shared with other connections
+        pass
+
+    def getresponse(self):
+        try:
+            response = self._getresponse()
+        except Exception:
+            metrics.http_call("github", error=True)
+            raise
+        metrics.rate_limit_headers("github", response.headers)
+        if isinstance(response, _CachedResponse):
+            metrics.http_call("github", cached=True)
+        else:
+            # Streamed bodies are not read here
+            body = 0 if getattr(self, "stream", False) else len(response.response.content)
+            metrics.http_call("github", body, error=response.status >= 400)
+        return response
+
+    def _send(self):
+        # Token choice, pacing and rate-limit retries
+        return github_tokens.send(self, super().getresponse)
+
+    def _getresponse(self):
+        if _cache is None or self.verb != "GET" or getattr(self, "stream", False):
+            _count("uncached")
+            return self._send()
+        # The token that sends the request is only chosen later (github_tokens.send), so entries are shared by every
+        # token of the pool: GITHUB_TOKENS are assumed to be one identity (same visibility). Anonymous responses
+        # are kept apart. Each hit is revalidated by GitHub with the token actually used (If-None-Match)
+        auth = "token" if self.headers.get("Authorization") else "anonymous"
+        key = f"{self.protocol}://{self.host}:{self.port}{self.url}|{auth}"
+        entry = _cache.get(key)
+        if entry:
+            self.headers = dict(self.headers)
+            if entry.get("etag"):
+                self.headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                self.headers["If-Modified-Since"] = entry["last_modified"]
+        response = self._send()
+        if response.status == 304 and entry:
+            _count("hits")
+            # Fresh headers (rate limit) on top of the stored ones
+            headers = dict(entry["headers"])
+            headers.update(response.headers)
+            return _CachedResponse(entry["status"], headers, entry["body"])
+        _count("misses")
+        if response.status == 200:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                _cache.set(key, {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "status": response.status,
+                    "headers": dict(response.headers),
+                    "body": response.read(),
+                })
+        return response
+
+
+class CachingHTTPSConnection(_ConditionalMixin, HTTPSRequestsConnectionClass):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._share_session()
+
+
+class CachingHTTPConnection(_ConditionalMixin, HTTPRequestsConnectionClass):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._share_session()
+
+
+def _count(kind: str) -> None:
+    with _stats_lock:
+        _stats[kind] += 1
+
+
+def install() -> None:
+    """
+    Routes PyGithub requests through the cache (idempotent). Must run before Github clients are created.
+    With GITHUB_CACHE=0 requests still go through these connections (for metrics) but are never cached.
+    """
+    global _cache, _installed
+    with _install_lock:
+        if _installed:
+            return
+        _installed = True
+        Requester.injectConnectionClasses(CachingHTTPConnection, CachingHTTPSConnection)
+        if os.getenv("GITHUB_CACHE", "1") == "0":
+            return
+        max_age_days = float(os.getenv("GITHUB_CACHE_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS))
+        _cache = DiskCache(
+            os.getenv("GITHUB_CACHE_DIR", DEFAULT_CACHE_DIR),
+            max_bytes=int(float(os.getenv("GITHUB_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024),
+            max_age_seconds=max_age_days * 86400,
+        )
+        log.info("GitHub HTTP cache enabled: %s (max %s MB, max age %s days).", _cache.directory, os.getenv("GITHUB_CACHE_MAX_MB", DEFAULT_MAX_MB), max_age_days)
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        for k in _stats:
+            _stats[k] = 0
+
+
+def stats() -> dict:
+    """hits: 304 replays, misses: full responses, uncached: non-GET (GraphQL) or cache disabled."""
+    with _stats_lock:
+        out = dict(_stats)
+    out["bytes_on_disk"] = _cache.stats()["bytes"] if _cache is not None else 0
+    return out
+
+
+def log_summary() -> None:
+    s = stats()
+    total = s["hits"] + s["misses"]
+    rate = 100.0 * s["hits"] / total if total else 0.0
+    log.info("GitHub HTTP cache: %d hits (304), %d misses, %d uncached; hit rate %.0f%%, %.1f MB on disk.", s["hits"], s["misses"], s["uncached"], rate, s["bytes_on_disk"] / (1024 * 1024))
@@ -0,0 +1,44 @@
+"""
+GitHub client factory shared by the GitHub scanner modules.
+PyGithub's Requester shares a single connection object, so each thread gets its own client.
+GITHUB_API_URL points the clients at another API root (GitHub Enterprise, or the benchmark's local stand-in).
+Pacing and rate-limit retries are left to core.github_tokens (PyGithub's fixed sleeps and retry-until-reset are off).
+"""
+
+import os
+import threading
+
+from github import Github
+from urllib3.util.retry import Retry
+
+from core import github_cache, github_tokens
+
+# 100 is the API maximum page size
+PER_PAGE = 100
+# Transport retries for server errors only: 403 / 429 go back to the scheduler, which switches tokens
+_RETRY = Retry(total=3, backoff_factor=1.0, status_forcelist=(500, 502, 503, 504), allowed_methods=None, raise_on_status=False)
+
+_local = threading.local()
+
+
+def client() -> Github:
+    """
+    Returns this thread's Github client (first configured token, if any; the scheduler picks the token of each
+    request). Lazy: objects are not fetched until used.
+    """
+    gh = getattr(_local, "gh", None)
+    if gh is None:
+        github_cache.install()
+        kwargs = {"base_url": os.environ["GITHUB_API_URL"]} if os.getenv("GITHUB_API_URL") else {}
+        tokens = github_tokens.tokens()
+        gh = Github(
+            tokens[0] if tokens else None,
+            per_page=PER_PAGE,
+            lazy=True,
+            retry=_RETRY,
+            seconds_between_requests=None,
+            seconds_between_writes=None,
+            **kwargs,
+        )
+        _local.gh = gh
+    return gh
@@ -1,100 +1,232 @@
 """
 GitHub scanner: fetches and filters issues from the target repo.
 Only invoked when "github" is in config TARGET["sources"].
+Incremental by default: issues changed since the last run's high-water mark are fetched and merged into
+the stored corpus (core.github_state) before keyword matching and velocity.
 """
 
+import heapq
 import logging
-import os
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Iterator
 
-from github import Github
+from github.Issue import Issue
+
+from core import concurrency, dedupe, github_cache, github_state, github_tokens, github_velocity, issue_analytics, issue_stream, metrics
+from core.keyword_matcher import get_matcher
+from core.github_client import PER_PAGE, client
 
 log = logging.getLogger(__name__)
 
-# Only consider issues updated in the last 12 months (avoid 2018-era noise)
+# Only consider issues updated in the last 12 months (avoid 2018-era noise); TARGET["github"]["lookback_months"] overrides
 ISSUES_LOOKBACK_MONTHS = 12
 
+# Most recently updated issues kept per scan (TARGET["github"]["max_issues"] overrides)
+DEFAULT_MAX_ISSUES = 300
+
+# Issue pages requested in parallel (sliding window)
+FETCH_WORKERS = 4
+
+# Keywords must start a word: "crash" matches "crashes", "OOM" does not match "room"
+KEYWORD_BOUNDARY = "start"
+
+# Streaming scans: issues held in memory while their first responses are fetched, and slowest samples kept
+STREAM_BATCH = 2000
+STREAM_VELOCITY_DETAILS = 100
+
+
+def _fetch_page(repo: str, page: int, since: datetime | None = None) -> list[Issue]:
+    kwargs = {"since": since} if since else {}
+    with concurrency.slot():
+        return client().get_repo(repo).get_issues(state="all", sort="updated", **kwargs).get_page(page)
+
 
-def run(repo: str, keywords: dict, max_issues: int = 300) -> dict:
+def _iter_issue_pages(repo: str, workers: int, since: datetime | None = None) -> Iterator[list[Issue]]:
     """
-    Fetches issues from the repo (updated in the last 12 months), filters by keywords, computes velocity metrics.
-    Returns a dict with raw issues (title, body, labels, dates) and velocity stats.
+    Yields issue pages in order (most recently updated first), keeping `workers` page requests in flight.
+    No new page is requested once the consumer stops iterating or the last page has been seen.
     """
-    cutoff = datetime.now(timezone.utc) - timedelta(days=ISSUES_LOOKBACK_MONTHS * 31)
-    log.info("Connecting to GitHub (token=%s)", "set" if os.getenv("GITHUB_TOKEN") else "not set")
-    token = os.getenv("GITHUB_TOKEN") or None
-    gh = Github(token)
-    repo_obj = gh.get_repo(repo)
-    log.info("Repo: %s. Fetching up to %d issues (open+closed), updated in the last %d months, sorted by updated.", repo, max_issues, ISSUES_LOOKBACK_MONTHS)
-
-    # Flatten all keywords for matching
-    all_keywords = []
-    for kws in keywords.values():
-        all_keywords.extend(kws)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gh-pages")
+    fetch = metrics.propagate(_fetch_page)
+    pending = deque(pool.submit(fetch, repo, p, since) for p in range(workers))
+    next_page = workers
+    try:
+        while pending:
+            page = pending.popleft().result()
+            if len(page) < PER_PAGE:
+                # Short page = last page: drop anything requested past it
+                for f in pending:
+                    f.cancel()
+                pending.clear()
+            else:
+                pending.append(pool.submit(fetch, repo, next_page, since))
+                next_page += 1
+            if page:
+                yield page
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
-    issues_by_category: dict[str, list] = {k: [] for k in keywords}
-    velocity_bug_hours: list[float] = []
-    velocity_other_hours: list[float] = []
-    velocity_sample_details: list[dict] = []  # List of issues used for the average
 
-    # Cap velocity sampling: avoid 1 API call per issue (get_comments)
-    max_velocity_samples = 25
-    velocity_samples_done = 0
+def _iter_recent_issues(repo: str, cutoff: datetime, max_issues: int, since: datetime | None = None, workers: int = FETCH_WORKERS) -> Iterator[Issue]:
+    """
+    Yields up to max_issues issues (pull requests excluded) updated after cutoff (and since, if given), most recent first.
+    Results are sorted by updated, so the first issue older than cutoff ends the scan.
+    """
+    if max_issues <= 0:
+        return
+    pages = _iter_issue_pages(repo, workers, since)
+    count = 0
+    try:
+        for page in pages:
+            for issue in page:
+                # Not issue.pull_request: listed issues omit that key, and reading it fetches the whole issue
+                if "/pull/" in (issue.html_url or ""):
+                    continue
+                if issue.updated_at:
+                    u = issue.updated_at
+                    u_utc = u if u.tzinfo else u.replace(tzinfo=timezone.utc)
+                    if u_utc < cutoff:
+                        return
+                yield issue
+                count += 1
+                if count >= max_issues:
+                    return
+    finally:
+        pages.close()
+
+
+def _record(issue: Issue) -> dict:
+    """Plain, JSON-serialisable issue record (full body: matching runs on it; truncated on output)."""
+    return {
+        "number": issue.number,
+        "node_id": issue.node_id,
+        "title": issue.title,
+        "body": issue.body or "",
+        "state": issue.state,
+        "created_at": issue.created_at.isoformat() if issue.created_at else None,
+        "updated_at": issue.updated_at.isoformat() if issue.updated_at else None,
+        "closed_at": issue.closed_at.isoformat() if issue.closed_at else None,
+        "labels": [l.name for l in (issue.labels or [])],
+        "url": issue.html_url,
+        "comments": issue.comments,
+    }
+
+
+def _updated(record: dict) -> datetime:
+    u = datetime.fromisoformat(record["updated_at"]) if record.get("updated_at") else datetime.min
+    return u if u.tzinfo else u.replace(tzinfo=timezone.utc)
+
+
+def run(repo: str, keywords: dict, max_issues: int = DEFAULT_MAX_ISSUES, incremental: bool = True, lookback_months: int = ISSUES_LOOKBACK_MONTHS, streaming: bool = False) -> dict:
+    """
+    Fetches issues from the repo (updated in the last lookback_months), filters by keywords, computes velocity metrics
+    and activity analytics (core.issue_analytics).
+    With incremental=True, only issues updated since the previous run are fetched and merged into the stored corpus.
+    With streaming=True, a full scan with bounded memory instead (see _run_streaming).
+    Returns a dict with raw issues (title, body, labels, dates) and velocity stats.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=lookback_months * 31)
+    github_cache.reset_stats()
+    log.info("Connecting to GitHub (%d token(s))", len(github_tokens.tokens()))
+    if streaming:
+        out = _run_streaming(repo, keywords, max_issues, cutoff)
+        github_cache.log_summary()
+        github_tokens.log_summary()
+        return out
+
+    state = github_state.load(repo) if incremental else None
+    since = None
+    corpus: dict[int, dict] = {}
+    if state:
+        hwm = datetime.fromisoformat(state["high_water_mark"])
+        # Full scan when the window or max_issues grew (the stored corpus was trimmed to the old ones) or the stored
+        # records predate closed_at
+        covered = (state.get("lookback_months") or ISSUES_LOOKBACK_MONTHS) >= lookback_months and (state.get("max_issues") or 0) >= max_issues
+        if hwm >= cutoff and covered and all("closed_at" in r for r in state["issues"].values()):
+            since = hwm
+            corpus = state["issues"]
+    if since:
+        log.info("Repo: %s. Incremental scan: fetching issues updated since %s (%d stored issues).", repo, since.isoformat(), len(corpus))
+    else:
+        log.info("Repo: %s. Fetching up to %d issues (open+closed), updated in the last %d months, sorted by updated (%d pages in parallel).", repo, max_issues, lookback_months, FETCH_WORKERS)
 
     count = 0
-    for issue in repo_obj.get_issues(state="all", sort="updated"):
-        if count >= max_issues:
-            break
-        if issue.pull_request:
+    with metrics.timed("github.fetch"):
+        for issue in _iter_recent_issues(repo, cutoff, max_issues, since=since):
+            count += 1
+            if count % 50 == 0:
+                log.info("  Fetched %d issues so far.", count)
+            record = _record(issue)
+            previous = corpus.get(record["number"])
+            # A first comment never changes once seen: keep it across updates
+            if previous and previous.get("first_response_at"):
+                record["first_response_at"] = previous["first_response_at"]
+            corpus[record["number"]] = record
+
+    # Rolling window: drop issues that aged out, keep the max_issues most recently updated
+    issues_all = sorted((r for r in corpus.values() if _updated(r) >= cutoff), key=_updated, reverse=True)[:max_issues]
+    if since:
+        log.info("  %d changed issues fetched, merged corpus: %d issues.", count, len(issues_all))
+
+    # Velocity over every issue in the window; first comments are only fetched for issues that lack one
+    missing = [r for r in issues_all if r["comments"] and not r.get("first_response_at")]
+    with metrics.timed("github.velocity"):
+        first_responses, velocity_failed, gone = github_velocity.fetch_first_responses(repo, missing)
+    for r in missing:
+        r["first_response_at"] = first_responses.get(r["number"])
+    if gone:
+        # Deleted or transferred since they were stored: prune them, or their batches would be re-queried every run
+        log.info("  %d issues no longer exist, dropped from the corpus.", len(gone))
+        issues_all = [r for r in issues_all if r["number"] not in gone]
+
+    if incremental:
+        # issues_all is sorted by updated: the first one is the new high-water mark
+        github_state.save(repo, issues_all[0]["updated_at"] if issues_all else None, issues_all, lookback_months, max_issues)
+
+    out = summarise(repo, keywords, issues_all, velocity_failed)
+    vm = out["velocity_metrics"]
+    log.info("GitHub scan finished: %d issues fetched, %d in window, %d matched. By category: %s. Velocity sample: %d (bugs) + %d (other), %d failed.", count, len(issues_all), len(out["issues"]), out["issues_by_category"], vm["sample_bugs"], vm["sample_other"], velocity_failed)
+    github_cache.log_summary()
+    github_tokens.log_summary()
+    return out
+
+
+def _matched_item(r: dict, matched: dict[str, list[str]]) -> dict:
+    """The analyzer's view of a matched issue (body truncated)."""
+    return {
+        "number": r["number"],
+        "title": r["title"],
+        "body": r["body"][:2000],
+        "state": r["state"],
+        "created_at": r["created_at"],
+        "updated_at": r["updated_at"],
+        "labels": r["labels"],
+        "url": r["url"],
+        "categories": list(matched),
+        "matched_terms": [t for terms in matched.values() for t in terms],
+    }
+
+
+def summarise(repo: str, keywords: dict, issues_all: list[dict], velocity_failed: int = 0) -> dict:
+    """
+    Keyword matching, near-duplicate collapsing, velocity and activity analytics over scanned issue records (no network).
+    Used by run() and to re-analyse the stored corpus (core.corpus_store) with another keyword set.
+    """
+    # An issue is listed under every category it matches (e.g. both a panic and OpenAI)
+    matcher = get_matcher(keywords, boundary=KEYWORD_BOUNDARY)
+    issues_by_category: dict[str, list] = {k: [] for k in keywords}
+    categories: dict[int, list[str]] = {}
+    for r in issues_all:
+        matched = matcher.match(f"{r['title'] or ''} {r['body'] or ''}")
+        if not matched:
             continue
-        # Skip issues not updated in the last 12 months
-        if issue.updated_at:
-            u = issue.updated_at
-            u_utc = u if u.tzinfo else u.replace(tzinfo=timezone.utc)
-            if u_utc < cutoff:
-                continue
-        count += 1
-        if count % 50 == 0:
-            matched = sum(len(v) for v in issues_by_category.values())
-            log.info("  Scanned %d issues so far, %d matched by keywords.", count, matched)
-        text = f"{issue.title or ''} {issue.body or ''}".lower()
-        for category, kws in keywords.items():
-            if any(kw.lower() in text for kw in kws):
-                issues_by_category[category].append({
-                    "number": issue.number,
-                    "title": issue.title,
-                    "body": (issue.body or "")[:2000],
-                    "state": issue.state,
-                    "created_at": issue.created_at.isoformat() if issue.created_at else None,
-                    "updated_at": issue.updated_at.isoformat() if issue.updated_at else None,
-                    "labels": [l.name for l in (issue.labels or [])],
-                    "url": issue.html_url,
-                })
-                break
-
-        # Velocity: only on a small sample to avoid hundreds of get_comments() calls
-        if velocity_samples_done < max_velocity_samples:
-            try:
-                comments = list(issue.get_comments())
-                if comments and issue.created_at:
-                    first = min(comments, key=lambda c: c.created_at)
-                    delta = (first.created_at - issue.created_at).total_seconds() / 3600.0
-                    delta_hours = round(delta, 1)
-                    is_bug = any("bug" in (l.name or "").lower() for l in (issue.labels or []))
-                    if is_bug:
-                        velocity_bug_hours.append(delta)
-                    else:
-                        velocity_other_hours.append(delta)
-                    velocity_sample_details.append({
-                        "number": issue.number,
-                        "title": issue.title or "(no title)",
-                        "url": issue.html_url,
-                        "hours_to_first_response": delta_hours,
-                        "type": "bug" if is_bug else "other",
-                    })
-                    velocity_samples_done += 1
-            except Exception:
-                pass
+        categories[r["number"]] = list(matched)
+        item = _matched_item(r, matched)
+        for category in matched:
+            issues_by_category[category].append(item)
 
     # Build flat list for analyzer (dedupe by issue number)
     seen = set()
@@ -104,23 +236,107 @@ def run(repo: str, keywords: dict, max_issues: int = 300) -> dict:
             if i["number"] not in seen:
                 seen.add(i["number"])
                 issues_flat.append(i)
+    # Near-identical reports (copy-pasted panics, re-filed issues) collapse into the first one seen
+    issues_flat, collapsed = dedupe.dedupe(issues_flat, text=lambda i: f"{i['title'] or ''}\n{i['body']}", key=lambda i: i["number"])
+    if collapsed["content"]:
+        log.info("  Collapsed %d near-duplicate issues.", collapsed["content"])
 
-    def avg(hours: list[float]) -> float | None:
-        return sum(hours) / len(hours) if hours else None
-
-    velocity_metrics = {
-        "avg_first_response_hours_bugs": avg(velocity_bug_hours),
-        "avg_first_response_hours_other": avg(velocity_other_hours),
-        "sample_bugs": len(velocity_bug_hours),
-        "sample_other": len(velocity_other_hours),
-    }
-
-    by_cat = {k: len(v) for k, v in issues_by_category.items()}
-    log.info("GitHub scan finished: %d issues fetched, %d matched. By category: %s. Velocity sample: %d (bugs) + %d (other).", count, len(issues_flat), by_cat, len(velocity_bug_hours), len(velocity_other_hours))
+    velocity_sample_details = github_velocity.samples(issues_all)
+    with metrics.timed("github.analytics"):
+        analytics = issue_analytics.analyse(issues_all, categories, list(keywords))
     return {
         "repo": repo,
         "issues": issues_flat,
-        "issues_by_category": by_cat,
-        "velocity_metrics": velocity_metrics,
+        "issues_by_category": {k: len(v) for k, v in issues_by_category.items()},
+        "duplicates_collapsed": collapsed["content"],
+        "velocity_metrics": github_velocity.metrics(velocity_sample_details, velocity_failed),
         "velocity_sample_details": velocity_sample_details,
+        "analytics": analytics,
+        # Every in-window record (full body, first response), for the corpus store
+        "scanned_issues": issues_all,
+    }
+
+
+def _run_streaming(repo: str, keywords: dict, max_issues: int, cutoff: datetime) -> dict:
+    """
+    Full scan in one pass with flat memory: fetch -> first responses (per batch of STREAM_BATCH issues) -> keyword
+    match -> sinks. Scanned records and matched issues go to spilling lists (core.issue_stream), analytics to
+    array columns, velocity to hours arrays and the slowest samples; near-duplicates are collapsed on the fly.
+    Incremental state is neither read nor written. Matched issues come most recently updated first.
+    """
+    log.info("Repo: %s. Streaming scan: up to %d issues (open+closed) updated since %s, first responses per %d issues.", repo, max_issues, cutoff.date().isoformat(), STREAM_BATCH)
+    matcher = get_matcher(keywords, boundary=KEYWORD_BOUNDARY)
+    scanned, matched = issue_stream.SpillList(), issue_stream.SpillList()
+    by_category = dict.fromkeys(keywords, 0)
+    duplicates: dict[int, list[int]] = {}
+    near_duplicates = dedupe.NearDuplicateIndex()
+    columns = issue_analytics.ColumnBuilder(list(keywords))
+    hours = {"bug": array("d"), "other": array("d")}
+    # Min-heap of (hours, number, sample): the STREAM_VELOCITY_DETAILS slowest first responses
+    slowest: list[tuple[float, int, dict]] = []
+    pending: list[issue_stream.IssueRecord] = []
+    count = velocity_failed = 0
+
+    def sink(record: issue_stream.IssueRecord) -> None:
+        r = record.to_dict()
+        scanned.append(r)
+        for sample in github_velocity.samples([r]):
+            hours[sample["type"]].append(sample["hours_to_first_response"])
+            entry = (sample["hours_to_first_response"], sample["number"], sample)
+            if len(slowest) < STREAM_VELOCITY_DETAILS:
+                heapq.heappush(slowest, entry)
+            else:
+                heapq.heappushpop(slowest, entry)
+        found = matcher.match(f"{r['title'] or ''} {r['body'] or ''}")
+        columns.add(r, found or ())
+        if not found:
+            return
+        for category in found:
+            by_category[category] += 1
+        item = _matched_item(r, found)
+        fp = dedupe.simhash(f"{item['title'] or ''}\n{item['body']}")
+        owner = near_duplicates.find(fp) if fp is not None else None
+        if owner is not None:
+            duplicates.setdefault(owner, []).append(item["number"])
+            return
+        if fp is not None:
+            near_duplicates.add(fp, item["number"])
+        matched.append(item)
+
+    def flush() -> None:
+        nonlocal velocity_failed
+        missing = [{"number": r.number, "node_id": r.node_id, "comments": r.comments} for r in pending if r.comments]
+        with metrics.timed("github.velocity"):
+            first_responses, failed, _ = github_velocity.fetch_first_responses(repo, missing)
+        velocity_failed += failed
+        for r in pending:
+            r.first_response_at = first_responses.get(r.number)
+            sink(r)
+        pending.clear()
+
+    with metrics.timed("github.stream"):
+        for issue in _iter_recent_issues(repo, cutoff, max_issues):
+            count += 1
+            pending.append(issue_stream.IssueRecord.from_dict(_record(issue)))
+            if len(pending) >= STREAM_BATCH:
+                flush()
+                log.info("  Streamed %d issues so far (%d matched, %.1f MB spilled to disk).", count, len(matched), (scanned.spilled_bytes + matched.spilled_bytes) / (1024 * 1024))
+        flush()
+
+    matched.map(lambda i: {**i, "duplicates": duplicates[i["number"]]} if i["number"] in duplicates else i)
+    collapsed = sum(len(d) for d in duplicates.values())
+    with metrics.timed("github.analytics"):
+        analytics = issue_analytics.analyse_columns(columns.build())
+    vm = github_velocity.metrics_from_hours(hours["bug"], hours["other"], velocity_failed)
+    log.info("GitHub streaming scan finished: %d issues, %d matched (%d near-duplicates collapsed). By category: %s. Velocity sample: %d (bugs) + %d (other), %d failed. %.1f MB spilled to disk.", count, len(matched), collapsed, by_category, vm["sample_bugs"], vm["sample_other"], velocity_failed, (scanned.spilled_bytes + matched.spilled_bytes) / (1024 * 1024))
+    return {
+        "repo": repo,
+        "issues": matched,
+        "issues_by_category": by_category,
+        "duplicates_collapsed": collapsed,
+        "velocity_metrics": vm,
+        # Only the slowest samples: the report lists a few of them
+        "velocity_sample_details": [sample for _, _, sample in sorted(slowest, reverse=True)],
+        "analytics": analytics,
+        "scanned_issues": scanned,
     }
@@ -0,0 +1,56 @@
+"""
+Per-repo state for incremental GitHub scans: the newest issue updated_at seen (high-water mark)
+and the stored issue corpus, so later runs only fetch issues changed since then.
+One JSON file per repo under GITHUB_STATE_DIR (default .cache/github_state).
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+DEFAULT_STATE_DIR = ".cache/github_state"
+
+
+def _path(repo: str) -> Path:
+    return Path(os.getenv("GITHUB_STATE_DIR", DEFAULT_STATE_DIR)) / f"{repo.replace('/', '__')}.json"
+
+
+def load(repo: str) -> dict | None:
+    """Returns {"repo", "high_water_mark", "lookback_months", "max_issues", "issues": {number: record}} or None if no usable state."""
+    path = _path(repo)
+    if not path.exists():
+        return None
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring unreadable GitHub state %s: %s", path, e)
+        return None
+    if state.get("repo") != repo or not state.get("high_water_mark"):
+        return None
+    state["issues"] = {int(n): r for n, r in (state.get("issues") or {}).items()}
+    return state
+
+
+def save(repo: str, high_water_mark: str | None, issues: list[dict], lookback_months: int | None = None, max_issues: int | None = None) -> Path:
+    path = _path(repo)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = json.dumps({
+        "repo": repo,
+        "high_water_mark": high_water_mark,
+        # Window the corpus was scanned over: a longer one needs a full scan
+        "lookback_months": lookback_months,
+        # Issues the corpus was trimmed to: a larger max_issues needs a full scan
+        "max_issues": max_issues,
+        "issues": {str(r["number"]): r for r in issues},
+    })
+    # Atomic replace: an interrupted run keeps the previous state
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    log.info("GitHub state saved: %s (%d issues, high-water mark %s).", path, len(issues), high_water_mark)
+    return path
@@ -0,0 +1,274 @@
+"""
+Process-wide GitHub request scheduler over a pool of tokens (GITHUB_TOKENS, comma-separated, and/or GITHUB_TOKEN).
+Every request made through the GitHub clients (core.github_cache connections) is assigned the token with the most
+headroom and paced by two token buckets per token:
+- primary: refilled so that the remaining budget (X-RateLimit-Remaining, per X-RateLimit-Resource) lasts until
+  X-RateLimit-Reset, with a burst allowance so that small scans are not slowed down;
+- secondary: GitHub's per-minute points limits (REST 900: GET 1 point, other verbs 5; GraphQL 2000: 1 per query),
+  plus a cap on requests in flight.
+A rate-limited response (403/429 with no remaining budget or a Retry-After) blocks that token until its reset and the
+request is retried on another one; when every token is blocked the caller waits, up to GITHUB_MAX_RATE_WAIT seconds.
+Replaces PyGithub's fixed sleeps between requests and its blind retry-until-reset.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections.abc import Callable
+
+from core import metrics
+
+log = logging.getLogger(__name__)
+
+# Requests a token may burst before pacing applies (capped by its remaining budget)
+BURST = 300
+# Budget left untouched per token and resource (other tools sharing the token), at most 5% of the limit
+RESERVE = 20
+# Secondary limits: points per minute per token (REST and GraphQL counted apart), burst, cost of a non-GET REST call
+SECONDARY_POINTS_PER_MINUTE = {"rest": 900, "graphql": 2000}
+SECONDARY_BURST = 100
+WRITE_POINTS = 5
+MAX_IN_FLIGHT_PER_TOKEN = 20
+# Secondary limit without Retry-After: GitHub asks to wait at least a minute
+SECONDARY_BACKOFF_SECONDS = 60
+MAX_RATE_LIMIT_RETRIES = 3
+DEFAULT_MAX_WAIT_SECONDS = 900
+# Waits longer than this are logged
+LOG_WAIT_SECONDS = 5.0
+
+
+class RateLimitExhausted(RuntimeError):
+    pass
+
+
+class _Bucket:
+    """Primary budget of one token for one resource (core, graphql, search...)."""
+
+    def __init__(self):
+        self.level = float(BURST)
+        # Unknown until the first response: no pacing
+        self.remaining: int | None = None
+        self.reserve = RESERVE
+        self.reset = 0.0
+        self.rate = math.inf
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def refill(self, now: float) -> None:
+        if self.remaining is not None and now >= self.reset:
+            # Window over: fresh budget, unknown until the next response
+            self.remaining, self.rate, self.level = None, math.inf, float(BURST)
+        cap = BURST if self.remaining is None else min(BURST, max(0, self.remaining - self.reserve))
+        if self.rate != math.inf:
+            self.level = min(cap, self.level + self.rate * (now - self.updated))
+        else:
+            self.level = float(cap)
+        self.updated = now
+
+    def wait(self, now: float) -> float:
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.level >= 1:
+            return 0.0
+        if self.remaining is not None and self.remaining <= self.reserve:
+            return max(0.0, self.reset - now)
+        return (1 - self.level) / self.rate if self.rate else max(0.0, self.reset - now)
+
+    def update(self, remaining: int, limit: int | None, reset: float, now: float) -> None:
+        self.refill(now)
+        self.remaining, self.reset = remaining, reset
+        if limit:
+            self.reserve = min(RESERVE, limit // 20)
+        # Spread what is left evenly over the rest of the window
+        self.rate = max(0, remaining - self.reserve) / max(1.0, reset - now)
+        self.level = min(self.level, max(0, remaining - self.reserve))
+
+
+class _Token:
+    def __init__(self, token: str | None, name: str):
+        self.token = token
+        self.name = name
+        self.buckets: dict[str, _Bucket] = {}
+        self.points = {kind: float(SECONDARY_BURST) for kind in SECONDARY_POINTS_PER_MINUTE}
+        self.points_updated = {kind: time.monotonic() for kind in SECONDARY_POINTS_PER_MINUTE}
+        self.blocked_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.rate_limited = 0
+
+    def bucket(self, resource: str) -> _Bucket:
+        return self.buckets.setdefault(resource, _Bucket())
+
+    def wait(self, resource: str, points: int, now: float) -> float:
+        """Seconds until this token may send a request (0: now)."""
+        if self.in_flight >= MAX_IN_FLIGHT_PER_TOKEN:
+            # Woken up by a release
+            return LOG_WAIT_SECONDS
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        kind = _kind(resource)
+        per_minute = SECONDARY_POINTS_PER_MINUTE[kind]
+        self.points[kind] = min(SECONDARY_BURST, self.points[kind] + per_minute / 60.0 * (now - self.points_updated[kind]))
+        self.points_updated[kind] = now
+        bucket = self.bucket(resource)
+        bucket.refill(now)
+        secondary = 0.0 if self.points[kind] >= points else (points - self.points[kind]) * 60.0 / per_minute
+        return max(bucket.wait(now), secondary)
+
+    def take(self, resource: str, points: int) -> None:
+        bucket = self.bucket(resource)
+        bucket.level -= 1
+        if bucket.remaining is not None:
+            bucket.remaining -= 1
+        self.points[_kind(resource)] -= points
+        self.in_flight += 1
+
+
+class Scheduler:
+    def __init__(self, tokens: list[str], max_wait_seconds: float = DEFAULT_MAX_WAIT_SECONDS):
+        self.tokens = [_Token(t, f"token {k + 1}") for k, t in enumerate(tokens)] or [_Token(None, "anonymous")]
+        self.max_wait_seconds = max_wait_seconds
+        self.waited_seconds = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, resource: str, points: int) -> _Token:
+        """Blocks until a token may send one request; returns it (release() it with the response)."""
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                waits = [(t.wait(resource, points, now), t) for t in self.tokens]
+                ready = [t for w, t in waits if w == 0]
+                if ready:
+                    # Most primary headroom first: spreads the calls across tokens
+                    token = max(ready, key=lambda t: t.bucket(resource).level)
+                    token.take(resource, points)
+                    break
+                wait = min(w for w, _ in waits)
+                if now - started + wait > self.max_wait_seconds:
+                    raise RateLimitExhausted(f"GitHub rate limit: all {len(self.tokens)} token(s) exhausted for {resource}, next one free in {wait:.0f}s (GITHUB_MAX_RATE_WAIT={self.max_wait_seconds:.0f}s)")
+                if wait > LOG_WAIT_SECONDS:
+                    log.warning("GitHub rate limit: all %d token(s) paced or blocked for %s, waiting %.0fs.", len(self.tokens), resource, wait)
+                self._cond.wait(timeout=wait)
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            with self._cond:
+                self.waited_seconds += waited
+            recorder = metrics.current()
+            if recorder is not None:
+                recorder.section("github.rate_wait", waited)
+        return token
+
+    def release(self, token: _Token, resource: str, status: int | None = None, headers=None) -> bool:
+        """Updates the token's budget from the response; True if the request was rate limited (retry it)."""
+        h = {k.lower(): v for k, v in (headers or {}).items()}
+        with self._cond:
+            token.in_flight -= 1
+            token.requests += 1
+            now = time.monotonic()
+            resource = h.get("x-ratelimit-resource") or resource
+            bucket = token.bucket(resource)
+            remaining = _int(h.get("x-ratelimit-remaining"))
+            reset_epoch = _int(h.get("x-ratelimit-reset"))
+            reset = now + max(0.0, reset_epoch - time.time()) if reset_epoch is not None else now + 3600
+            if remaining is not None:
+                bucket.update(remaining, _int(h.get("x-ratelimit-limit")), reset, now)
+            limited = False
+            if status in (403, 429):
+                retry_after = _int(h.get("retry-after"))
+                if retry_after is not None:
+                    # Secondary limit: the whole token rests
+                    token.blocked_until = now + retry_after
+                    limited = True
+                elif remaining == 0:
+                    bucket.blocked_until = reset
+                    limited = True
+                elif status == 429:
+                    token.blocked_until = now + SECONDARY_BACKOFF_SECONDS
+                    limited = True
+            if limited:
+                token.rate_limited += 1
+            self._cond.notify_all()
+        return limited
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "tokens": len(self.tokens),
+                "waited_seconds": round(self.waited_seconds, 1),
+                "per_token": {
+                    t.name: {
+                        "requests": t.requests,
+                        "rate_limited": t.rate_limited,
+                        "remaining": {r: b.remaining for r, b in t.buckets.items()},
+                    }
+                    for t in self.tokens
+                },
+            }
+
+
+def _kind(resource: str) -> str:
+    return "graphql" if resource == "graphql" else "rest"
+
+
+def _int(value) -> int | None:
+    try:
+        return int(float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def tokens() -> list[str]:
+    """Configured tokens, GITHUB_TOKENS first, without duplicates."""
+    out = []
+    for t in re.split(r"[,\s]+", os.getenv("GITHUB_TOKENS", "")) + [os.getenv("GITHUB_TOKEN", "")]:
+        if t and t not in out:
+            out.append(t)
+    return out
+
+
+_scheduler: Scheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def scheduler() -> Scheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler(tokens(), float(os.getenv("GITHUB_MAX_RATE_WAIT", DEFAULT_MAX_WAIT_SECONDS)))
+            log.info("GitHub scheduler: %d token(s).", len(_scheduler.tokens))
+        return _scheduler
+
+
+def send(connection, request: Callable):
+    """
+    Sends one prepared PyGithub connection request (request() performs it) under the scheduler:
+    picks a token (rewriting the Authorization header), paces, and retries on another token when rate limited.
+    """
+    s = scheduler()
+    resource = "graphql" if connection.url.split("?")[0].rstrip("/").endswith("/graphql") else "core"
+    # GraphQL queries cost 1 secondary point (no mutations are sent)
+    points = 1 if connection.verb == "GET" or resource == "graphql" else WRITE_POINTS
+    authenticated = bool(connection.headers.get("Authorization"))
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        token = s.acquire(resource, points)
+        if authenticated and token.token:
+            connection.headers = {**connection.headers, "Authorization": f"token {token.token}"}
+        try:
+            response = request()
+        except Exception:
+            s.release(token, resource)
+            raise
+        if not s.release(token, resource, response.status, response.headers) or attempt == MAX_RATE_LIMIT_RETRIES:
+            return response
+        log.warning("GitHub rate limited %s (%s %s, HTTP %d); retrying on the next free token.", token.name, connection.verb, connection.url.split("?")[0], response.status)
+    return response
+
+
+def log_summary() -> None:
+    s = scheduler().stats()
+    per_token = ", ".join(f"{name} {t['requests']} requests ({t['rate_limited']} rate limited, remaining {t['remaining']})" for name, t in s["per_token"].items())
+    log.info("GitHub scheduler: %d token(s), %.1fs waiting for budget; %s.", s["tokens"], s["waited_seconds"], per_token)
@@ -0,0 +1,190 @@
+"""
+First-response velocity: time from issue creation to its first comment, for every scanned issue.
+First comment timestamps are stored on the issue records, so incremental scans only fetch the missing ones.
+With a token, first comments are fetched in bulk via GraphQL (100 issues per query, ~ the cost of one issue page).
+Without a token (GraphQL requires auth), falls back to concurrent REST calls, skipping issues with no comments.
+Issues that no longer resolve (deleted, or no longer accessible) are reported so the caller can drop them; a
+transferred issue's node id still resolves, to the issue in its new repo.
+"""
+
+import logging
+import math
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from github import GithubException, UnknownObjectException
+
+from core import concurrency, github_tokens
+from core.metrics import propagate
+from core.github_client import client
+
+log = logging.getLogger(__name__)
+
+# Parallel GraphQL batches / REST calls
+VELOCITY_WORKERS = 4
+GRAPHQL_BATCH_SIZE = 100
+
+_FIRST_COMMENT_QUERY = """
+query($ids: [ID!]!) {
+  nodes(ids: $ids) {
+    ... on Issue {
+      number
+      comments(first: 1) { nodes { createdAt } }
+    }
+  }
+}
+"""
+
+
+def fetch_first_responses(repo: str, issues: list[dict]) -> tuple[dict[int, str], int, set[int]]:
+    """
+    issues: records with number, node_id and comments (count); issues without comments are skipped.
+    Returns ({number: first comment created_at (ISO)}, number of issues whose first comment could not be fetched,
+    numbers of the issues that no longer exist).
+    """
+    candidates = [i for i in issues if i.get("comments")]
+    if not candidates:
+        return {}, 0, set()
+    if github_tokens.tokens():
+        first_comments, failed, gone = _first_comments_graphql(candidates)
+    else:
+        first_comments, failed, gone = _first_comments_rest(repo, candidates)
+    log.info("Velocity: %d issues with comments, %d first responses fetched, %d failed, %d no longer exist.", len(candidates), len(first_comments), failed, len(gone))
+    return {n: ts.isoformat() for n, ts in first_comments.items()}, failed, gone
+
+
+def samples(issues: list[dict]) -> list[dict]:
+    """
+    One sample per issue record that has both created_at and first_response_at (ISO strings).
+    """
+    out = []
+    for i in issues:
+        if not i.get("first_response_at") or not i.get("created_at"):
+            continue
+        delta = (_parse_ts(i["first_response_at"]) - _parse_ts(i["created_at"])).total_seconds() / 3600.0
+        is_bug = any("bug" in (l or "").lower() for l in i.get("labels") or [])
+        out.append({
+            "number": i["number"],
+            "title": i["title"] or "(no title)",
+            "url": i["url"],
+            "hours_to_first_response": round(delta, 1),
+            "type": "bug" if is_bug else "other",
+        })
+    return out
+
+
+def _first_comments_graphql(issues: list[dict]) -> tuple[dict[int, datetime], int, set[int]]:
+    batches = [issues[k:k + GRAPHQL_BATCH_SIZE] for k in range(0, len(issues), GRAPHQL_BATCH_SIZE)]
+
+    def fetch(batch: list[dict]) -> tuple[dict[int, datetime], set[int], int]:
+        # Not requester.graphql_query: it raises on any error, and one deleted issue would fail its whole batch
+        requester = client().requester
+        with concurrency.slot():
+            headers, data = requester.requestJsonAndCheck("POST", requester.graphql_url, input={"query": _FIRST_COMMENT_QUERY, "variables": {"ids": [i["node_id"] for i in batch]}})
+        if any(e.get("type") != "NOT_FOUND" for e in data.get("errors") or []):
+            raise GithubException(400, data, headers)
+        nodes = (data.get("data") or {}).get("nodes")
+        if not isinstance(nodes, list) or len(nodes) != len(batch):
+            # Missing or null nodes: nothing in the batch can be attributed (the whole batch counts as failed)
+            raise GithubException(502, data, headers, f"nodes(ids:) returned {len(nodes) if isinstance(nodes, list) else nodes!r} nodes for {len(batch)} ids")
+        # nodes(ids:) answers in id order, with null and a NOT_FOUND error (path ["nodes", k]) for every id that no
+        # longer resolves; a null node without one is a failure, not a deletion
+        not_found = {(e.get("path") or [None, None])[-1] for e in data.get("errors") or []}
+        out, gone, failed = {}, set(), 0
+        for k, (issue, node) in enumerate(zip(batch, nodes)):
+            if node is None:
+                if k in not_found:
+                    gone.add(issue["number"])
+                else:
+                    failed += 1
+                continue
+            comments = (node.get("comments") or {}).get("nodes") or []
+            if comments:
+                out[node["number"]] = _parse_ts(comments[0]["createdAt"])
+        return out, gone, failed
+
+    first_comments: dict[int, datetime] = {}
+    gone: set[int] = set()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=VELOCITY_WORKERS, thread_name_prefix="gh-velocity") as pool:
+        fetch = propagate(fetch)
+        for batch, future in [(b, pool.submit(fetch, b)) for b in batches]:
+            try:
+                found, missing, unresolved = future.result()
+            except Exception as e:
+                failed += len(batch)
+                log.warning("  Velocity GraphQL batch failed (%d issues): %s", len(batch), e)
+                continue
+            if unresolved:
+                log.warning("  Velocity GraphQL batch: %d null nodes without a NOT_FOUND error.", unresolved)
+            first_comments.update(found)
+            gone |= missing
+            failed += unresolved
+    return first_comments, failed, gone
+
+
+def _first_comments_rest(repo: str, issues: list[dict]) -> tuple[dict[int, datetime], int, set[int]]:
+    def fetch(number: int) -> datetime | None:
+        # Issue comments are returned oldest first: the first page is enough
+        with concurrency.slot():
+            comments = client().get_repo(repo).get_issue(number).get_comments().get_page(0)
+        return min(c.created_at for c in comments) if comments else None
+
+    first_comments: dict[int, datetime] = {}
+    gone: set[int] = set()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=VELOCITY_WORKERS, thread_name_prefix="gh-velocity") as pool:
+        fetch = propagate(fetch)
+        for i, future in [(i, pool.submit(fetch, i["number"])) for i in issues]:
+            try:
+                first = future.result()
+            except UnknownObjectException:
+                gone.add(i["number"])
+                continue
+            except Exception as e:
+                failed += 1
+                log.warning("  Velocity sample failed for #%d: %s", i["number"], e)
+                continue
+            if first is not None:
+                first_comments[i["number"]] = first
+    return first_comments, failed, gone
+
+
+def _parse_ts(value: str) -> datetime:
+    ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def percentile(values: Sequence[float], q: float) -> float | None:
+    """Linear-interpolated percentile (q in 0-100) of values; None if empty."""
+    if not values:
+        return None
+    s = sorted(values)
+    k = (len(s) - 1) * q / 100.0
+    lo, hi = math.floor(k), math.ceil(k)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def metrics(samples: list[dict], failed: int = 0) -> dict:
+    """
+    Mean and p50/p90/p95 of hours to first response, split bugs / other.
+    Keeps the historical avg_* / sample_* keys used by the analyzer and report.
+    """
+    return metrics_from_hours(
+        [s["hours_to_first_response"] for s in samples if s["type"] == "bug"],
+        [s["hours_to_first_response"] for s in samples if s["type"] == "other"],
+        failed,
+    )
+
+
+def metrics_from_hours(bugs: Sequence[float], other: Sequence[float], failed: int = 0) -> dict:
+    """Same as metrics(), from the hours to first response alone (streaming scans keep only these)."""
+    out: dict = {}
+    for hours, suffix in ((bugs, "bugs"), (other, "other")):
+        out[f"avg_first_response_hours_{suffix}"] = sum(hours) / len(hours) if hours else None
+        for q in (50, 90, 95):
+            out[f"p{q}_first_response_hours_{suffix}"] = percentile(hours, q)
+        out[f"sample_{suffix}"] = len(hours)
+    out["sample_failed"] = failed
+    return out
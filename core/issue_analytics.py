@@ -0,0 +1,196 @@
+"""
+Issue activity analytics over the scanned issue records, vectorised with numpy.
+The records are turned into array columns (created / closed / first-response timestamps, state, bug flag, one flag
+per keyword category), from which weekly opened / closed counts, backlog growth, time-to-close and
+time-to-first-response percentiles and per-category trends are computed without Python loops over issues,
+so 100k-issue histories (longer lookback windows) stay fast.
+"""
+
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Recent period (weeks) compared with the period of the same length just before it
+TREND_WEEKS = 12
+PERCENTILES = (50, 90, 95)
+_SECONDS_PER_HOUR = 3600.0
+# numpy's NaT is the smallest int64
+_NAT = np.iinfo(np.int64).min
+
+
+@dataclass
+class Columns:
+    number: np.ndarray
+    # datetime64[s], NaT when unknown (closed: also while open)
+    created: np.ndarray
+    closed: np.ndarray
+    first_response: np.ndarray
+    is_open: np.ndarray
+    is_bug: np.ndarray
+    categories: list[str]
+    # (issues, categories) booleans
+    category_flags: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.number)
+
+
+def _epoch(value: str | None) -> int:
+    if not value:
+        return _NAT
+    ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return int((ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)).timestamp())
+
+
+class ColumnBuilder:
+    """Appends issues one at a time into typed arrays (a few bytes per issue): columns for streaming scans."""
+
+    def __init__(self, category_names: list[str]):
+        self.categories = list(category_names)
+        self._index = {name: k for k, name in enumerate(self.categories)}
+        self._number = array("q")
+        self._created = array("q")
+        self._closed = array("q")
+        self._first_response = array("q")
+        self._is_open = bytearray()
+        self._is_bug = bytearray()
+        self._flags = bytearray()
+
+    def add(self, issue: dict, categories=()) -> None:
+        """issue: a core.github_scanner record; categories: the keyword categories it matched."""
+        self._number.append(issue["number"])
+        self._created.append(_epoch(issue.get("created_at")))
+        self._closed.append(_epoch(issue.get("closed_at")) if issue.get("state") == "closed" else _NAT)
+        self._first_response.append(_epoch(issue.get("first_response_at")))
+        self._is_open.append(issue.get("state") == "open")
+        self._is_bug.append(any("bug" in (l or "").lower() for l in issue.get("labels") or []))
+        row = bytearray(len(self.categories))
+        for c in categories:
+            if c in self._index:
+                row[self._index[c]] = 1
+        self._flags += row
+
+    def build(self) -> Columns:
+        n = len(self._number)
+        return Columns(
+            number=np.frombuffer(self._number, dtype=np.int64).copy(),
+            created=np.frombuffer(self._created, dtype=np.int64).astype("datetime64[s]"),
+            closed=np.frombuffer(self._closed, dtype=np.int64).astype("datetime64[s]"),
+            first_response=np.frombuffer(self._first_response, dtype=np.int64).astype("datetime64[s]"),
+            is_open=np.frombuffer(self._is_open, dtype=np.uint8).astype(bool),
+            is_bug=np.frombuffer(self._is_bug, dtype=np.uint8).astype(bool),
+            categories=self.categories,
+            category_flags=np.frombuffer(self._flags, dtype=np.uint8).astype(bool).reshape(n, len(self.categories)),
+        )
+
+
+def columns(issues, categories: dict[int, list[str]] | None = None, category_names: list[str] | None = None) -> Columns:
+    """Column view of issue records (core.github_scanner records); categories: {number: matched categories}."""
+    categories = categories or {}
+    names = list(category_names) if category_names is not None else sorted({c for cs in categories.values() for c in cs})
+    builder = ColumnBuilder(names)
+    for i in issues:
+        builder.add(i, categories.get(i["number"], ()))
+    return builder.build()
+
+
+def _hours(end: np.ndarray, start: np.ndarray) -> np.ndarray:
+    """Hours from start to end, NaN where either is unknown."""
+    delta = (end - start).astype("timedelta64[s]").astype(np.float64) / _SECONDS_PER_HOUR
+    delta[np.isnat(end) | np.isnat(start)] = np.nan
+    return delta
+
+
+def _percentiles(hours: np.ndarray) -> dict:
+    values = hours[~np.isnan(hours)]
+    out: dict = {"count": int(values.size)}
+    qs = np.percentile(values, PERCENTILES) if values.size else [None] * len(PERCENTILES)
+    for q, v in zip(PERCENTILES, qs):
+        out[f"p{q}"] = round(float(v), 1) if v is not None else None
+    return out
+
+
+def _week_index(timestamps: np.ndarray, start_day: np.datetime64) -> np.ndarray:
+    return (timestamps.astype("datetime64[D]") - start_day).astype(np.int64) // 7
+
+
+def _mean(values: np.ndarray) -> float | None:
+    return round(float(values.mean()), 2) if values.size else None
+
+
+def analyse(issues, categories: dict[int, list[str]] | None = None, category_names: list[str] | None = None, now: datetime | None = None) -> dict:
+    """Activity analytics of issue records (see analyse_columns)."""
+    return analyse_columns(columns(issues, categories, category_names), now)
+
+
+def analyse_columns(c: Columns, now: datetime | None = None) -> dict:
+    """
+    Weekly activity, backlog growth, time-to-close / first-response percentiles and per-category trends.
+    Weeks start on Monday; the last TREND_WEEKS weeks are compared with the TREND_WEEKS before them.
+    Backlog figures are net changes over the scanned issues (issues created earlier and never updated are not seen).
+    """
+    created_known = ~np.isnat(c.created)
+    if not created_known.any():
+        return {"issues": len(c)}
+    now_s = np.datetime64((now or datetime.now(timezone.utc)).replace(tzinfo=None), "s")
+    first_day = c.created[created_known].min().astype("datetime64[D]")
+    # 1970-01-01 was a Thursday: shift back to that week's Monday
+    start_day = first_day - np.timedelta64(int((first_day.astype(np.int64) + 3) % 7), "D")
+    weeks = int(_week_index(np.array([now_s]), start_day)[0]) + 1
+
+    created_week = np.full(len(c), -1, dtype=np.int64)
+    created_week[created_known] = _week_index(c.created[created_known], start_day)
+    closed_known = ~np.isnat(c.closed)
+    closed_week = _week_index(c.closed[closed_known], start_day)
+    opened = np.bincount(created_week[created_known], minlength=weeks)[:weeks]
+    closed = np.bincount(closed_week[(closed_week >= 0) & (closed_week < weeks)], minlength=weeks)
+    backlog = np.cumsum(opened - closed)
+
+    recent = slice(max(0, weeks - TREND_WEEKS), weeks)
+    previous = slice(max(0, weeks - 2 * TREND_WEEKS), max(0, weeks - TREND_WEEKS))
+    close_hours = _hours(c.closed, c.created)
+    response_hours = _hours(c.first_response, c.created)
+
+    in_recent = created_week >= recent.start
+    in_previous = (created_week >= previous.start) & (created_week < previous.stop)
+    flags = c.category_flags
+    per_category = {}
+    for k, name in enumerate(c.categories):
+        f = flags[:, k]
+        per_category[name] = {
+            "issues": int(f.sum()),
+            "open": int((f & c.is_open).sum()),
+            f"opened_last_{TREND_WEEKS}w": int((f & in_recent).sum()),
+            f"opened_previous_{TREND_WEEKS}w": int((f & in_previous).sum()),
+            "time_to_close_hours": _percentiles(close_hours[f]),
+        }
+
+    week_starts = start_day + np.arange(weeks) * np.timedelta64(7, "D")
+    return {
+        "issues": len(c),
+        "since": str(first_day),
+        "weeks": weeks,
+        "trend_weeks": TREND_WEEKS,
+        "open_issues": int(c.is_open.sum()),
+        "open_rate_per_week": _mean(opened[recent]),
+        "open_rate_per_week_previous": _mean(opened[previous]),
+        "close_rate_per_week": _mean(closed[recent]),
+        "close_rate_per_week_previous": _mean(closed[previous]),
+        "backlog_growth_per_week": _mean((opened - closed)[recent]),
+        "backlog_growth_per_week_previous": _mean((opened - closed)[previous]),
+        "time_to_close_hours": _percentiles(close_hours),
+        "first_response_hours": {
+            "all": _percentiles(response_hours),
+            "bugs": _percentiles(response_hours[c.is_bug]),
+            "other": _percentiles(response_hours[~c.is_bug]),
+        },
+        "categories": per_category,
+        "weekly": {
+            "week": [str(w) for w in week_starts],
+            "opened": opened.tolist(),
+            "closed": closed.tolist(),
+            "backlog_change": backlog.tolist(),
+        },
+    }
@@ -0,0 +1,122 @@
+"""
+Bounded-memory building blocks for streaming GitHub scans (core.github_scanner, TARGET["github"]["streaming"]):
+a compact issue record (__slots__, no per-instance dict) for issues in flight, and an append-only list that
+keeps its items as encoded JSON lines and spills them to an anonymous temporary file beyond a memory budget.
+GITHUB_STREAM_MEMORY_MB sets the budget of each list (default 32).
+"""
+
+import json
+import os
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
+
+DEFAULT_MEMORY_MB = 32
+# Spilled lines are read back in blocks of this size
+READ_BLOCK_BYTES = 1 << 20
+
+
+class IssueRecord:
+    """One scanned issue; to_dict() gives the plain record used everywhere else (core.github_scanner._record)."""
+
+    __slots__ = ("number", "node_id", "title", "body", "state", "created_at", "updated_at", "closed_at", "labels", "url", "comments", "first_response_at")
+
+    def __init__(self, number: int, node_id: str, title: str, body: str, state: str, created_at: str | None, updated_at: str | None, closed_at: str | None, labels: tuple[str, ...], url: str, comments: int, first_response_at: str | None = None):
+        self.number = number
+        self.node_id = node_id
+        self.title = title
+        self.body = body
+        self.state = state
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.closed_at = closed_at
+        self.labels = labels
+        self.url = url
+        self.comments = comments
+        self.first_response_at = first_response_at
+
+    @classmethod
+    def from_dict(cls, record: dict) -> "IssueRecord":
+        return cls(**{k: record.get(k) for k in cls.__slots__ if k != "labels"}, labels=tuple(record.get("labels") or ()))
+
+    def to_dict(self) -> dict:
+        out = {k: getattr(self, k) for k in self.__slots__}
+        out["labels"] = list(self.labels)
+        return out
+
+
+def memory_budget() -> int:
+    return int(float(os.getenv("GITHUB_STREAM_MEMORY_MB", DEFAULT_MEMORY_MB)) * 1024 * 1024)
+
+
+class SpillList:
+    """
+    Append-only list of JSON-serialisable items, iterated in insertion order (each iteration decodes fresh copies).
+    Items are held as encoded lines; once they exceed max_bytes they are moved to a temporary file (deleted on close
+    or garbage collection). Several threads may iterate at once; appends must be finished by then.
+    """
+
+    def __init__(self, max_bytes: int | None = None):
+        self.max_bytes = memory_budget() if max_bytes is None else max_bytes
+        self._lines: list[bytes] = []
+        self._buffered = 0
+        self._count = 0
+        self._file = None
+        self._spilled_bytes = 0
+        self._lock = threading.Lock()
+        self._transform: Callable[[dict], dict] | None = None
+
+    def append(self, item: dict) -> None:
+        line = json.dumps(item, separators=(",", ":")).encode("utf-8") + b"\n"
+        with self._lock:
+            self._lines.append(line)
+            self._buffered += len(line)
+            self._count += 1
+            if self._buffered > self.max_bytes:
+                self._spill()
+
+    def _spill(self) -> None:
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="issues-", suffix=".jsonl")
+        data = b"".join(self._lines)
+        os.pwrite(self._file.fileno(), data, self._spilled_bytes)
+        self._spilled_bytes += len(data)
+        self._lines, self._buffered = [], 0
+
+    def map(self, transform: Callable[[dict], dict]) -> None:
+        """Applies transform to every item when iterated (e.g. fields known only after the items were appended)."""
+        self._transform = transform
+
+    @property
+    def spilled_bytes(self) -> int:
+        return self._spilled_bytes
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[dict]:
+        with self._lock:
+            fd = self._file.fileno() if self._file is not None else None
+            spilled = self._spilled_bytes
+            lines = list(self._lines)
+        decode = json.loads if self._transform is None else (lambda line: self._transform(json.loads(line)))
+        if fd is not None:
+            # pread: no shared file position, so concurrent iterations do not interfere
+            offset, rest = 0, b""
+            while offset < spilled:
+                block = os.pread(fd, min(READ_BLOCK_BYTES, spilled - offset), offset)
+                if not block:
+                    break
+                offset += len(block)
+                *complete, rest = (rest + block).split(b"\n")
+                for line in complete:
+                    yield decode(line)
+        for line in lines:
+            yield decode(line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._lines = []
@@ -0,0 +1,107 @@
+"""
+Multi-pattern keyword matcher (Aho-Corasick) shared by the scanners.
+Built once per keyword config ({category: [terms]}); finds every term in one linear pass over the lowercased text
+and returns all matched categories with the terms that matched.
+"""
+
+from collections import deque
+from functools import lru_cache
+
+# Boundary modes: "none" = plain substring, "start" = term must start a word ("crash" matches "crashes",
+# "OOM" does not match "room"), "word" = whole words only.
+BOUNDARY_MODES = ("none", "start", "word")
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: dict[str, list[str]], boundary: str = "none"):
+        if boundary not in BOUNDARY_MODES:
+            raise ValueError(f"Invalid boundary: {boundary}. Choose from: {', '.join(BOUNDARY_MODES)}")
+        self.boundary = boundary
+        self.categories = list(keywords)
+        # Term (lowercased) -> categories, in config order
+        self.term_categories: dict[str, list[str]] = {}
+        for category, terms in keywords.items():
+            for term in terms:
+                t = term.lower()
+                if t and category not in self.term_categories.setdefault(t, []):
+                    self.term_categories[t].append(category)
+        self._build()
+
+    def _build(self) -> None:
+        # Trie as parallel lists: goto transitions, failure links, terms ending at each node
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[str]] = [[]]
+        for term in self.term_categories:
+            node = 0
+            for c in term:
+                nxt = self._goto[node].get(c)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][c] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(term)
+        # Breadth-first failure links; each node also inherits the outputs of its failure node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for c, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and c not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(c, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> list[tuple[int, str]]:
+        """All (start offset, term) occurrences in text (case-insensitive), honouring the boundary mode."""
+        text = text.lower()
+        hits = []
+        node = 0
+        for i, c in enumerate(text):
+            while node and c not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(c, 0)
+            for term in self._out[node]:
+                start = i - len(term) + 1
+                if self._boundary_ok(text, start, i + 1, term):
+                    hits.append((start, term))
+        return hits
+
+    def _boundary_ok(self, text: str, start: int, end: int, term: str) -> bool:
+        if self.boundary == "none":
+            return True
+        # Only edges that are word characters need a boundary ("unwrap()" ends on ")")
+        if _is_word_char(term[0]) and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if self.boundary == "word" and _is_word_char(term[-1]) and end < len(text) and _is_word_char(text[end]):
+            return False
+        return True
+
+    def match(self, text: str) -> dict[str, list[str]]:
+        """{category: [matched terms]} for every category with at least one hit (config order, terms deduped)."""
+        found: dict[str, list[str]] = {}
+        for _, term in self.find(text):
+            for category in self.term_categories[term]:
+                terms = found.setdefault(category, [])
+                if term not in terms:
+                    terms.append(term)
+        return {c: found[c] for c in self.categories if c in found}
+
+
+@lru_cache(maxsize=32)
+def _compiled(frozen: tuple[tuple[str, tuple[str, ...]], ...], boundary: str) -> KeywordMatcher:
+    return KeywordMatcher({c: list(terms) for c, terms in frozen}, boundary=boundary)
+
+
+def get_matcher(keywords: dict[str, list[str]], boundary: str = "none") -> KeywordMatcher:
+    """Returns a compiled matcher for this keyword config, built once and reused across scans and scanners."""
+    return _compiled(tuple((c, tuple(terms)) for c, terms in keywords.items()), boundary)
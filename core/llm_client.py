@@ -0,0 +1,178 @@
+"""
+Chat model access for the analyzer: provider selection and a content-addressed response cache.
+LLM_PROVIDER=mistral (default, needs MISTRAL_API_KEY) or fake (core.fake_llm, offline and deterministic).
+Responses are cached on disk keyed on a hash of (provider, model, prompt), with age and size eviction
+(LLM_CACHE=0 to disable; LLM_CACHE_DIR, LLM_CACHE_MAX_MB, LLM_CACHE_MAX_AGE_DAYS).
+stream() consumes a response as it is generated (time to first token is recorded with the call's stats).
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+
+from core import concurrency, metrics
+from core.disk_cache import DiskCache
+
+log = logging.getLogger(__name__)
+
+MODEL = "mistral-large-latest"
+PROVIDERS = ("mistral", "fake")
+
+DEFAULT_CACHE_DIR = ".cache/llm"
+DEFAULT_CACHE_MAX_MB = 100
+DEFAULT_CACHE_MAX_AGE_DAYS = 30
+
+_cache: DiskCache | None = None
+_cache_lock = threading.Lock()
+# One client per (provider, model), shared across runs so HTTP connections are reused
+_llms: dict[tuple[str, str], object] = {}
+
+
+def provider() -> str:
+    p = os.getenv("LLM_PROVIDER", "mistral").strip().lower()
+    if p not in PROVIDERS:
+        raise ValueError(f"Invalid LLM_PROVIDER: {p}. Choose from: {', '.join(PROVIDERS)}")
+    return p
+
+
+def get_llm(model: str = MODEL):
+    """Chat model for the configured provider (fake mode never imports or calls Mistral). Reused across calls."""
+    key = (provider(), model)
+    with _cache_lock:
+        if key not in _llms:
+            if key[0] == "fake":
+                from core.fake_llm import FakeChatModel
+                _llms[key] = FakeChatModel()
+            else:
+                from langchain_mistralai import ChatMistralAI
+                _llms[key] = ChatMistralAI(api_key=os.getenv("MISTRAL_API_KEY"), model=model)
+        return _llms[key]
+
+
+def model_name(llm) -> str:
+    return getattr(llm, "model", None) or getattr(llm, "model_name", None) or MODEL
+
+
+def _get_cache() -> DiskCache | None:
+    global _cache
+    if os.getenv("LLM_CACHE", "1") == "0":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(
+                os.getenv("LLM_CACHE_DIR", DEFAULT_CACHE_DIR),
+                max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB)) * 1024 * 1024),
+                max_age_seconds=float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", DEFAULT_CACHE_MAX_AGE_DAYS)) * 86400,
+            )
+        return _cache
+
+
+def cache_key(llm, prompt: str) -> str:
+    return hashlib.sha256(f"{provider()}\0{model_name(llm)}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+def invoke(llm, prompt: str, refresh: bool = False, label: str = "llm") -> tuple[str, dict]:
+    """
+    Returns (text, stats): prompt/response sizes, token usage when reported, latency, and whether it was cached.
+    Identical prompts to the same model are served from the cache unless refresh. Stats are recorded in
+    core.metrics under label.
+    """
+    start = time.perf_counter()
+    cache = _get_cache()
+    key = cache_key(llm, prompt) if cache is not None else None
+    entry = cache.get(key) if cache is not None and not refresh else None
+    if entry:
+        raw, usage, cached = entry["content"], entry.get("usage") or {}, True
+    else:
+        try:
+            with concurrency.slot():
+                msg = llm.invoke(prompt)
+        except Exception:
+            metrics.http_call(provider(), error=True)
+            raise
+        raw = msg.content if hasattr(msg, "content") else str(msg)
+        usage = dict(getattr(msg, "usage_metadata", None) or {})
+        cached = False
+        if cache is not None:
+            cache.set(key, {"content": raw, "usage": usage, "model": model_name(llm)})
+    return raw, _record(label, prompt, raw, usage, start, cached)
+
+
+def stream(llm, prompt: str, on_text: Callable[[str], None], refresh: bool = False, label: str = "llm") -> tuple[str, dict]:
+    """
+    Like invoke(), but on_text(text) is called with each piece of the response as it is generated (once with the
+    whole response when cached). An exception raised by on_text stops the generation and is re-raised; the partial
+    response is not cached.
+    """
+    start = time.perf_counter()
+    cache = _get_cache()
+    key = cache_key(llm, prompt) if cache is not None else None
+    entry = cache.get(key) if cache is not None and not refresh else None
+    if entry:
+        raw, usage = entry["content"], entry.get("usage") or {}
+        first_token = time.perf_counter() - start
+        on_text(raw)
+        return raw, _record(label, prompt, raw, usage, start, True, first_token_seconds=round(first_token, 2))
+
+    parts: list[str] = []
+    usage: dict = {}
+    first_token = None
+    stopped: Exception | None = None
+    try:
+        with concurrency.slot():
+            chunks = llm.stream(prompt)
+            try:
+                for chunk in chunks:
+                    text = chunk.content if hasattr(chunk, "content") else str(chunk)
+                    # Usage is reported on the last chunk
+                    usage = dict(getattr(chunk, "usage_metadata", None) or usage)
+                    if not text:
+                        continue
+                    if first_token is None:
+                        first_token = time.perf_counter() - start
+                    parts.append(text)
+                    try:
+                        on_text(text)
+                    except Exception as e:
+                        stopped = e
+                        break
+            finally:
+                # Closes the HTTP response when stopped early
+                close = getattr(chunks, "close", None)
+                if close is not None:
+                    close()
+    except Exception:
+        metrics.http_call(provider(), error=True)
+        raise
+    raw = "".join(parts)
+    timing = {"first_token_seconds": round(first_token, 2) if first_token is not None else None}
+    if stopped is not None:
+        _record(label, prompt, raw, usage, start, False, **timing, stopped=True)
+        raise stopped
+    if cache is not None:
+        cache.set(key, {"content": raw, "usage": usage, "model": model_name(llm)})
+    return raw, _record(label, prompt, raw, usage, start, False, **timing)
+
+
+def _record(label: str, prompt: str, raw: str, usage: dict, start: float, cached: bool, **extra) -> dict:
+    """Call stats (sizes, token usage when reported, latency), recorded in core.metrics under label."""
+    stats = {
+        "prompt_chars": len(prompt),
+        "response_chars": len(raw),
+        "input_tokens": usage.get("input_tokens"),
+        "output_tokens": usage.get("output_tokens"),
+        "seconds": round(time.perf_counter() - start, 2),
+        "cached": cached,
+        **extra,
+    }
+    metrics.http_call(provider(), len(raw.encode("utf-8")), cached=cached)
+    metrics.llm_call(label, stats)
+    return stats
+
+
+def cache_stats() -> dict:
+    cache = _get_cache()
+    return cache.stats() if cache is not None else {"hits": 0, "misses": 0, "bytes": 0}
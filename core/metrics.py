@@ -0,0 +1,193 @@
+"""
+Run metrics: wall time per stage and timed section, HTTP calls / bytes per provider, API rate-limit budget left,
+and LLM prompt / response sizes. main.py opens one Recorder per pipeline run and writes it as JSON next to the report.
+The recorder is bound to the run's context (contextvars), so targets audited in parallel in batch mode keep separate
+metrics; worker pools forward it with propagate(). Outside a run every hook is a no-op.
+"""
+
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+_current: contextvars.ContextVar["Recorder | None"] = contextvars.ContextVar("metrics_recorder", default=None)
+
+
+class Recorder:
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self._lock = threading.Lock()
+        self.stages: dict[str, float] = {}
+        self.sections: dict[str, float] = {}
+        self.http: dict[str, dict[str, int]] = {}
+        self.rate_limits: dict[str, dict] = {}
+        self.llm_calls: list[dict] = []
+        self.info: dict = {}
+
+    def http_call(self, provider: str, bytes_received: int = 0, error: bool = False, cached: bool = False) -> None:
+        with self._lock:
+            c = self.http.setdefault(provider, {"calls": 0, "errors": 0, "cached": 0, "bytes": 0})
+            c["calls"] += 1
+            c["errors"] += int(error)
+            c["cached"] += int(cached)
+            c["bytes"] += bytes_received
+
+    def rate_limit(self, key: str, remaining: int, limit: int | None = None, reset: float | None = None) -> None:
+        with self._lock:
+            seen = self.rate_limits.get(key)
+            # Lowest remaining budget seen during the run
+            if seen is None or remaining <= seen["remaining"]:
+                self.rate_limits[key] = {
+                    "remaining": remaining,
+                    "limit": limit,
+                    "reset_at": datetime.fromtimestamp(reset, tz=timezone.utc).isoformat() if reset else None,
+                }
+
+    def llm_call(self, label: str, stats: dict) -> None:
+        with self._lock:
+            self.llm_calls.append({"label": label, **stats})
+
+    def section(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.sections[name] = round(self.sections.get(name, 0.0) + seconds, 2)
+
+    def summary(self) -> dict:
+        with self._lock:
+            llm = self.llm_calls
+            sent = [c for c in llm if not c.get("cached")]
+            return {
+                "started_at": self.started_at,
+                **self.info,
+                "stages": dict(self.stages),
+                "sections": dict(self.sections),
+                "http": {p: dict(c) for p, c in self.http.items()},
+                "rate_limits": {k: dict(v) for k, v in self.rate_limits.items()},
+                "llm": {
+                    "calls": len(llm),
+                    "cached": len(llm) - len(sent),
+                    "prompt_chars": sum(c.get("prompt_chars") or 0 for c in llm),
+                    "response_chars": sum(c.get("response_chars") or 0 for c in llm),
+                    "max_prompt_chars": max((c.get("prompt_chars") or 0 for c in llm), default=0),
+                    "input_tokens": sum(c.get("input_tokens") or 0 for c in sent),
+                    "output_tokens": sum(c.get("output_tokens") or 0 for c in sent),
+                    "detail": [dict(c) for c in llm],
+                },
+            }
+
+
+@contextmanager
+def recording() -> Iterator[Recorder]:
+    """Binds a fresh Recorder to the current context for the duration of a run."""
+    recorder = Recorder()
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+def current() -> Recorder | None:
+    return _current.get()
+
+
+def propagate(fn: Callable) -> Callable:
+    """Wraps fn to run in a copy of the caller's context (thread pools do not inherit it)."""
+    ctx = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # One copy per call: a context cannot be entered by two threads at once
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def http_call(provider: str, bytes_received: int = 0, error: bool = False, cached: bool = False) -> None:
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.http_call(provider, bytes_received, error, cached)
+
+
+def rate_limit_headers(provider: str, headers) -> None:
+    """Records X-RateLimit-Remaining / -Limit / -Reset (GitHub: per X-RateLimit-Resource) if present."""
+    recorder = _current.get()
+    if recorder is None:
+        return
+    h = {k.lower(): v for k, v in headers.items()}
+    remaining = h.get("x-ratelimit-remaining")
+    if remaining is None:
+        return
+    try:
+        remaining_n = int(float(remaining))
+        limit = int(float(h["x-ratelimit-limit"])) if "x-ratelimit-limit" in h else None
+        reset = float(h["x-ratelimit-reset"]) if "x-ratelimit-reset" in h else None
+    except ValueError:
+        return
+    # Reddit sends seconds until reset, GitHub an epoch timestamp
+    if reset is not None and reset < 10**9:
+        reset += time.time()
+    resource = h.get("x-ratelimit-resource")
+    recorder.rate_limit(f"{provider}.{resource}" if resource else provider, remaining_n, limit, reset)
+
+
+def llm_call(label: str, stats: dict) -> None:
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.llm_call(label, stats)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Adds the wall time of the block to section `name` (summed if entered several times)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder = _current.get()
+        if recorder is not None:
+            recorder.section(name, time.perf_counter() - start)
+
+
+def metrics_path(report_path: str | Path) -> Path:
+    """AUDIT_X.md -> AUDIT_X.metrics.json (same directory)."""
+    p = Path(report_path)
+    return p.with_name(f"{p.stem}.metrics.json")
+
+
+def write_json(summary: dict, path: str | Path) -> Path:
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=out.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, default=str)
+    os.replace(tmp, out)
+    return out
+
+
+def markdown_table(summary: dict) -> list[str]:
+    """Report lines: one row per provider, then stage times, rate limits and LLM sizes."""
+    lines = [
+        "| Provider | HTTP calls | Cached | Errors | Received |",
+        "| --- | ---: | ---: | ---: | ---: |",
+    ]
+    for provider, c in sorted(summary.get("http", {}).items()):
+        lines.append(f"| {provider} | {c['calls']} | {c['cached']} | {c['errors']} | {c['bytes'] / 1024:.1f} KB |")
+    lines.append("")
+    stages = {**summary.get("stages", {}), **summary.get("sections", {})}
+    if stages:
+        lines.append("- **Wall time:** " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in stages.items()))
+    for key, rl in sorted(summary.get("rate_limits", {}).items()):
+        lines.append(f"- **Rate limit left ({key}):** {rl['remaining']}" + (f" / {rl['limit']}" if rl.get("limit") else ""))
+    llm = summary.get("llm") or {}
+    if llm.get("calls"):
+        lines.append(
+            f"- **LLM:** {llm['calls']} calls ({llm['cached']} cached), prompts {llm['prompt_chars']} chars "
+            f"(largest {llm['max_prompt_chars']}), responses {llm['response_chars']} chars, "
+            f"{llm['input_tokens']} tokens in / {llm['output_tokens']} out"
+        )
+    return lines
@@ -1,13 +1,23 @@
 """
 Mistral-based analysis: red flags, community score, market positioning, lab vs social correlation.
-Single LLM call with all scanner data. Uses only Mistral API (via LangChain).
+Single LLM call with all scanner data, or (chunked mode) map-reduce: the full corpus is split into
+token-budgeted chunks summarised in parallel, then one reduce call writes the report sections.
+Before either, recurring complaints are clustered locally (core.clustering): each cluster is sent once, as its
+representative with the cluster's size and issue numbers, and the largest clusters are returned for the report.
+With on_section, the final call is streamed: sections are parsed as they arrive (SectionParser) and handed on as
+soon as each is complete, and a response that cannot be a report is abandoned early.
+Uses only Mistral API (via LangChain), or the local fake model with LLM_PROVIDER=fake; responses are cached
+by core.llm_client.
 """
 
 import logging
 import os
 import re
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
-from langchain_mistralai import ChatMistralAI
+from core import clustering, context_ranker, llm_client, metrics
 
 log = logging.getLogger(__name__)
 
@@ -18,53 +28,249 @@ LAB_FINDINGS = """
 - Performance: Strong p50 (~200ms on 10k docs) but p95 degrades at scale.
 """
 
+# Defaults for the audit target; other targets override them via TARGET["name"], ["competitors"],
+# ["lab_findings"] and ["lab_findings_short"]
+DEFAULT_TARGET_PROFILE = {
+    "name": "Meilisearch",
+    "competitors": ["Typesense", "Algolia"],
+    "lab_findings": LAB_FINDINGS,
+    "lab_findings_short": "Rust panic/crash, OpenAI/default routing, p95 degradation",
+}
 
-def run(results: dict) -> dict:
+# Single mode: character budget for the community data sent in one call (filled by relevance, see core.context_ranker)
+SINGLE_CONTEXT_CHARS = 12000
+# Chunked mode: token budget per map call (~4 chars per token), excerpt length per item, parallel map calls
+CHUNK_TOKEN_BUDGET = 6000
+CHUNK_EXCERPT_CHARS = 1200
+MAP_CONCURRENCY = 4
+CHARS_PER_TOKEN = 4
+# Sections of the final response, in report order
+SECTIONS = ("Summary", "Red Flags (Social)", "Market Positioning", "Correlation Lab vs Social")
+# Streaming: text allowed before the first section header before the response is abandoned as malformed
+MAX_PREAMBLE_CHARS = 500
+SECTION_MAX_CHARS = 2000
+# Recurring clusters listed in the analysis (report), issue numbers cited per cluster in prompts
+MAX_REPORTED_CLUSTERS = 15
+MAX_CLUSTER_REFS = 10
+_SOURCE_NOUNS = {"github": "GitHub issues", "tavily": "web results", "reddit": "Reddit posts"}
+
+_MAP_PROMPT = """You are helping an analyst audit community feedback about {name} for a potential acquisition (Mistral AI / {name}).
+
+Lab / technical findings from our side:
+{lab_findings}
+
+Below is one chunk ({index}/{total}) of community data (GitHub issues and/or web/social posts).
+
+{chunk}
+
+Summarise this chunk in at most 15 bullet points:
+- Recurring problems or concerns (cite issue numbers or sources, say how many items mention each).
+- Perceived strengths / weaknesses vs {competitors}, if mentioned.
+- Evidence for or against each lab finding, if any.
+- Overall sentiment of this chunk in one line.
+"""
+
+# Chunk summaries that together exceed CHUNK_TOKEN_BUDGET are merged in groups (repeatedly) before the reduce call
+_COMBINE_PROMPT = """You are helping an analyst audit community feedback about {name} for a potential acquisition (Mistral AI / {name}).
+
+Lab / technical findings from our side:
+{lab_findings}
+
+Below are summaries of chunks of community data (group {index}/{total}).
+
+{summaries}
+
+Merge them into at most 15 bullet points:
+- Recurring problems or concerns (keep the issue numbers and sources cited; add up how many items mention each).
+- Perceived strengths / weaknesses vs {competitors}, if mentioned.
+- Evidence for or against each lab finding, if any.
+- Overall sentiment of these chunks in one line.
+"""
+
+
+def _profile(target: dict | None) -> dict:
+    profile = dict(DEFAULT_TARGET_PROFILE)
+    profile.update({k: v for k, v in (target or {}).items() if k in DEFAULT_TARGET_PROFILE and v})
+    profile["competitors_text"] = " and ".join(profile["competitors"])
+    return profile
+
+
+def _error(message: str) -> dict:
+    return {
+        "error": message,
+        "summary_score": None,
+        "red_flags": [],
+        "market_positioning": "",
+        "correlation_lab_social": "",
+        "raw": "",
+    }
+
+
+def _github_header(g: dict) -> str:
+    vm = g.get("velocity_metrics", {})
+    return f"## GitHub ({g['repo']})\nIssues by category: {g.get('issues_by_category', {})}\nVelocity: avg first response (bugs) {vm.get('avg_first_response_hours_bugs')}h, (other) {vm.get('avg_first_response_hours_other')}h; p50/p90 (bugs) {vm.get('p50_first_response_hours_bugs')}h/{vm.get('p90_first_response_hours_bugs')}h.\n"
+
+
+def _themes(profile: dict, target: dict | None) -> dict[str, list[str]]:
+    """Audit themes the context is ranked against: the target's keyword categories and the lab findings."""
+    keyword_sets = [(target or {}).get(source, {}).get("keywords") for source in ("github", "tavily", "reddit")]
+    return context_ranker.themes([k for k in keyword_sets if k], profile["lab_findings"])
+
+
+def _corpus(results: dict) -> list[tuple[str, dict]]:
+    """Every scanned item as (source, item), GitHub first, then web, then Reddit."""
+    items = [("github", i) for i in (results.get("github") or {}).get("issues") or []]
+    items += [("tavily", r) for r in (results.get("tavily") or {}).get("results") or []]
+    items += [("reddit", p) for p in (results.get("reddit") or {}).get("posts") or []]
+    return items
+
+
+def _item_text(source: str, item: dict) -> str:
+    if source == "tavily":
+        return f"{item.get('title', '')}\n{item.get('content', '')}"
+    return f"{item.get('title') or ''}\n{item.get('body') or ''}"
+
+
+def _cluster(items: list[tuple[str, dict]]) -> list[clustering.Cluster]:
+    with metrics.timed("analysis.cluster"):
+        return clustering.cluster([_item_text(source, item) for source, item in items])
+
+
+def _singletons(items: list[tuple[str, dict]]) -> list[clustering.Cluster]:
+    return [clustering.Cluster([k]) for k in range(len(items))]
+
+
+def _cluster_sources(items: list[tuple[str, dict]], c: clustering.Cluster) -> tuple[dict[str, int], list[int]]:
+    """Members per source, and the members' issue numbers."""
+    sources: dict[str, int] = {}
+    numbers = []
+    for k in c.members:
+        source, item = items[k]
+        sources[source] = sources.get(source, 0) + 1
+        if source == "github":
+            numbers.append(item["number"])
+    return sources, numbers
+
+
+def _recurring(items: list[tuple[str, dict]], c: clustering.Cluster) -> str:
+    """Prompt prefix of a cluster's representative: cluster size, members per source and issue numbers."""
+    sources, numbers = _cluster_sources(items, c)
+    parts = []
+    for source, count in sources.items():
+        part = f"{count} {_SOURCE_NOUNS[source]}"
+        if source == "github":
+            part += " " + ", ".join(f"#{n}" for n in numbers[:MAX_CLUSTER_REFS]) + (f" +{len(numbers) - MAX_CLUSTER_REFS} more" if len(numbers) > MAX_CLUSTER_REFS else "")
+        parts.append(part)
+    return f"[recurring, {len(c)} similar items: {'; '.join(parts)}] "
+
+
+def _grouped(items: list[tuple[str, dict]], clusters: list[clustering.Cluster], line) -> list[tuple[str, dict, str]]:
+    """(source, representative, prompt line) per cluster; line(source, item) is the item's own line."""
+    out = []
+    for c in clusters:
+        source, item = items[c.representative]
+        text = line(source, item)
+        if len(c) > 1:
+            text = "- " + _recurring(items, c) + text[2:]
+        out.append((source, item, text))
+    return out
+
+
+def _context_line(source: str, item: dict) -> str:
+    if source == "github":
+        return f"- #{item['number']} [{item['state']}] {item['title']}\n  {item['body'][:400]}...\n"
+    if source == "tavily":
+        return f"- {item.get('title', '')} | {item.get('content', '')[:400]}...\n"
+    return f"- {item.get('title', '')} | {item.get('body', '')[:300]}...\n"
+
+
+def _build_context(results: dict, themes: dict[str, list[str]], budget: int = SINGLE_CONTEXT_CHARS, clusters: list[clustering.Cluster] | None = None) -> tuple[str, int]:
     """
-    Analyzes scanner results with Mistral. Returns structured analysis for the report.
+    Single-call context: every issue / web result / Reddit post (one representative per cluster) ranked against the
+    audit themes, the best packed into budget chars with per-source quotas (core.context_ranker).
+    Returns (context, items left out).
     """
-    api_key = os.getenv("MISTRAL_API_KEY")
-    if not api_key:
-        log.warning("MISTRAL_API_KEY not set.")
-        return {
-            "error": "MISTRAL_API_KEY not set",
-            "summary_score": None,
-            "red_flags": [],
-            "market_positioning": "",
-            "correlation_lab_social": "",
-            "raw": "",
-        }
-
-    # Build context from GitHub and/or Tavily (multi-source: Reddit, HN, blogs)
+    items = _corpus(results)
+    candidates: dict[str, list[context_ranker.Candidate]] = {}
+    for source, item, line in _grouped(items, clusters if clusters is not None else _singletons(items), _context_line):
+        text = item.get("content", "") if source == "tavily" else item.get("body", "")
+        candidates.setdefault(source, []).append(context_ranker.Candidate(source, line, item.get("title", ""), text))
+    if not candidates:
+        return "No issue or post data available.", 0
+    headers: dict[str, str] = {}
+    if "github" in candidates:
+        headers["github"] = _github_header(results["github"]) + "\n### Sample issues (title + excerpt)\n"
+    if "tavily" in candidates:
+        headers["tavily"] = "## Web / Social (Tavily: Reddit, HN, Stack Overflow, blogs)\n"
+    if "reddit" in candidates:
+        headers["reddit"] = "## Reddit (PRAW)\n"
+    selected, dropped = context_ranker.select(candidates, themes, budget - sum(len(h) + 1 for h in headers.values()))
     context_parts = []
-    if "github" in results and results["github"].get("issues"):
-        g = results["github"]
-        context_parts.append(f"## GitHub ({g['repo']})\nIssues by category: {g.get('issues_by_category', {})}\nVelocity: avg first response (bugs) {g.get('velocity_metrics', {}).get('avg_first_response_hours_bugs')}h, (other) {g.get('velocity_metrics', {}).get('avg_first_response_hours_other')}h.\n\n### Sample issues (title + excerpt)\n")
-        for i in g["issues"][:50]:
-            context_parts.append(f"- #{i['number']} [{i['state']}] {i['title']}\n  {i['body'][:400]}...\n")
-    if "tavily" in results and results["tavily"].get("results"):
-        t = results["tavily"]
-        context_parts.append("## Web / Social (Tavily: Reddit, HN, Stack Overflow, blogs)\n")
-        for r in t.get("results", [])[:40]:
-            context_parts.append(f"- {r.get('title', '')} | {r.get('content', '')[:400]}...\n")
-    if "reddit" in results and results["reddit"].get("posts"):
-        r = results["reddit"]
-        context_parts.append("## Reddit (PRAW)\n")
-        for p in r.get("posts", [])[:30]:
-            context_parts.append(f"- {p.get('title', '')} | {p.get('body', '')[:300]}...\n")
-    context = "\n".join(context_parts) or "No issue or post data available."
-    log.info("Context size: %d chars (GitHub + Tavily/Reddit). Calling Mistral (mistral-large-latest)...", len(context))
-
-    llm = ChatMistralAI(api_key=api_key, model="mistral-large-latest")
-    prompt = f"""You are an analyst producing a due diligence audit report for a potential acquisition (Mistral AI / Meilisearch).
-
-Below is community data from GitHub and/or Tavily (Reddit, HN, blogs) about Meilisearch.
+    for source, header in headers.items():
+        context_parts.append(header)
+        context_parts.extend(selected[source])
+    return "\n".join(context_parts), dropped
+
+
+def _corpus_items(results: dict, excerpt: int = CHUNK_EXCERPT_CHARS, clusters: list[clustering.Cluster] | None = None) -> list[str]:
+    """Every scanned item (one representative per cluster, largest clusters first) as one prompt line, no item cap."""
+    def line(source: str, item: dict) -> str:
+        if source == "github":
+            return f"- GitHub #{item['number']} [{item['state']}] {item['title']}\n  {item['body'][:excerpt]}\n"
+        if source == "tavily":
+            return f"- Web: {item.get('title', '')} ({item.get('url', '')}) | {item.get('content', '')[:excerpt]}\n"
+        return f"- Reddit: {item.get('title', '')} | {item.get('body', '')[:excerpt]}\n"
+
+    items = _corpus(results)
+    return [text for _, _, text in _grouped(items, clusters if clusters is not None else _singletons(items), line)]
+
+
+def _cluster_summary(items: list[tuple[str, dict]], clusters: list[clustering.Cluster]) -> list[dict]:
+    """The largest recurring clusters, for the report."""
+    out = []
+    for c in clusters:
+        if len(c) < 2 or len(out) >= MAX_REPORTED_CLUSTERS:
+            break
+        source, item = items[c.representative]
+        sources, numbers = _cluster_sources(items, c)
+        out.append({
+            "size": len(c),
+            "terms": c.label,
+            "sources": sources,
+            "representative": f"#{item['number']}" if source == "github" else item.get("url", ""),
+            "title": item.get("title", ""),
+            "issues": numbers,
+        })
+    return out
+
+
+def _chunk(items: list[str], token_budget: int = CHUNK_TOKEN_BUDGET) -> list[list[str]]:
+    """Greedy packing of items into chunks of at most token_budget (estimated) tokens each."""
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    used = 0
+    for item in items:
+        cost = len(item) // CHARS_PER_TOKEN + 1
+        if current and used + cost > token_budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _final_prompt(context: str, profile: dict) -> str:
+    return f"""You are an analyst producing a due diligence audit report for a potential acquisition (Mistral AI / {profile['name']}).
+
+Below is community data from GitHub and/or Tavily (Reddit, HN, blogs) about {profile['name']}.
 
 Lab / technical findings from our side:
-{LAB_FINDINGS}
+{profile['lab_findings']}
 
 Community data:
-{context[:12000]}
+{context}
 
 Respond in the following exact format (use the section headers as given).
 
@@ -76,42 +282,148 @@ Respond in the following exact format (use the section headers as given).
 List the top 5 recurring problems or concerns mentioned by developers. One line each, numbered 1. to 5.
 
 ## Market Positioning
-- Strengths perceived vs Typesense and Algolia (bullet points).
-- Weaknesses perceived vs Typesense and Algolia (bullet points).
+- Strengths perceived vs {profile['competitors_text']} (bullet points).
+- Weaknesses perceived vs {profile['competitors_text']} (bullet points).
 
 ## Correlation Lab vs Social
-- Do the lab findings (Rust panic/crash, OpenAI/default routing, p95 degradation) appear in community reports? Yes/No or Partially for each, with one sentence evidence when possible.
+- Do the lab findings ({profile['lab_findings_short']}) appear in community reports? Yes/No or Partially for each, with one sentence evidence when possible.
 """
 
+
+def _summarise(llm, prompts: list[str], step: str, refresh_cache: bool = False) -> list[str | None]:
+    """Runs the prompts in parallel (MAP_CONCURRENCY at a time); None for each call that failed."""
+    def summarise(index: int, prompt: str) -> tuple[str, dict]:
+        return llm_client.invoke(llm, prompt, refresh=refresh_cache, label=f"{step} {index + 1}/{len(prompts)}")
+
+    with ThreadPoolExecutor(max_workers=MAP_CONCURRENCY, thread_name_prefix="llm-map") as pool:
+        summarise = metrics.propagate(summarise)
+        futures = [pool.submit(summarise, k, p) for k, p in enumerate(prompts)]
+    out = []
+    for k, future in enumerate(futures):
+        try:
+            summary, stats = future.result()
+        except Exception as e:
+            log.warning("  %s %d/%d failed: %s", step.capitalize(), k + 1, len(prompts), e)
+            out.append(None)
+            continue
+        log.info("  %s %d/%d: %d prompt chars (%s tokens in), %s tokens out, %.1fs%s.", step.capitalize(), k + 1, len(prompts), stats["prompt_chars"], stats["input_tokens"], stats["output_tokens"], stats["seconds"], " (cached)" if stats["cached"] else "")
+        out.append(summary)
+    return out
+
+
+def _tokens(texts: list[str]) -> int:
+    return sum(len(t) // CHARS_PER_TOKEN + 1 for t in texts)
+
+
+def _combine(llm, summaries: list[str], profile: dict, refresh_cache: bool = False, token_budget: int = CHUNK_TOKEN_BUDGET) -> list[str]:
+    """Merges summaries in groups of at most token_budget, level after level, until they fit token_budget together."""
+    level = 0
+    while len(summaries) > 1 and _tokens(summaries) > token_budget:
+        level += 1
+        groups = _chunk(summaries, token_budget)
+        if len(groups) == len(summaries):
+            # Every summary fills half the budget or more: merge them two by two so that each level shrinks
+            groups = [summaries[k:k + 2] for k in range(0, len(summaries), 2)]
+        log.info("Combine level %d: %d summaries (~%d tokens, budget %d) merged in %d groups.", level, len(summaries), _tokens(summaries), token_budget, len(groups))
+        prompts = [_COMBINE_PROMPT.format(name=profile["name"], competitors=profile["competitors_text"], lab_findings=profile["lab_findings"], index=k + 1, total=len(groups), summaries="\n".join(g)) for k, g in enumerate(groups)]
+        with metrics.timed("analysis.combine"):
+            merged = _summarise(llm, prompts, f"combine {level}", refresh_cache)
+        summaries = [f"### Summary {k + 1} of level {level} ({len(g)} merged)\n{m}\n" for k, (g, m) in enumerate(zip(groups, merged)) if m is not None]
+        if not summaries:
+            raise RuntimeError(f"all {len(groups)} combine calls failed (level {level})")
+    return summaries
+
+
+def _map_reduce_context(llm, results: dict, profile: dict, refresh_cache: bool = False, clusters: list[clustering.Cluster] | None = None) -> str:
+    """
+    Map step: summarises every chunk of the full corpus in parallel; summaries that do not fit one chunk budget
+    together are then merged in groups (_combine). Returns the context for the reduce call.
+    """
+    chunks = _chunk(_corpus_items(results, clusters=clusters))
+    log.info("Chunked analysis: %d chunks (budget ~%d tokens each), %d in parallel.", len(chunks), CHUNK_TOKEN_BUDGET, MAP_CONCURRENCY)
+    prompts = [_MAP_PROMPT.format(name=profile["name"], competitors=profile["competitors_text"], lab_findings=profile["lab_findings"], index=k + 1, total=len(chunks), chunk="\n".join(chunk)) for k, chunk in enumerate(chunks)]
+    with metrics.timed("analysis.map"):
+        outputs = _summarise(llm, prompts, "map", refresh_cache)
+    summaries = [f"### Chunk {k + 1} ({len(chunk)} items)\n{summary}\n" for k, (chunk, summary) in enumerate(zip(chunks, outputs)) if summary is not None]
+    if not summaries:
+        raise RuntimeError(f"all {len(chunks)} chunk summaries failed")
+    summaries = _combine(llm, summaries, profile, refresh_cache)
+
+    header = _github_header(results["github"]) if (results.get("github") or {}).get("issues") else ""
+    return header + "\n## Summaries of the full community corpus (map step)\n\n" + "\n".join(summaries)
+
+
+def run(results: dict, mode: str = "auto", refresh_cache: bool = False, target: dict | None = None, on_section: Callable[[str, dict], None] | None = None) -> dict:
+    """
+    Analyzes scanner results with Mistral. Returns structured analysis for the report.
+    mode: "single" (one call, the most relevant items within the context budget), "chunked" (map-reduce over the
+    full corpus), "auto" (chunked only when the single-call context would leave items out).
+    refresh_cache: ignore cached LLM responses (they are then rewritten).
+    target: config TARGET, for the name / competitors / lab findings used in prompts (defaults: Meilisearch).
+    on_section: streams the final call; on_section(title, fields) gets each section (see section_fields) as soon as
+    it is complete.
+    """
+    try:
+        provider = llm_client.provider()
+    except ValueError as e:
+        log.warning("%s", e)
+        return _error(str(e))
+    if provider == "mistral" and not os.getenv("MISTRAL_API_KEY"):
+        log.warning("MISTRAL_API_KEY not set.")
+        return _error("MISTRAL_API_KEY not set")
+
+    profile = _profile(target)
+    items = _corpus(results)
+    clusters = _cluster(items)
+    context, dropped = _build_context(results, _themes(profile, target), clusters=clusters)
+    if mode == "auto":
+        mode = "chunked" if dropped else "single"
+    llm = llm_client.get_llm()
+    model = llm_client.model_name(llm)
+
     try:
-        msg = llm.invoke(prompt)
-        raw = msg.content if hasattr(msg, "content") else str(msg)
-        log.info("Mistral response received (%d chars). Parsing score and sections...", len(raw))
+        if mode == "chunked":
+            context = _map_reduce_context(llm, results, profile, refresh_cache, clusters)
+            log.info("Reduce: %d chars of chunk summaries. Calling %s (%s)...", len(context), provider, model)
+        else:
+            log.info("Context size: %d chars (GitHub + Tavily/Reddit), %d lower-ranked items left out. Calling %s (%s)...", len(context), dropped, provider, model)
+        call = "reduce" if mode == "chunked" else "single"
+        with metrics.timed(f"analysis.{call}"):
+            if on_section is None:
+                raw, stats = llm_client.invoke(llm, _final_prompt(context, profile), refresh=refresh_cache, label=call)
+            else:
+                parser = SectionParser(lambda title, body: on_section(title, section_fields(title, body)))
+                raw, stats = llm_client.stream(llm, _final_prompt(context, profile), parser.feed, refresh=refresh_cache, label=call)
+                parser.close()
+                log.info("Streamed response: first token after %ss.", stats["first_token_seconds"])
+        log.info("Response received (%d chars, %s tokens in, %s tokens out, %.1fs%s). Parsing score and sections...", len(raw), stats["input_tokens"], stats["output_tokens"], stats["seconds"], ", cached" if stats["cached"] else "")
+    except MalformedResponse as e:
+        log.error("Malformed LLM response, generation stopped: %s", e)
+        return _error(f"malformed LLM response: {e}")
     except Exception as e:
         log.exception("Mistral API call failed.")
-        return {
-            "error": str(e),
-            "summary_score": None,
-            "red_flags": [],
-            "market_positioning": "",
-            "correlation_lab_social": "",
-            "raw": "",
-        }
+        return _error(str(e))
+
+    analysis = _parse(raw)
+    analysis["clusters"] = _cluster_summary(items, clusters)
+    return analysis
 
-    # Parse into structured fields for report
-    summary_score = None
-    m = re.search(r"confidence score:\s*(\d+(?:\.\d+)?)\s*/?\s*10", raw, re.I)
-    if m:
-        summary_score = float(m.group(1))
 
-    red_flags = []
-    for m in re.finditer(r"^\s*\d+\.\s*(.+?)(?=\n\s*\d+\.|\n##|\Z)", raw, re.M | re.S):
-        red_flags.append(m.group(1).strip()[:500])
+def _score(text: str) -> float | None:
+    m = re.search(r"confidence score:\s*(\d+(?:\.\d+)?)\s*/?\s*10", text, re.I)
+    return float(m.group(1)) if m else None
 
+
+def _red_flags(text: str) -> list[str]:
+    return [m.group(1).strip()[:500] for m in re.finditer(r"^\s*\d+\.\s*(.+?)(?=\n\s*\d+\.|\n##|\Z)", text, re.M | re.S)][:5]
+
+
+def _parse(raw: str) -> dict:
+    # Parse into structured fields for report
     return {
         "error": None,
-        "summary_score": summary_score,
-        "red_flags": red_flags[:5],
+        "summary_score": _score(raw),
+        "red_flags": _red_flags(raw),
         "market_positioning": _extract_section(raw, "Market Positioning"),
         "correlation_lab_social": _extract_section(raw, "Correlation Lab vs Social"),
         "raw": raw,
@@ -121,4 +433,72 @@ List the top 5 recurring problems or concerns mentioned by developers. One line
 def _extract_section(text: str, title: str) -> str:
     pattern = rf"##\s+{re.escape(title)}\s*\n(.*?)(?=\n##\s+|\Z)"
     m = re.search(pattern, text, re.S | re.I)
-    return m.group(1).strip()[:2000] if m else ""
+    return m.group(1).strip()[:SECTION_MAX_CHARS] if m else ""
+
+
+def section_fields(title: str, body: str) -> dict:
+    """The analysis fields (as in run()'s result) one complete section of the response gives."""
+    if title == "Summary":
+        return {"summary_score": _score(body), "raw": f"## Summary\n{body}"}
+    if title == "Red Flags (Social)":
+        return {"red_flags": _red_flags(body)}
+    if title == "Market Positioning":
+        return {"market_positioning": body[:SECTION_MAX_CHARS]}
+    return {"correlation_lab_social": body[:SECTION_MAX_CHARS]}
+
+
+class MalformedResponse(ValueError):
+    pass
+
+
+class SectionParser:
+    """
+    Incremental parser of the final response: feed() it text as it arrives; on_section(title, body) is called for
+    each of SECTIONS once the next header (or close()) shows it is complete. Raises MalformedResponse as soon as the
+    response cannot be a report (no header within MAX_PREAMBLE_CHARS, a section repeated, no section at all).
+    """
+
+    def __init__(self, on_section: Callable[[str, str], None]):
+        self.on_section = on_section
+        self._titles = {t.lower(): t for t in SECTIONS}
+        self._pending = ""
+        self._title: str | None = None
+        self._body: list[str] = []
+        self._seen: set[str] = set()
+        self._preamble = 0
+
+    def feed(self, text: str) -> None:
+        *lines, self._pending = (self._pending + text).split("\n")
+        for line in lines:
+            self._line(line)
+        if self._title is None and self._preamble + len(self._pending) > MAX_PREAMBLE_CHARS:
+            raise MalformedResponse(f"no section header in the first {MAX_PREAMBLE_CHARS} chars")
+
+    def _line(self, line: str) -> None:
+        m = re.match(r"\s*##\s+(.+?)\s*$", line)
+        if m:
+            self._flush()
+            title = self._titles.get(m.group(1).lower(), m.group(1))
+            if title in self._seen:
+                raise MalformedResponse(f"section {title!r} repeated")
+            self._seen.add(title)
+            self._title = title
+        elif self._title is None:
+            self._preamble += len(line) + 1
+        else:
+            self._body.append(line)
+
+    def _flush(self) -> None:
+        # Headers other than SECTIONS are tolerated, their text is not handed on
+        if self._title in SECTIONS:
+            self.on_section(self._title, "\n".join(self._body).strip())
+        self._body = []
+
+    def close(self) -> None:
+        """End of the response: hands on the last section."""
+        if self._pending:
+            self._line(self._pending)
+            self._pending = ""
+        self._flush()
+        if not self._seen & set(SECTIONS):
+            raise MalformedResponse("no report section in the response")
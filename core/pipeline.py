@@ -0,0 +1,133 @@
+"""
+Minimal stage DAG runner for the orchestrator.
+Each stage runs on its own daemon thread as soon as every stage it comes after has finished (succeeded, failed or
+timed out), so independent I/O-bound scanners overlap. A stage failure or timeout is recorded and does not
+block the others; downstream stages only see the outputs that succeeded.
+A timed-out stage's thread cannot be killed and keeps running; being a daemon it does not hold the process at exit,
+but the worker pools it started do (concurrent.futures joins them): CLIs call exit_if_abandoned() when done.
+"""
+
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class PipelineResult:
+    outputs: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+
+    def snapshot(self) -> "PipelineResult":
+        return PipelineResult(dict(self.outputs), dict(self.errors), dict(self.timings), self.wall_seconds)
+
+
+@dataclass
+class Stage:
+    name: str
+    # Receives a snapshot of the run so far: outputs of succeeded stages, errors of failed ones
+    fn: Callable[[PipelineResult], Any]
+    after: tuple[str, ...] = ()
+    timeout: float | None = None
+
+
+# Threads of the stages that timed out, across runs of this process
+_abandoned: list[threading.Thread] = []
+_abandoned_lock = threading.Lock()
+
+
+def _start(stage: Stage, snapshot: PipelineResult) -> Future:
+    """Runs the stage on a daemon thread, in the caller's context (e.g. the run's metrics recorder)."""
+    future: Future = Future()
+    context = contextvars.copy_context()
+
+    def target() -> None:
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(context.run(stage.fn, snapshot))
+        except BaseException as e:
+            future.set_exception(e)
+
+    future.thread = threading.Thread(target=target, name=f"stage-{stage.name}", daemon=True)
+    future.thread.start()
+    return future
+
+
+def abandoned() -> list[str]:
+    """Stages that timed out and are still running in the background."""
+    with _abandoned_lock:
+        _abandoned[:] = [t for t in _abandoned if t.is_alive()]
+        return [t.name.removeprefix("stage-") for t in _abandoned]
+
+
+def exit_if_abandoned(code: int = 0) -> None:
+    """
+    Exits now if timed-out stages are still running: the concurrent.futures exit hook would otherwise wait for
+    their worker threads. For command-line entry points, once their output is written.
+    """
+    stages = abandoned()
+    if not stages:
+        return
+    log.warning("Exiting without waiting for abandoned stage(s): %s.", ", ".join(stages))
+    logging.shutdown()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(code)
+
+
+def run(stages: list[Stage]) -> PipelineResult:
+    names = {s.name for s in stages}
+    for s in stages:
+        unknown = set(s.after) - names
+        if unknown:
+            raise ValueError(f"Stage {s.name} comes after unknown stage(s): {', '.join(sorted(unknown))}")
+
+    result = PipelineResult()
+    pending = list(stages)
+    running: dict[Future, tuple[Stage, float]] = {}
+    finished: set[str] = set()
+    start = time.perf_counter()
+    while pending or running:
+        for s in [s for s in pending if set(s.after) <= finished]:
+            pending.remove(s)
+            log.info("Stage %s started.", s.name)
+            running[_start(s, result.snapshot())] = (s, time.perf_counter())
+        if not running:
+            raise RuntimeError(f"Stage dependency cycle: {', '.join(s.name for s in pending)}")
+
+        now = time.perf_counter()
+        deadlines = [t0 + s.timeout - now for s, t0 in running.values() if s.timeout is not None]
+        done, _ = wait(running, timeout=max(0.0, min(deadlines)) if deadlines else None, return_when=FIRST_COMPLETED)
+        now = time.perf_counter()
+        for future in done:
+            s, t0 = running.pop(future)
+            result.timings[s.name] = round(now - t0, 2)
+            try:
+                result.outputs[s.name] = future.result()
+                log.info("Stage %s finished in %.1fs.", s.name, result.timings[s.name])
+            except Exception as e:
+                result.errors[s.name] = f"{type(e).__name__}: {e}"
+                log.exception("Stage %s failed after %.1fs.", s.name, result.timings[s.name])
+            finished.add(s.name)
+        for future, (s, t0) in list(running.items()):
+            if s.timeout is not None and now - t0 >= s.timeout:
+                # Threads cannot be killed: the stage is abandoned and its late result ignored
+                running.pop(future)
+                with _abandoned_lock:
+                    _abandoned.append(future.thread)
+                result.timings[s.name] = round(now - t0, 2)
+                result.errors[s.name] = f"timed out after {s.timeout:g}s"
+                log.error("Stage %s timed out after %gs; continuing without it.", s.name, s.timeout)
+                finished.add(s.name)
+    result.wall_seconds = round(time.perf_counter() - start, 2)
+    return result
@@ -0,0 +1,291 @@
+"""
+Reddit scanner (PRAW): searches every (subreddit, keyword) pair. Only invoked when "reddit" is in config TARGET["sources"].
+Searches run concurrently (bounded) and paginate 100 posts per request; every request, across all workers,
+goes through one shared pacer that keeps the scan under Reddit's per-client rate limit.
+Posts are deduped by id across queries (each keeps the queries that found it), then by near-identical text (crossposts),
+then tagged by matching the keyword terms in their title and text (core.keyword_matcher). Every post is kept: the terms
+are search phrases ("Meilisearch vs Typesense"), which relevant posts rarely repeat word for word.
+Fixture mode replays recorded search pages without PRAW or credentials: REDDIT_FIXTURE=path replays,
+REDDIT_FIXTURE=path with REDDIT_RECORD=1 runs live and records the pages to that file.
+"""
+
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+from core import concurrency, dedupe, metrics
+from core.keyword_matcher import get_matcher
+
+log = logging.getLogger(__name__)
+
+# (subreddit, query) searches in flight at once
+MAX_CONCURRENCY = 4
+# Reddit allows 100 requests per minute per OAuth client; keep a margin for the token request
+REQUESTS_PER_MINUTE = 90
+# 100 is the API maximum page size
+PAGE_SIZE = 100
+MAX_POSTS_PER_QUERY = 250
+# Same window as the GitHub scan (ISSUES_LOOKBACK_MONTHS = 12)
+SEARCH_TIME_FILTER = "year"
+SEARCH_SORT = "relevance"
+# Retries for transient failures (429, 5xx, connection errors); full-jitter exponential backoff
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 20.0
+# As for Tavily results: a term must start a word ("crash" matches "crashes")
+KEYWORD_BOUNDARY = "start"
+# posts_by_category bucket of the posts that match no term
+UNTAGGED = "untagged"
+
+DEFAULT_USER_AGENT = "script:startup-dued-forge:v0.1.0"
+
+_local = threading.local()
+
+
+class _Pacer:
+    """Spaces requests evenly across threads (PRAW's own header-based limiter is per client instance)."""
+
+    def __init__(self, per_minute: int):
+        self.interval = 60.0 / per_minute
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next)
+            self._next = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+
+_pacer = _Pacer(REQUESTS_PER_MINUTE)
+
+
+def _reddit():
+    """This thread's read-only PRAW client (PRAW instances are not thread-safe)."""
+    reddit = getattr(_local, "reddit", None)
+    if reddit is None:
+        import praw
+        import requests
+
+        session = requests.Session()
+        session.hooks["response"].append(_count_response)
+        reddit = praw.Reddit(
+            client_id=os.getenv("PRAW_CLIENT_ID"),
+            client_secret=os.getenv("PRAW_CLIENT_SECRET"),
+            user_agent=os.getenv("PRAW_USER_AGENT") or DEFAULT_USER_AGENT,
+            check_for_updates=False,
+            requestor_kwargs={"session": session},
+        )
+        reddit.read_only = True
+        _local.reddit = reddit
+    return reddit
+
+
+def _count_response(response, *args, **kwargs) -> None:
+    metrics.http_call("reddit", len(response.content), error=response.status_code >= 400)
+    metrics.rate_limit_headers("reddit", response.headers)
+
+
+def _is_transient(e: Exception) -> bool:
+    from prawcore.exceptions import RequestException, ServerError, TooManyRequests
+
+    return isinstance(e, (RequestException, ServerError, TooManyRequests))
+
+
+def _record(submission) -> dict:
+    created = datetime.fromtimestamp(submission.created_utc, tz=timezone.utc)
+    return {
+        "id": submission.id,
+        "title": submission.title or "",
+        "body": submission.selftext or "",
+        "subreddit": submission.subreddit.display_name,
+        "url": f"https://www.reddit.com{submission.permalink}",
+        "link": submission.url,
+        "author": str(submission.author) if submission.author else None,
+        "score": submission.score,
+        "num_comments": submission.num_comments,
+        "created_at": created.isoformat(),
+    }
+
+
+def _fetch_page(subreddit: str, query: str, after: str | None) -> tuple[list[dict], str | None]:
+    """One search request: (post records, cursor of the next page or None)."""
+    from praw.endpoints import API_PATH
+
+    params = {
+        "q": query,
+        "restrict_sr": True,
+        "sort": SEARCH_SORT,
+        "syntax": "lucene",
+        "t": SEARCH_TIME_FILTER,
+        "limit": PAGE_SIZE,
+    }
+    if after:
+        params["after"] = after
+    attempt = 0
+    while True:
+        _pacer.wait()
+        try:
+            with concurrency.slot():
+                listing = _reddit().get(API_PATH["search"].format(subreddit=subreddit), params=params)
+            return [_record(s) for s in listing.children], listing.after
+        except Exception as e:
+            if attempt >= MAX_RETRIES or not _is_transient(e):
+                raise
+            delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+            attempt += 1
+            log.info("  r/%s '%s' failed (%s), retry %d/%d in %.1fs.", subreddit, query[:50], e, attempt, MAX_RETRIES, delay)
+            time.sleep(delay)
+
+
+def _iter_search_pages(subreddit: str, query: str, max_posts: int) -> Iterator[list[dict]]:
+    """Yields result pages in order until max_posts or the end of the listing (no "after" cursor)."""
+    after = None
+    count = 0
+    while count < max_posts:
+        page, after = _fetch_page(subreddit, query, after)
+        page = page[:max_posts - count]
+        count += len(page)
+        if page:
+            yield page
+        if not after:
+            return
+
+
+def _fixture_key(subreddit: str, query: str) -> str:
+    return f"{subreddit}\t{query}"
+
+
+def _load_fixture(path: str) -> dict[str, list[list[dict]]]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return data.get("searches") or {}
+
+
+def _save_fixture(path: str, searches: dict[str, list[list[dict]]]) -> None:
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"searches": searches}, f, indent=1)
+    os.replace(tmp, target)
+    log.info("Reddit fixture recorded: %s (%d searches).", target, len(searches))
+
+
+def _queries(keywords: dict[str, list[str]], must_mention: str | None) -> list[tuple[str, str, str]]:
+    """(category, term, search query) per keyword; terms that do not name the target get it prepended."""
+    out = []
+    for category, terms in keywords.items():
+        for term in terms:
+            query = term
+            if must_mention and must_mention.lower() not in term.lower():
+                query = f"{must_mention} {term}"
+            out.append((category, term, query))
+    return out
+
+
+def run(
+    subreddits: list[str],
+    keywords: dict[str, list[str]],
+    must_mention: str | None = None,
+    max_posts_per_query: int = MAX_POSTS_PER_QUERY,
+    workers: int = MAX_CONCURRENCY,
+    fixture: str | None = None,
+    record: bool | None = None,
+) -> dict:
+    """
+    Searches each subreddit for each keyword term (prefixed with must_mention, e.g. the target name, when the term
+    does not contain it). Posts carry the categories and terms matched in their own title and text (the queries that
+    found them are kept in "queries"); posts matching no term have none and are counted as UNTAGGED.
+    fixture / record: replay or record search pages (defaults: REDDIT_FIXTURE, REDDIT_RECORD=1).
+    Returns a dict: results["reddit"]["posts"] for the analyzer.
+    """
+    fixture = fixture or os.getenv("REDDIT_FIXTURE") or None
+    record = record if record is not None else os.getenv("REDDIT_RECORD") == "1"
+    queries = _queries(keywords, must_mention)
+    pairs = [(sub, query) for sub in subreddits for _, _, query in queries]
+    replay = _load_fixture(fixture) if fixture and not record else None
+
+    if replay is None and not (os.getenv("PRAW_CLIENT_ID") and os.getenv("PRAW_CLIENT_SECRET")):
+        log.warning("PRAW_CLIENT_ID / PRAW_CLIENT_SECRET not set. Skipping Reddit.")
+        return {
+            "posts": [],
+            "error": "PRAW_CLIENT_ID / PRAW_CLIENT_SECRET not set",
+            "queries": [q for _, _, q in queries],
+        }
+
+    log.info("Reddit: %d subreddits x %d terms = %d searches, max %d posts each, %d concurrent%s.", len(subreddits), len(queries), len(pairs), max_posts_per_query, workers, " (fixture replay)" if replay is not None else "")
+    recorded: dict[str, list[list[dict]]] = {}
+
+    def search(subreddit: str, query: str) -> list[dict]:
+        key = _fixture_key(subreddit, query)
+        if replay is not None:
+            pages = replay.get(key, [])
+        else:
+            pages = list(_iter_search_pages(subreddit, query, max_posts_per_query))
+            if record:
+                recorded[key] = pages
+        return [post for page in pages for post in page]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="reddit") as pool:
+        search = metrics.propagate(search)
+        futures = [pool.submit(search, sub, query) for sub, query in pairs]
+
+    # Merge in search order: deterministic dedupe whatever the completion order
+    by_id: dict[str, dict] = {}
+    failed = 0
+    for i, ((sub, query), future) in enumerate(zip(pairs, futures)):
+        try:
+            found = future.result()
+        except Exception as e:
+            failed += 1
+            log.warning("  [%d/%d] r/%s '%s' failed: %s", i + 1, len(pairs), sub, query[:50], e)
+            continue
+        new = 0
+        for post in found:
+            kept = by_id.get(post["id"])
+            if kept is None:
+                kept = by_id[post["id"]] = {**post, "queries": []}
+                new += 1
+            if query not in kept["queries"]:
+                kept["queries"].append(query)
+        log.info("  [%d/%d] r/%s '%s' -> %d posts, %d new (%d total).", i + 1, len(pairs), sub, query[:50], len(found), new, len(by_id))
+
+    if record and fixture:
+        _save_fixture(fixture, recorded)
+
+    # Crossposts and copy-pasted threads across subreddits
+    posts = list(by_id.values())
+    posts, collapsed = dedupe.dedupe(posts, text=lambda p: f"{p['title']}\n{p['body']}", url=lambda p: p["url"], key=lambda p: p["id"])
+    if len(posts) != len(by_id):
+        log.info("  Collapsed %d near-identical posts.", len(by_id) - len(posts))
+
+    # Tags only: Reddit search is fuzzy (stemming, any-word matches), so many relevant posts match no phrase
+    matcher = get_matcher(keywords, boundary=KEYWORD_BOUNDARY)
+    by_category = dict.fromkeys([*keywords, UNTAGGED], 0)
+    for p in posts:
+        matched = matcher.match(f"{p['title']} {p['body']}")
+        p["categories"] = list(matched)
+        p["matched_terms"] = [t for terms in matched.values() for t in terms]
+        for category in matched or [UNTAGGED]:
+            by_category[category] += 1
+
+    log.info("Reddit finished: %d posts (deduplicated, %d untagged), %d searches failed.", len(posts), by_category[UNTAGGED], failed)
+    return {
+        "posts": posts,
+        "error": "all searches failed" if pairs and failed == len(pairs) else None,
+        "queries": [q for _, _, q in queries],
+        "subreddits": subreddits,
+        "searches_failed": failed,
+        "duplicates_collapsed": collapsed["url"] + collapsed["content"],
+        "posts_by_category": by_category,
+    }
@@ -1,28 +1,33 @@
 """
 Builds the final audit report in Markdown from scanner results + Mistral analysis.
+ProgressiveReport writes the analysis sections while a streamed analysis is still running.
 """
 
 import logging
 import re
+import threading
+import time
 from pathlib import Path
 
+from core import metrics
+
 log = logging.getLogger(__name__)
 
+# Velocity covers every scanned issue: only the slowest ones are listed
+MAX_VELOCITY_DETAILS = 25
+# Issue numbers listed per recurring cluster
+MAX_CLUSTER_ISSUES = 15
+_SOURCE_LABELS = {"github": "GitHub", "tavily": "web", "reddit": "Reddit"}
+
 
-def build(results: dict, analysis: dict, output_path: str | Path = "AUDIT_SOCIAL_REPORT.md") -> Path:
+def build(results: dict, analysis: dict, output_path: str | Path = "AUDIT_SOCIAL_REPORT.md", target_name: str = "Meilisearch", run_metrics: dict | None = None) -> Path:
     """
     Writes AUDIT_SOCIAL_REPORT.md: Summary, Red Flags, Market Positioning, Correlation, Data Summary.
+    run_metrics: core.metrics summary of the run so far; if given, a Run Metrics table is appended.
     """
     out = Path(output_path)
     log.info("Writing report to %s (sources: %s).", out, list(results.keys()))
-    sections = []
-
-    # Title and sources
-    sources = list(results.keys())
-    sections.append("# Social Audit Report – Meilisearch")
-    sections.append("")
-    sections.append(f"**Sources used:** {', '.join(sources) or 'None'}")
-    sections.append("")
+    sections = _title(results, target_name)
 
     if analysis.get("error"):
         sections.append("## Analysis Error")
@@ -30,45 +35,15 @@ def build(results: dict, analysis: dict, output_path: str | Path = "AUDIT_SOCIAL
         sections.append(f"Mistral analysis could not be run: `{analysis['error']}`")
         sections.append("")
         sections.append("Ensure `MISTRAL_API_KEY` is set in `.env` and the API is reachable.")
+        sections.extend(_run_metrics(run_metrics))
         out.write_text("\n".join(sections), encoding="utf-8")
         log.warning("Report written with analysis error only: %s", out)
         return out
 
-    # Summary
-    score = analysis.get("summary_score")
-    score_line = f"**Community confidence score: {score}/10**" if score is not None else "**Community confidence score:** N/A"
-    sections.append("## Summary")
-    sections.append("")
-    sections.append(score_line)
-    sections.append("")
-    if analysis.get("raw"):
-        summary_block = _take_until_next_section(analysis["raw"], "Summary")
-        if summary_block:
-            sections.append(summary_block.strip())
-    sections.append("")
-
-    # Red Flags
-    sections.append("## Red Flags (Social)")
-    sections.append("")
-    for i, flag in enumerate(analysis.get("red_flags") or [], 1):
-        sections.append(f"{i}. {flag}")
-    if not analysis.get("red_flags"):
-        sections.append("*None extracted.*")
-    sections.append("")
-
-    # Market positioning
-    sections.append("## Market Positioning")
-    sections.append("")
-    mp = analysis.get("market_positioning") or ""
-    sections.append(mp if mp else "*No content.*")
-    sections.append("")
-
-    # Correlation Lab vs Social
-    sections.append("## Correlation Lab vs Social")
-    sections.append("")
-    corr = analysis.get("correlation_lab_social") or ""
-    sections.append(corr if corr else "*No content.*")
-    sections.append("")
+    # Summary, Red Flags, Market Positioning, Correlation Lab vs Social
+    for render in _ANALYSIS_SECTIONS.values():
+        sections.extend(render(analysis))
+    sections.extend(_clusters(analysis.get("clusters") or []))
 
     # Data summary
     sections.append("---")
@@ -78,28 +53,187 @@ def build(results: dict, analysis: dict, output_path: str | Path = "AUDIT_SOCIAL
         g = results["github"]
         sections.append(f"- **GitHub repo:** {g.get('repo', '')}")
         sections.append(f"- **Issues matched:** {len(g.get('issues', []))}")
+        if g.get("duplicates_collapsed"):
+            sections.append(f"- **Near-duplicate issues collapsed:** {g['duplicates_collapsed']}")
         sections.append(f"- **By category:** {g.get('issues_by_category', {})}")
         vm = g.get("velocity_metrics", {})
         sections.append(f"- **Velocity (avg first response):** bugs {vm.get('avg_first_response_hours_bugs')}h (n={vm.get('sample_bugs')}), other {vm.get('avg_first_response_hours_other')}h (n={vm.get('sample_other')})")
+        sections.append(
+            f"- **Velocity (first response p50/p90/p95):** bugs {_hours(vm.get('p50_first_response_hours_bugs'))} / {_hours(vm.get('p90_first_response_hours_bugs'))} / {_hours(vm.get('p95_first_response_hours_bugs'))}, "
+            f"other {_hours(vm.get('p50_first_response_hours_other'))} / {_hours(vm.get('p90_first_response_hours_other'))} / {_hours(vm.get('p95_first_response_hours_other'))}"
+        )
+        if vm.get("sample_failed"):
+            sections.append(f"- **Velocity samples failed:** {vm['sample_failed']}")
+        sections.extend(_activity(g.get("analytics") or {}))
         details = g.get("velocity_sample_details") or []
         if details:
+            slowest = sorted(details, key=lambda d: d.get("hours_to_first_response") or 0, reverse=True)[:MAX_VELOCITY_DETAILS]
             sections.append("")
-            sections.append("#### Issues used for velocity average (time to first comment)")
+            sections.append(f"#### Slowest first responses (time to first comment, {len(slowest)} of {(vm.get('sample_bugs') or 0) + (vm.get('sample_other') or 0)} issues)")
             sections.append("")
-            for d in details:
+            for d in slowest:
                 sections.append(f"- [#{d.get('number')}]({d.get('url', '')}) — {d.get('hours_to_first_response')}h — *{d.get('type')}* — {d.get('title', '')[:80]}")
             sections.append("")
     if "tavily" in results and results["tavily"].get("results"):
         sections.append(f"- **Tavily (web/social) results:** {len(results['tavily']['results'])}")
+        if results["tavily"].get("duplicates_collapsed"):
+            sections.append(f"- **Duplicate web results collapsed:** {results['tavily']['duplicates_collapsed']}")
     if "reddit" in results and results["reddit"].get("posts"):
         sections.append(f"- **Reddit posts:** {len(results['reddit']['posts'])}")
+    for name, data in results.items():
+        if data.get("error"):
+            sections.append(f"- **{name} error:** `{data['error']}`")
     sections.append("")
+    sections.extend(_run_metrics(run_metrics))
 
     out.write_text("\n".join(sections), encoding="utf-8")
     log.info("Report written (%d bytes).", out.stat().st_size)
     return out
 
 
+def _title(results: dict, target_name: str) -> list[str]:
+    return [f"# Social Audit Report – {target_name}", "", f"**Sources used:** {', '.join(results.keys()) or 'None'}", ""]
+
+
+def _summary(analysis: dict) -> list[str]:
+    score = analysis.get("summary_score")
+    score_line = f"**Community confidence score: {score}/10**" if score is not None else "**Community confidence score:** N/A"
+    lines = ["## Summary", "", score_line, ""]
+    if analysis.get("raw"):
+        summary_block = _take_until_next_section(analysis["raw"], "Summary")
+        if summary_block:
+            lines.append(summary_block.strip())
+    lines.append("")
+    return lines
+
+
+def _red_flags(analysis: dict) -> list[str]:
+    lines = ["## Red Flags (Social)", ""]
+    for i, flag in enumerate(analysis.get("red_flags") or [], 1):
+        lines.append(f"{i}. {flag}")
+    if not analysis.get("red_flags"):
+        lines.append("*None extracted.*")
+    lines.append("")
+    return lines
+
+
+def _text_section(title: str, field: str):
+    def render(analysis: dict) -> list[str]:
+        return [f"## {title}", "", analysis.get(field) or "*No content.*", ""]
+    return render
+
+
+# Analysis sections in report order, keyed by their title in the LLM response (core.mistral_analyzer.SECTIONS)
+_ANALYSIS_SECTIONS = {
+    "Summary": _summary,
+    "Red Flags (Social)": _red_flags,
+    "Market Positioning": _text_section("Market Positioning", "market_positioning"),
+    "Correlation Lab vs Social": _text_section("Correlation Lab vs Social", "correlation_lab_social"),
+}
+
+
+class ProgressiveReport:
+    """
+    Report written while the analysis streams in: the title at once, then each analysis section as soon as it and
+    the sections before it are complete (section() is core.mistral_analyzer.run's on_section). build() then
+    rewrites the file with the full report.
+    """
+
+    def __init__(self, results: dict, output_path: str | Path = "AUDIT_SOCIAL_REPORT.md", target_name: str = "Meilisearch"):
+        self.path = Path(output_path)
+        self.started = time.perf_counter()
+        self._ready: dict[str, dict] = {}
+        self._order = list(_ANALYSIS_SECTIONS)
+        self._written = 0
+        self._lock = threading.Lock()
+        # Time to the first analysis section in the file
+        self.first_section_seconds: float | None = None
+        self.path.write_text("\n".join(_title(results, target_name)) + "\n", encoding="utf-8")
+
+    def section(self, title: str, fields: dict) -> None:
+        with self._lock:
+            self._ready[title] = fields
+            lines = []
+            while self._written < len(self._order) and self._order[self._written] in self._ready:
+                name = self._order[self._written]
+                lines.extend(_ANALYSIS_SECTIONS[name](self._ready[name]))
+                self._written += 1
+            if not lines:
+                return
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            first = self.first_section_seconds is None
+            if first:
+                self.first_section_seconds = round(time.perf_counter() - self.started, 2)
+        recorder = metrics.current()
+        if first and recorder is not None:
+            recorder.section("report.first_section", self.first_section_seconds)
+        log.info("Report: up to %s written, %.1fs after the analysis started.", name, time.perf_counter() - self.started)
+
+
+def _clusters(clusters: list[dict]) -> list[str]:
+    """Recurring problems found by the local clustering (core.clustering) before the LLM call."""
+    if not clusters:
+        return []
+    lines = [
+        "## Recurring Problems (Clusters)",
+        "",
+        "*Similar items grouped locally (TF-IDF cosine) before the analysis; each cluster was sent to the model once, with its size.*",
+        "",
+    ]
+    for k, c in enumerate(clusters, 1):
+        sources = ", ".join(f"{n} {_SOURCE_LABELS.get(source, source)}" for source, n in c["sources"].items())
+        issues = ", ".join(f"#{n}" for n in c["issues"][:MAX_CLUSTER_ISSUES])
+        if len(c["issues"]) > MAX_CLUSTER_ISSUES:
+            issues += f" +{len(c['issues']) - MAX_CLUSTER_ISSUES} more"
+        lines.append(f"{k}. **{c['size']} items** ({sources}) — *{', '.join(c['terms']) or 'n/a'}* — e.g. {c['representative']} {c['title'][:80]}" + (f" — {issues}" if issues else ""))
+    lines.append("")
+    return lines
+
+
+def _run_metrics(run_metrics: dict | None) -> list[str]:
+    if not run_metrics:
+        return []
+    return ["", "## Run Metrics", "", *metrics.markdown_table(run_metrics), ""]
+
+
+def _activity(a: dict) -> list[str]:
+    """Data Summary lines from core.issue_analytics: weekly rates, time to close and per-category trends."""
+    if not a.get("weeks"):
+        return []
+    w = a["trend_weeks"]
+    ttc = a["time_to_close_hours"]
+    fr = a["first_response_hours"]["all"]
+    lines = [
+        f"- **Activity (last {w} weeks vs the {w} before, {a['issues']} scanned issues since {a['since']}):** "
+        f"opened {a['open_rate_per_week']}/week (was {a['open_rate_per_week_previous']}), "
+        f"closed {a['close_rate_per_week']}/week (was {a['close_rate_per_week_previous']}), "
+        f"backlog {_signed(a['backlog_growth_per_week'])}/week (was {_signed(a['backlog_growth_per_week_previous'])}); {a['open_issues']} open",
+        f"- **Time to close p50/p90/p95:** {_hours(ttc['p50'])} / {_hours(ttc['p90'])} / {_hours(ttc['p95'])} (n={ttc['count']}); "
+        f"first response, all issues: {_hours(fr['p50'])} / {_hours(fr['p90'])} / {_hours(fr['p95'])} (n={fr['count']})",
+    ]
+    if a.get("categories"):
+        lines += [
+            "",
+            f"#### Category trends (issues opened in the last {w} weeks vs the {w} before)",
+            "",
+            "| Category | Issues | Open | Opened (last) | Opened (before) | Time to close p50 |",
+            "| --- | ---: | ---: | ---: | ---: | ---: |",
+        ]
+        for name, c in a["categories"].items():
+            lines.append(f"| {name} | {c['issues']} | {c['open']} | {c[f'opened_last_{w}w']} | {c[f'opened_previous_{w}w']} | {_hours(c['time_to_close_hours']['p50'])} |")
+        lines.append("")
+    return lines
+
+
+def _signed(value: float | None) -> str:
+    return f"{value:+.2f}" if value is not None else "N/A"
+
+
+def _hours(value: float | None) -> str:
+    return f"{value:.1f}h" if value is not None else "N/A"
+
+
 def _take_until_next_section(text: str, after: str) -> str:
     """Extract content after '## <after>' until next '##'."""
     pattern = rf"(?m)^##\s+{after}\s*\n(.*?)(?=^##\s+|\Z)"
@@ -1,19 +1,140 @@
 """
 Tavily scanner: multi-source social search (Reddit, HN, Stack Overflow, tech blogs).
 No OAuth, single API key. Only invoked when "tavily" is in config TARGET["sources"].
+Queries run concurrently (bounded); transient failures are retried with exponential backoff and jitter.
+Results are merged in query order, so output does not depend on completion order.
+Responses are cached on disk per (query, max_results, search_depth) with a TTL and size-bounded LRU eviction
+(TAVILY_CACHE=0 to disable; TAVILY_CACHE_DIR, TAVILY_CACHE_TTL_HOURS, TAVILY_CACHE_MAX_MB).
 """
 
+import json
 import logging
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import requests
 from tavily import TavilyClient
+from tavily.errors import TimeoutError as TavilyTimeoutError
+from tavily.errors import UsageLimitExceededError
+
+from core import concurrency, dedupe, metrics
+from core.disk_cache import DiskCache
+from core.keyword_matcher import get_matcher
 
 log = logging.getLogger(__name__)
 
+# Queries in flight at once
+MAX_CONCURRENCY = 4
+# Retries for transient failures (timeouts, 429, 5xx, connection errors); full-jitter exponential backoff
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 20.0
+
+SEARCH_DEPTH = "basic"
+
+DEFAULT_CACHE_DIR = ".cache/tavily"
+DEFAULT_CACHE_TTL_HOURS = 24
+DEFAULT_CACHE_MAX_MB = 50
+
+_cache: DiskCache | None = None
+_cache_lock = threading.Lock()
+# One pooled client per API key, shared across runs (batch mode audits many targets per process)
+_clients: dict[str, TavilyClient] = {}
+
+
+def _get_client(api_key: str) -> TavilyClient:
+    with _cache_lock:
+        if api_key not in _clients:
+            # TAVILY_API_URL: alternative API root (the benchmark's local stand-in)
+            _clients[api_key] = TavilyClient(api_key=api_key, api_base_url=os.getenv("TAVILY_API_URL") or None)
+        return _clients[api_key]
+
+
+def _ttl_seconds() -> float:
+    return float(os.getenv("TAVILY_CACHE_TTL_HOURS", DEFAULT_CACHE_TTL_HOURS)) * 3600
+
+
+def _get_cache() -> DiskCache | None:
+    global _cache
+    if os.getenv("TAVILY_CACHE", "1") == "0":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(
+                os.getenv("TAVILY_CACHE_DIR", DEFAULT_CACHE_DIR),
+                max_bytes=int(float(os.getenv("TAVILY_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB)) * 1024 * 1024),
+                # Entries not read for a TTL are stale whatever their cached_at: evicted without waiting for size eviction
+                max_age_seconds=_ttl_seconds(),
+            )
+        return _cache
+
+
+def _cached_search(client: TavilyClient, query: str, max_results: int, refresh: bool) -> dict:
+    cache = _get_cache()
+    if cache is None:
+        return _search(client, query, max_results)
+    key = json.dumps([query, max_results, SEARCH_DEPTH])
+    ttl = _ttl_seconds()
+    if not refresh:
+        # TTL counts from when the entry was written (cache hits refresh LRU order, not freshness); an expired entry
+        # is a miss and is removed
+        entry = cache.get(key, fresh=lambda e: time.time() - e.get("cached_at", 0) < ttl)
+        if entry:
+            metrics.http_call("tavily", cached=True)
+            return entry["response"]
+    response = _search(client, query, max_results)
+    cache.set(key, {"cached_at": time.time(), "response": response})
+    return response
 
-def run(queries: list[str], max_results_per_query: int = 8) -> dict:
+
+def _is_transient(e: Exception) -> bool:
+    if isinstance(e, (TavilyTimeoutError, UsageLimitExceededError, requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        return e.response.status_code >= 500
+    return False
+
+
+def _search(client: TavilyClient, query: str, max_results: int) -> dict:
+    attempt = 0
+    while True:
+        try:
+            with concurrency.slot():
+                response = client.search(
+                    query=query,
+                    max_results=max_results,
+                    search_depth=SEARCH_DEPTH,
+                    include_raw_content=False,
+                )
+            # The client returns decoded JSON: count its serialised size
+            metrics.http_call("tavily", len(json.dumps(response)))
+            return response
+        except Exception as e:
+            metrics.http_call("tavily", error=True)
+            if attempt >= MAX_RETRIES or not _is_transient(e):
+                raise
+            delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+            attempt += 1
+            log.info("  Query '%s' failed (%s), retry %d/%d in %.1fs.", query[:50], e, attempt, MAX_RETRIES, delay)
+            time.sleep(delay)
+
+
+def tag(results: list[dict], keywords: dict) -> None:
+    """Sets each result's categories / matched_terms for this keyword config (in place)."""
+    matcher = get_matcher(keywords, boundary="start")
+    for r in results:
+        matched = matcher.match(f"{r['title']} {r['content']}")
+        r["categories"] = list(matched)
+        r["matched_terms"] = [t for terms in matched.values() for t in terms]
+
+
+def run(queries: list[str], max_results_per_query: int = 8, keywords: dict | None = None, workers: int = MAX_CONCURRENCY, refresh_cache: bool = False) -> dict:
     """
-    Runs Tavily search for each query. Aggregates results (title, content, url), dedupes by URL.
+    Runs Tavily search for each query (served from the local cache when fresh, unless refresh_cache). Aggregates results (title, content, url), dedupes by URL.
+    If keywords ({category: [terms]}) are given, each result is tagged with its matched categories and terms.
     Returns a dict: results["tavily"]["results"] for the analyzer.
     """
     api_key = os.getenv("TAVILY_API_KEY")
@@ -25,19 +146,21 @@ def run(queries: list[str], max_results_per_query: int = 8) -> dict:
             "queries": queries,
         }
 
-    log.info("Tavily: %d queries, max %d results per query.", len(queries), max_results_per_query)
-    client = TavilyClient(api_key=api_key)
+    log.info("Tavily: %d queries, max %d results per query, %d concurrent.", len(queries), max_results_per_query, workers)
+    client = _get_client(api_key)
     all_results: list[dict] = []
     seen_urls: set[str] = set()
+    cache = _get_cache()
+    if cache is not None:
+        cache.reset_stats()
 
-    for i, q in enumerate(queries):
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="tavily") as pool:
+        search = metrics.propagate(_cached_search)
+        futures = [pool.submit(search, client, q, max_results_per_query, refresh_cache) for q in queries]
+    # Merge in query order: deterministic dedupe whatever the completion order
+    for i, (q, future) in enumerate(zip(queries, futures)):
         try:
-            response = client.search(
-                query=q,
-                max_results=max_results_per_query,
-                search_depth="basic",
-                include_raw_content=False,
-            )
+            response = future.result()
             new = 0
             for r in response.get("results", []):
                 url = r.get("url", "")
@@ -53,9 +176,22 @@ def run(queries: list[str], max_results_per_query: int = 8) -> dict:
         except Exception as e:
             log.warning("  [%d/%d] Query failed: %s", i + 1, len(queries), e)
 
+    # Tracking-parameter variants, mirrors and syndicated copies
+    merged = len(all_results)
+    all_results, collapsed = dedupe.dedupe(all_results, text=lambda r: f"{r['title']}\n{r['content']}", url=lambda r: r["url"])
+    if merged != len(all_results):
+        log.info("  Collapsed %d duplicates (%d by canonical URL, %d near-identical content).", merged - len(all_results), collapsed["url"], collapsed["content"])
+
+    if keywords:
+        tag(all_results, keywords)
+
+    if cache is not None:
+        cs = cache.stats()
+        log.info("Tavily cache: %d hits, %d misses%s.", cs["hits"], cs["misses"], " (refresh forced)" if refresh_cache else "")
     log.info("Tavily finished: %d total results (deduplicated).", len(all_results))
     return {
         "results": all_results,
         "error": None,
         "queries": queries,
+        "duplicates_collapsed": collapsed["url"] + collapsed["content"],
     }
@@ -3,7 +3,8 @@ Orchestrator for the audit pipeline.
 
 What this script does (in order):
   1. Loads .env and reads config (which sources: github, tavily, reddit).
-  2. For each enabled source: runs the corresponding scanner (GitHub issues, Tavily search, or Reddit).
+  2. Runs the enabled scanners concurrently (GitHub issues, Tavily search, Reddit); a failed or timed-out
+     source does not block the others.
   3. Sends all collected data to Mistral to get: community score, red flags, market positioning, lab vs social correlation.
   4. Writes AUDIT_SOCIAL_REPORT.md from the analysis and data summary.
 
@@ -12,10 +13,27 @@ Sources are chosen at run time via --sources (no need to edit config):
   uv run python main.py --sources tavily
   uv run python main.py --sources github,tavily
   uv run python main.py   (uses config SOURCES if --sources not given)
+
+GitHub scans are incremental (only issues changed since the last run are fetched); --full-scan rescans the whole window.
+Tavily results and LLM responses are cached locally; --refresh-cache re-sends every query and prompt.
+LLM_PROVIDER=fake runs the analysis with a local deterministic stand-in model (no network).
+--analysis-mode chunked analyses the full corpus map-reduce style (auto: only when a single call would truncate).
+--stream streams the final LLM call: report sections are written to the report file as soon as each is complete
+(the full report replaces it at the end), and a malformed response is abandoned early.
+Run metrics (stage times, HTTP calls and bytes per provider, rate limit left, LLM sizes) are written next to the
+report as <report>.metrics.json; --metrics-table also appends them to the report.
+Scanned items are saved to the local corpus store (core.corpus_store); --from-store re-runs keyword matching,
+analysis and the report from the stored corpus, without any network scan.
+Each stage's output (scanner results, analysis) is checkpointed under a run ID (core.checkpoint); --resume re-runs
+the latest run of the target (or --resume RUN_ID a given one), reusing every stage whose config and inputs are
+unchanged, e.g. only the analysis after a failed LLM call:
+  uv run python main.py --resume
 """
 
 import argparse
 import logging
+import os
+from pathlib import Path
 
 from dotenv import load_dotenv
 
@@ -23,6 +41,9 @@ load_dotenv()
 
 VALID_SOURCES = ("github", "tavily", "reddit")
 
+# A source still running after this long is abandoned; the pipeline continues with the others
+SOURCE_TIMEOUT_SECONDS = 1800
+
 # Logs: level + time so we can follow progress
 logging.basicConfig(
     level=logging.INFO,
@@ -32,63 +53,214 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 
-def main(sources_override: list[str] | None = None) -> None:
-    from config.target_meilisearch import TARGET
+def main(
+    sources_override: list[str] | None = None,
+    full_scan: bool = False,
+    refresh_cache: bool = False,
+    analysis_mode: str = "auto",
+    source_timeout: float = SOURCE_TIMEOUT_SECONDS,
+    target: dict | None = None,
+    output_path: str | None = None,
+    metrics_table: bool = False,
+    from_store: bool = False,
+    resume: str | None = None,
+    stream: bool = False,
+) -> Path | None:
+    """
+    Runs the pipeline for one target (default: config.target_meilisearch). Returns the report path (None if not written).
+    resume: "latest" or a run ID, to reuse that run's checkpointed stages.
+    """
+    from core import checkpoint, corpus_store, llm_client, metrics, pipeline
+
+    if target is None:
+        from config.target_meilisearch import TARGET as target
 
-    sources = sources_override if sources_override is not None else TARGET.get("sources", [])
-    results = {}
+    sources = sources_override if sources_override is not None else target.get("sources", [])
     log.info("Sources to run: %s", sources)
 
-    if "github" in sources:
+    # Output file: GitHub only → AUDIT_GITHUB.md, Tavily only → AUDIT_TAVILY.md, otherwise AUDIT_SOCIAL_REPORT.md
+    if output_path is None:
+        if sources == ["github"]:
+            output_path = "AUDIT_GITHUB.md"
+        elif sources == ["tavily"]:
+            output_path = "AUDIT_TAVILY.md"
+        else:
+            output_path = "AUDIT_SOCIAL_REPORT.md"
+
+    def scan_github(_: pipeline.PipelineResult) -> dict:
         log.info("Starting GitHub scanner (repo + keywords from config)...")
         from core import github_scanner
-        results["github"] = github_scanner.run(
-            repo=TARGET["github"]["repo"],
-            keywords=TARGET["github"]["keywords"],
+        out = github_scanner.run(
+            repo=target["github"]["repo"],
+            keywords=target["github"]["keywords"],
+            incremental=not full_scan,
+            max_issues=target["github"].get("max_issues") or github_scanner.DEFAULT_MAX_ISSUES,
+            lookback_months=target["github"].get("lookback_months") or github_scanner.ISSUES_LOOKBACK_MONTHS,
+            streaming=bool(target["github"].get("streaming")),
         )
-        n = len(results["github"].get("issues", []))
-        log.info("GitHub done: %d issues matched (by keyword). Categories: %s", n, results["github"].get("issues_by_category"))
+        log.info("GitHub done: %d issues matched (by keyword). Categories: %s", len(out.get("issues", [])), out.get("issues_by_category"))
+        return out
 
-    if "tavily" in sources:
+    def scan_tavily(_: pipeline.PipelineResult) -> dict:
         log.info("Starting Tavily scanner (one search per query from config)...")
         from core import tavily_scanner
-        results["tavily"] = tavily_scanner.run(queries=TARGET["tavily"]["queries"])
-        n = len(results["tavily"].get("results", []))
-        err = results["tavily"].get("error")
-        if err:
-            log.warning("Tavily finished with error: %s. Results count: %d", err, n)
+        out = tavily_scanner.run(
+            queries=target["tavily"]["queries"],
+            keywords=target["tavily"].get("keywords"),
+            refresh_cache=refresh_cache,
+        )
+        n = len(out.get("results", []))
+        if out.get("error"):
+            log.warning("Tavily finished with error: %s. Results count: %d", out["error"], n)
         else:
             log.info("Tavily done: %d results (deduplicated by URL).", n)
+        return out
 
-    if "reddit" in sources:
+    def scan_reddit(_: pipeline.PipelineResult) -> dict:
         log.info("Starting Reddit scanner (PRAW)...")
         from core import reddit_scanner
-        results["reddit"] = reddit_scanner.run(
-            subreddits=TARGET["reddit"]["subreddits"],
-            keywords=TARGET["reddit"]["keywords"],
+        out = reddit_scanner.run(
+            subreddits=target["reddit"]["subreddits"],
+            keywords=target["reddit"]["keywords"],
+            must_mention=target.get("name"),
         )
-        log.info("Reddit done (stub: no PRAW data yet).")
-
-    log.info("Running Mistral analysis (one LLM call with all data)...")
-    from core import mistral_analyzer
-    analysis = mistral_analyzer.run(results)
-    if analysis.get("error"):
-        log.error("Mistral analysis failed: %s", analysis["error"])
-    else:
-        log.info("Mistral done. Community score: %s/10. Red flags extracted: %d", analysis.get("summary_score"), len(analysis.get("red_flags") or []))
-
-    # Output file: GitHub only → AUDIT_GITHUB.md, Tavily only → AUDIT_TAVILY.md, both → AUDIT_SOCIAL_REPORT.md
-    if sources == ["github"]:
-        output_path = "AUDIT_GITHUB.md"
-    elif sources == ["tavily"]:
-        output_path = "AUDIT_TAVILY.md"
-    else:
-        output_path = "AUDIT_SOCIAL_REPORT.md"
-    log.info("Building report (Markdown): %s", output_path)
-    from core import report_builder
-    path = report_builder.build(results, analysis, output_path=output_path)
-    log.info("Report written to: %s", path.resolve())
+        if out.get("error"):
+            log.warning("Reddit finished with error: %s. Posts count: %d", out["error"], len(out.get("posts", [])))
+        else:
+            log.info("Reddit done: %d posts (deduplicated across searches).", len(out.get("posts", [])))
+        return out
+
+    scanners = {"github": scan_github, "tavily": scan_tavily, "reddit": scan_reddit}
+    scan_names = tuple(name for name in VALID_SOURCES if name in sources)
+    target_name = target.get("name", "Meilisearch")
+
+    checkpoints = None
+    if checkpoint.enabled():
+        checkpoints = checkpoint.Run(target_name, resume)
+    elif resume:
+        log.warning("--resume ignored: checkpoints are disabled (CHECKPOINTS=0).")
+    # What each stage's output depends on besides its inputs: a change re-runs the stage on resume
+    stage_configs = {
+        "github": {k: target.get("github", {}).get(k) for k in ("repo", "keywords", "max_issues", "lookback_months", "streaming")} | {"full_scan": full_scan},
+        "tavily": {k: target.get("tavily", {}).get(k) for k in ("queries", "keywords")} | {"refresh_cache": refresh_cache},
+        "reddit": {k: target.get("reddit", {}).get(k) for k in ("subreddits", "keywords")} | {"must_mention": target.get("name")},
+    }
+
+    def checkpointed(name: str, compute, config, inputs: tuple[str, ...] = (), reuse: bool = True):
+        """compute()'s output, or the resumed run's checkpoint of it if config and inputs are unchanged."""
+        if checkpoints is None:
+            return compute()
+        config_hash = checkpoint.config_hash(config)
+        input_hash = checkpoint.config_hash({i: checkpoints.output_hash(i) for i in inputs})
+        out = checkpoints.load(name, config_hash, input_hash) if reuse else None
+        if out is None:
+            out = compute()
+            checkpoints.save(name, out, config_hash, input_hash)
+        return out
+
+    def scan_stage(name: str, scan):
+        def stage(done: pipeline.PipelineResult) -> dict:
+            # Stored snapshots are re-read (a newer scan may have been stored), checkpointed only as analysis inputs
+            return checkpointed(name, lambda: scan(done), {**stage_configs[name], "from_store": from_store}, reuse=not from_store)
+        return stage
+
+    if from_store:
+        stored = corpus_store.load(target_name, list(scan_names))
+        log.info("From store: %s snapshots for %s (%s).", list(stored) or "no", target_name, corpus_store.db_path())
+
+        def load_stored(name: str):
+            def stage(_: pipeline.PipelineResult) -> dict:
+                if name not in stored:
+                    raise LookupError(f"no stored {name} snapshot for {target_name}")
+                out = stored[name]
+                # Current keyword config, not the one of the stored run
+                if name == "github":
+                    from core import github_scanner
+                    vm = out.get("velocity_metrics") or {}
+                    out = github_scanner.summarise(out["repo"], target["github"]["keywords"], out["scanned_issues"], vm.get("sample_failed", 0))
+                elif name == "tavily" and target["tavily"].get("keywords"):
+                    from core import tavily_scanner
+                    tavily_scanner.tag(out["results"], target["tavily"]["keywords"])
+                return out
+            return stage
+
+        scanners = {name: load_stored(name) for name in scan_names}
+    scanners = {name: scan_stage(name, scanners[name]) for name in scan_names}
+    # Scan outputs, plus {"error": ...} for sources that failed or timed out (shown in the report)
+    results: dict = {}
+
+    def analyze(done: pipeline.PipelineResult) -> dict:
+        for name in scan_names:
+            results[name] = done.outputs[name] if name in done.outputs else {"error": done.errors.get(name, "not run")}
+        from core import mistral_analyzer
+
+        def compute() -> dict:
+            log.info("Running Mistral analysis (mode: %s%s)...", analysis_mode, ", streamed" if stream else "")
+            on_section = None
+            if stream:
+                from core import report_builder
+                on_section = report_builder.ProgressiveReport(results, output_path, target_name).section
+            return mistral_analyzer.run({k: v for k, v in results.items() if k in done.outputs}, mode=analysis_mode, refresh_cache=refresh_cache, target=target, on_section=on_section)
+
+        config = {
+            "mode": analysis_mode,
+            "refresh_cache": refresh_cache,
+            "provider": os.getenv("LLM_PROVIDER", "mistral").strip().lower(),
+            "model": llm_client.MODEL,
+            "profile": {k: target.get(k) for k in mistral_analyzer.DEFAULT_TARGET_PROFILE},
+            "keywords": {name: target.get(name, {}).get("keywords") for name in scan_names},
+        }
+        analysis = checkpointed("analysis", compute, config, inputs=scan_names)
+        if analysis.get("error"):
+            log.error("Mistral analysis failed: %s", analysis["error"])
+        else:
+            log.info("Mistral done. Community score: %s/10. Red flags extracted: %d", analysis.get("summary_score"), len(analysis.get("red_flags") or []))
+        return analysis
+
+    def save_corpus(done: pipeline.PipelineResult) -> int | None:
+        # Sources resumed from a checkpoint were stored by the run that scanned them
+        resumed = checkpoints.reused if checkpoints is not None else []
+        fresh = {name: done.outputs[name] for name in scan_names if name in done.outputs and name not in resumed}
+        return corpus_store.save(target_name, fresh) if fresh else None
+
+    def build_report(done: pipeline.PipelineResult) -> Path:
+        log.info("Building report (Markdown): %s", output_path)
+        from core import report_builder
+        run_metrics = None
+        if metrics_table:
+            # Stages finished so far (the report's own time is only in the JSON)
+            run_metrics = recorder.summary()
+            run_metrics["stages"] = dict(done.timings)
+        # A failed analysis still gets a report (with its Analysis Error section)
+        analysis = done.outputs.get("analysis") or {"error": done.errors.get("analysis", "not run")}
+        path = report_builder.build(results, analysis, output_path=output_path, target_name=target_name, run_metrics=run_metrics)
+        log.info("Report written to: %s", path.resolve())
+        return path
+
+    # DAG: scanners run concurrently; analysis starts once every scanner has finished (or failed / timed out)
+    stages = [pipeline.Stage(name, scanners[name], timeout=source_timeout) for name in scan_names]
+    stages.append(pipeline.Stage("analysis", analyze, after=scan_names))
+    if not from_store and corpus_store.enabled():
+        # Alongside the analysis: a store failure does not block the report
+        stages.append(pipeline.Stage("store", save_corpus, after=scan_names))
+    stages.append(pipeline.Stage("report", build_report, after=("analysis",)))
+    with metrics.recording() as recorder:
+        run = pipeline.run(stages)
+    recorder.stages = dict(run.timings)
+    recorder.info.update({"target": target.get("name"), "sources": list(sources), "wall_seconds": run.wall_seconds, "stage_errors": dict(run.errors)})
+    if checkpoints is not None:
+        recorder.info.update({"run_id": checkpoints.run_id, "resumed_stages": list(checkpoints.reused)})
+    metrics_file = metrics.write_json(recorder.summary(), metrics.metrics_path(output_path))
+    log.info("Run metrics written to: %s", metrics_file)
+
+    timings = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in run.timings.items())
+    log.info("Stage timings: %s. Wall clock: %.1fs (sum of stages: %.1fs).", timings, run.wall_seconds, sum(run.timings.values()))
+    if run.errors:
+        log.warning("Stages with errors: %s", run.errors)
+    if checkpoints is not None:
+        log.info("Run %s: resumed %s; resume with --resume %s.", checkpoints.run_id, checkpoints.reused or "no stages", checkpoints.run_id)
     log.info("Pipeline finished.")
+    return run.outputs.get("report")
 
 
 def _parse_sources(s: str) -> list[str]:
@@ -108,5 +280,64 @@ if __name__ == "__main__":
         metavar="LIST",
         help="Comma-separated: github, tavily, reddit. Example: github,tavily. If omitted, uses config.",
     )
+    parser.add_argument(
+        "--full-scan",
+        action="store_true",
+        help="GitHub: ignore the stored high-water mark and rescan the whole lookback window.",
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore cached Tavily results and LLM responses and re-send every request (the caches are then refreshed).",
+    )
+    parser.add_argument(
+        "--analysis-mode",
+        choices=("auto", "single", "chunked"),
+        default="auto",
+        help="single: one LLM call on a truncated context. chunked: map-reduce over the full corpus. auto (default): chunked only if single would truncate.",
+    )
+    parser.add_argument(
+        "--source-timeout",
+        type=float,
+        default=SOURCE_TIMEOUT_SECONDS,
+        metavar="SECONDS",
+        help=f"Abandon a source still running after this long and continue with the others (default {SOURCE_TIMEOUT_SECONDS}).",
+    )
+    parser.add_argument(
+        "--from-store",
+        action="store_true",
+        help="No network scan: re-analyse the latest stored corpus (CORPUS_DB) with the current keywords and prompts.",
+    )
+    parser.add_argument(
+        "--metrics-table",
+        action="store_true",
+        help="Append a Run Metrics table (HTTP calls, bytes, rate limit left, LLM sizes) to the report. The JSON metrics file is always written.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the final LLM call: write each report section as soon as it is complete, stop early on a malformed response.",
+    )
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const="latest",
+        default=None,
+        metavar="RUN_ID",
+        help="Resume the latest run of the target (or RUN_ID): stages whose config and inputs are unchanged are loaded from their checkpoints.",
+    )
     args = parser.parse_args()
-    main(sources_override=args.sources)
+    main(
+        sources_override=args.sources,
+        full_scan=args.full_scan,
+        refresh_cache=args.refresh_cache,
+        analysis_mode=args.analysis_mode,
+        source_timeout=args.source_timeout,
+        metrics_table=args.metrics_table,
+        from_store=args.from_store,
+        resume=args.resume,
+        stream=args.stream,
+    )
+    # A timed-out source may still be running: do not wait for it at exit
+    from core import pipeline
+    pipeline.exit_if_abandoned()
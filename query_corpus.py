@@ -0,0 +1,42 @@
+"""
+Ad-hoc full-text queries over the local corpus store (every issue / web result / Reddit post ever scanned).
+Query syntax is SQLite FTS5: words (stemmed: crash matches crashes), "exact phrase", OR, NOT, prefix*, title:word.
+
+Usage:
+  uv run python query_corpus.py "panic OR crash"
+  uv run python query_corpus.py '"out of memory" NOT docs' --source github --target Meilisearch --limit 50
+  uv run python query_corpus.py --stats
+"""
+
+import argparse
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from core import corpus_store  # noqa: E402
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search the local corpus store.")
+    parser.add_argument("query", nargs="?", help="FTS5 query.")
+    parser.add_argument("--target", help="Only this target (TARGET name).")
+    parser.add_argument("--source", choices=("github", "tavily", "reddit"), help="Only this source.")
+    parser.add_argument("--limit", type=int, default=20, help="Max results (default 20).")
+    parser.add_argument("--stats", action="store_true", help="Items stored per target and source.")
+    args = parser.parse_args()
+
+    if args.stats:
+        for row in corpus_store.stats():
+            print(f"{row['target']:<20} {row['source']:<8} {row['items']:>8} items  (last run {row['last_run']})")
+        sys.exit(0)
+    if not args.query:
+        parser.error("a query is required (or --stats)")
+    try:
+        hits = corpus_store.search(args.query, target=args.target, source=args.source, limit=args.limit)
+    except ValueError as e:
+        sys.exit(str(e))
+    for h in hits:
+        print(f"[{h['source']}] {h['title'][:100]}  ({h['target']}, {h['url'] or h['key']})")
+        print(f"    {h['snippet']}")
+    print(f"{len(hits)} result(s).")
@@ -0,0 +1,392 @@
+"""
+Audit service: a long-running process that runs main.main for audit jobs submitted over a local HTTP API.
+Imports, pooled clients (LLM, Tavily, the GitHub token scheduler and what it learned of each token's budget),
+cache handles and target configs stay warm between jobs, so repeat and incremental audits skip the cold start.
+Jobs run on a bounded worker pool behind a bounded queue; jobs for the same target run one at a time (they
+share its GitHub scan state, checkpoints and corpus snapshots).
+Listens on 127.0.0.1 only, or on a Unix socket (--socket). Target config files are imported, so a job may only name
+files under --targets-dir (default config/); over TCP, requests must carry a local Host header (DNS rebinding) and
+POSTs a JSON Content-Type (cross-site form posts cannot set one).
+
+Usage:
+  uv run python serve.py --workers 2 --budget 16
+  uv run python serve.py --socket /tmp/audit.sock
+
+API (JSON):
+  POST /jobs            {"target": "config/target_meilisearch.py", "sources": ["github"], "full_scan": false,
+                         "refresh_cache": false, "analysis_mode": "auto", "from_store": false, "stream": false,
+                         "resume": null}   -> 202 {"id": ..., "status": "queued", ...}   ("target" may be a TARGET dict)
+  GET  /jobs            every job, newest first
+  GET  /jobs/<id>       status (queued, running, done, failed, cancelled), timings, report and metrics paths, error
+  GET  /jobs/<id>/report   the report (Markdown) once written
+  GET  /health          workers, queue length, uptime
+Example:
+  curl -s localhost:8765/jobs -H 'Content-Type: application/json' -d '{"target": "config/target_meilisearch.py", "sources": ["github"]}'
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import re
+import signal
+import socketserver
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from batch import _slug, load_target
+from core import checkpoint
+from main import VALID_SOURCES, main
+
+log = logging.getLogger("serve")
+
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+DEFAULT_CALL_BUDGET = 16
+DEFAULT_TARGETS_DIR = "config"
+# Jobs waiting for a worker; beyond this, submissions are refused (HTTP 429)
+MAX_QUEUED = 100
+# Finished jobs kept for GET /jobs (oldest dropped first)
+MAX_FINISHED = 500
+MAX_BODY_BYTES = 1 << 20
+# main.main keyword arguments a job may set
+JOB_OPTIONS = {"full_scan": bool, "refresh_cache": bool, "analysis_mode": str, "from_store": bool, "stream": bool, "resume": str, "metrics_table": bool, "source_timeout": float}
+ANALYSIS_MODES = ("auto", "single", "chunked")
+
+
+class JobError(ValueError):
+    pass
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class Service:
+    """Job table, bounded queue and worker threads around main.main."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, out_dir: str = "reports", max_queued: int = MAX_QUEUED, targets_dir: str = DEFAULT_TARGETS_DIR):
+        self.out_dir = Path(out_dir)
+        # Only target configs under this directory may be imported
+        self.targets_dir = Path(targets_dir).resolve()
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.started = time.monotonic()
+        self.jobs: dict[str, dict] = {}
+        self.max_queued = max_queued
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._target_locks: dict[str, threading.Lock] = {}
+        # Target config files, reloaded when modified
+        self._targets: dict[Path, tuple[float, dict]] = {}
+        self._workers = [threading.Thread(target=self._work, name=f"job-{k + 1}") for k in range(max(1, workers))]
+        for w in self._workers:
+            w.start()
+
+    def _target(self, spec) -> dict | None:
+        if spec is None:
+            return None
+        if isinstance(spec, dict):
+            return spec
+        if not isinstance(spec, str):
+            raise JobError("target: a config file path or a TARGET object")
+        # Resolved first: symlinks and ".." cannot leave the targets directory
+        path = Path(spec).resolve()
+        if path.suffix != ".py" or not path.is_relative_to(self.targets_dir):
+            raise JobError(f"target: only .py files under {self.targets_dir} are accepted")
+        if not path.is_file():
+            raise JobError(f"target config not found: {spec}")
+        mtime = path.stat().st_mtime
+        with self._lock:
+            cached = self._targets.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        target = load_target(path)
+        if target is None:
+            raise JobError(f"{spec} defines no TARGET")
+        with self._lock:
+            self._targets[path] = (mtime, target)
+        return target
+
+    def submit(self, request: dict) -> dict:
+        """Validates a job request and queues it; returns the job."""
+        if not isinstance(request, dict):
+            raise JobError("request body must be a JSON object")
+        unknown = set(request) - set(JOB_OPTIONS) - {"target", "sources"}
+        if unknown:
+            raise JobError(f"unknown fields: {', '.join(sorted(unknown))}")
+        sources = request.get("sources")
+        if sources is not None and (not isinstance(sources, list) or any(s not in VALID_SOURCES for s in sources)):
+            raise JobError(f"sources: a list of {', '.join(VALID_SOURCES)}")
+        options = {}
+        for key, kind in JOB_OPTIONS.items():
+            value = request.get(key)
+            if value is None:
+                continue
+            # No coercion: bool("false") is True. Numbers may be ints, but a bool is not a number here
+            if isinstance(value, bool) != (kind is bool) or not isinstance(value, (int, float) if kind is float else kind):
+                raise JobError(f"{key}: expected {'number' if kind is float else kind.__name__}")
+            options[key] = kind(value)
+        if options.get("analysis_mode", "auto") not in ANALYSIS_MODES:
+            raise JobError(f"analysis_mode: one of {', '.join(ANALYSIS_MODES)}")
+        resume = options.get("resume")
+        if resume is not None and resume != "latest" and not checkpoint.RUN_ID_PATTERN.fullmatch(resume):
+            raise JobError("resume: \"latest\" or a run id (as returned in a job's run_id)")
+        # Imported last, once everything else in the request is valid
+        target = self._target(request.get("target"))
+
+        job_id = uuid.uuid4().hex[:12]
+        name = (target or {}).get("name") or "Meilisearch"
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "target": name,
+            "sources": sources,
+            "options": options,
+            "submitted_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "seconds": None,
+            "report": None,
+            "metrics": None,
+            # From the run's metrics: its checkpoint run id (resume it with {"resume": run_id}), stage errors
+            "run_id": None,
+            "resumed_stages": None,
+            "stage_errors": None,
+            "error": None,
+        }
+        with self._lock:
+            self.jobs[job_id] = job
+        try:
+            self._queue.put_nowait((job, target))
+        except queue.Full:
+            with self._lock:
+                del self.jobs[job_id]
+            raise
+        log.info("Job %s queued: %s, sources %s, options %s.", job_id, name, sources or "from config", options)
+        return dict(job)
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            job, target = item
+            if job["status"] == "cancelled":
+                continue
+            with self._lock:
+                target_lock = self._target_locks.setdefault(job["target"], threading.Lock())
+            # One job per target at a time: they share its scan state, checkpoints and corpus snapshots
+            with target_lock:
+                self._run(job, target)
+
+    def _run(self, job: dict, target: dict | None) -> None:
+        output_path = self.out_dir / f"AUDIT_{_slug(job['target'])}-{job['id']}.md"
+        with self._lock:
+            job.update(status="running", started_at=_now())
+        start = time.perf_counter()
+        log.info("Job %s started (%s).", job["id"], job["target"])
+        try:
+            report = main(sources_override=job["sources"], target=target, output_path=str(output_path), **job["options"])
+            status, error = ("done", None) if report is not None else ("failed", "no report written (see the metrics file for stage errors)")
+        except Exception as e:
+            log.exception("Job %s failed.", job["id"])
+            report, status, error = None, "failed", f"{type(e).__name__}: {e}"
+        from core import metrics
+        metrics_file = metrics.metrics_path(output_path)
+        summary = json.loads(metrics_file.read_text(encoding="utf-8")) if metrics_file.exists() else {}
+        with self._lock:
+            job.update(
+                status=status,
+                finished_at=_now(),
+                seconds=round(time.perf_counter() - start, 2),
+                report=str(report) if report is not None else None,
+                metrics=str(metrics_file) if summary else None,
+                run_id=summary.get("run_id"),
+                resumed_stages=summary.get("resumed_stages"),
+                stage_errors=summary.get("stage_errors") or None,
+                error=error,
+            )
+            self._prune()
+        log.info("Job %s %s in %.1fs: %s", job["id"], status, job["seconds"], job["report"] or error)
+
+    def _prune(self) -> None:
+        finished = [j for j in self.jobs.values() if j["finished_at"]]
+        for j in finished[: max(0, len(finished) - MAX_FINISHED)]:
+            del self.jobs[j["id"]]
+
+    def job(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def list_jobs(self) -> list[dict]:
+        with self._lock:
+            return [dict(j) for j in reversed(self.jobs.values())]
+
+    def health(self) -> dict:
+        with self._lock:
+            running = sum(1 for j in self.jobs.values() if j["status"] == "running")
+        return {"status": "ok", "workers": len(self._workers), "queued": self._queue.qsize(), "running": running, "uptime_seconds": round(time.monotonic() - self.started, 1)}
+
+    def stop(self) -> None:
+        """Cancels queued jobs and waits for the running ones."""
+        with self._lock:
+            for j in self.jobs.values():
+                if j["status"] == "queued":
+                    j.update(status="cancelled", finished_at=_now())
+        for _ in self._workers:
+            self._queue.put(None)
+        for w in self._workers:
+            w.join()
+
+
+def warm_up() -> None:
+    """Imports the pipeline and builds the shared clients once, before the first job."""
+    start = time.perf_counter()
+    from core import corpus_store, github_cache, github_scanner, github_tokens, llm_client, mistral_analyzer, reddit_scanner, report_builder, tavily_scanner  # noqa: F401
+
+    github_cache.install()
+    github_tokens.scheduler()
+    if os.getenv("TAVILY_API_KEY"):
+        tavily_scanner._get_client(os.environ["TAVILY_API_KEY"])
+    try:
+        if llm_client.provider() != "mistral" or os.getenv("MISTRAL_API_KEY"):
+            llm_client.get_llm()
+    except Exception as e:
+        log.warning("LLM client not warmed up: %s", e)
+    log.info("Warm-up done in %.1fs.", time.perf_counter() - start)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_HTTPServer"
+
+    def log_message(self, format: str, *args) -> None:
+        log.debug("%s %s", self.command, self.path)
+
+    def _send(self, status: int, payload, content_type: str = "application/json") -> None:
+        body = payload if isinstance(payload, bytes) else json.dumps(payload, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _local(self) -> bool:
+        """Host check against DNS rebinding (TCP only: browsers cannot reach the Unix socket)."""
+        allowed = self.server.allowed_hosts
+        if allowed is None or (self.headers.get("Host") or "").lower() in allowed:
+            return True
+        self._send(403, {"error": "forbidden host"})
+        return False
+
+    def do_GET(self) -> None:
+        if not self._local():
+            return
+        service = self.server.service
+        path = self.path.split("?")[0].rstrip("/")
+        if path == "/health":
+            self._send(200, service.health())
+            return
+        if path == "/jobs":
+            self._send(200, service.list_jobs())
+            return
+        m = re.fullmatch(r"/jobs/(\w+)(/report)?", path)
+        job = service.job(m.group(1)) if m else None
+        if job is None:
+            self._send(404, {"error": "not found"})
+        elif not m.group(2):
+            self._send(200, job)
+        elif job["report"] and Path(job["report"]).exists():
+            self._send(200, Path(job["report"]).read_bytes(), "text/markdown; charset=utf-8")
+        else:
+            self._send(409, {"error": f"no report yet (job {job['status']})"})
+
+    def do_POST(self) -> None:
+        if not self._local():
+            return
+        if self.path.split("?")[0].rstrip("/") != "/jobs":
+            self._send(404, {"error": "not found"})
+            return
+        # A cross-site page can only POST text/plain or form bodies without a preflight
+        if (self.headers.get("Content-Type") or "").split(";")[0].strip().lower() != "application/json":
+            self._send(415, {"error": "Content-Type must be application/json"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send(413, {"error": "request too large"})
+            return
+        try:
+            job = self.server.service.submit(json.loads(self.rfile.read(length) or b"{}"))
+        except (JobError, ValueError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        except queue.Full:
+            self._send(429, {"error": f"queue full ({self.server.service.max_queued} jobs waiting)"})
+            return
+        self._send(202, job)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    service: Service
+    allowed_hosts: set[str] | None = None
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    service: Service
+    allowed_hosts: set[str] | None = None
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        return request, ("local", 0)
+
+
+def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT, socket_path: str | None = None, workers: int = DEFAULT_WORKERS, budget: int | None = DEFAULT_CALL_BUDGET, out_dir: str = "reports", targets_dir: str = DEFAULT_TARGETS_DIR) -> None:
+    from core import concurrency as call_budget
+
+    call_budget.set_budget(budget)
+    warm_up()
+    service = Service(workers=workers, out_dir=out_dir, targets_dir=targets_dir)
+    if socket_path:
+        Path(socket_path).unlink(missing_ok=True)
+        server = _UnixHTTPServer(socket_path, _Handler)
+        where = socket_path
+    else:
+        server = _HTTPServer((host, port), _Handler)
+        bound = server.server_address[1]
+        server.allowed_hosts = {f"127.0.0.1:{bound}", f"localhost:{bound}"}
+        where = f"http://{host}:{bound}"
+    server.service = service
+    # SIGTERM stops like Ctrl-C: queued jobs are cancelled, running ones finish
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    log.info("Audit service on %s: %d workers, %s API calls in flight max. Reports in %s/.", where, workers, budget or "unlimited", out_dir)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        log.info("Stopping: waiting for running jobs.")
+        service.stop()
+        if socket_path:
+            Path(socket_path).unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run audits as a local service (HTTP API, warm clients, bounded worker pool).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port on 127.0.0.1 (default {DEFAULT_PORT}).")
+    parser.add_argument("--socket", metavar="PATH", help="Listen on this Unix socket instead of a TCP port.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Audits run at once (default {DEFAULT_WORKERS}).")
+    parser.add_argument("--budget", type=int, default=DEFAULT_CALL_BUDGET, help=f"Max outbound API calls in flight across all jobs, 0 for unlimited (default {DEFAULT_CALL_BUDGET}).")
+    parser.add_argument("--out-dir", default="reports", help="Directory for the reports (default: reports).")
+    parser.add_argument("--targets-dir", default=DEFAULT_TARGETS_DIR, help=f"Jobs may only name target config files under this directory (default: {DEFAULT_TARGETS_DIR}).")
+    args = parser.parse_args()
+    serve(port=args.port, socket_path=args.socket, workers=args.workers, budget=args.budget or None, out_dir=args.out_dir, targets_dir=args.targets_dir)